@@ -0,0 +1,270 @@
+"""
+Benchmark suite of the reduction steps on synthetic logs of growing size.
+
+Every benchmark is timed on synthetic logs (see lswt.synthetic) with the
+layout of the retest log, and its peak traced memory is measured in a
+separate call. The time exponent over the log sizes shows how a step
+scales: about 1 for a linear pass, 2 for a quadratic one. Per-run loops
+always look up the same number of runs, so their exponent should be 0.
+
+Results are written to benchmarks/results/<label>.json. Pass an older
+results file with --compare to list the steps that got slower.
+
+    python benchmarks/run.py --label v0.1.0
+    python benchmarks/run.py --sizes 1000 10000 100000 1000000 --compare benchmarks/results/v0.1.0.json
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TEMPLATE_LOG = os.path.join(ROOT, "raw_raw_2D_retest2.txt")
+CHORDWISE_POSITIONS_FILE = os.path.join(ROOT, "positions p.txt")
+DATA_DIR = os.path.join(ROOT, "benchmarks", "data")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+LOOKUPS = 1000  # Runs looked up one at a time by the per-run benchmarks
+MIN_TIME = 0.2  # Repeat a benchmark until it has run this long (seconds)
+MAX_REPEATS = 100
+REGRESSION_RATIO = 1.25  # Slower than this factor counts as a regression
+
+
+def _import_script(name, file_name):
+    """Import a top-level script of the repository (file names may contain spaces)."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, file_name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_log(runs, seed=0):
+    """Return the path of a synthetic log with `runs` runs, writing it on first use."""
+    from lswt.synthetic import write_synthetic_log
+
+    path = os.path.join(DATA_DIR, f"synthetic_{runs}_{seed}.txt")
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        start = time.perf_counter()
+        write_synthetic_log(path + ".tmp", runs, TEMPLATE_LOG, seed=seed)
+        os.replace(path + ".tmp", path)
+        print(f"wrote {path} in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+    return path
+
+
+def _sample_runs(data):
+    runs = data.run
+    return runs[np.linspace(0, len(runs) - 1, min(LOOKUPS, len(runs))).astype(int)]
+
+
+def benchmarks():
+    """
+    Return the benchmarks as (name, setup) pairs.
+
+    `setup(path, size)` prepares the inputs for a log and returns (function, items):
+    the function to time and the number of items (runs or points) it processes.
+    """
+    import pressurecoefficient
+    from lswt.data import load_log
+    from lswt.geometry import AIRFOIL_DATA, get_slope, process_airfoil
+    from lswt.polar import default_weights, reduce_polar
+    from lswt.pressure import load_chordwise_positions
+    from lswt.wakedrag import wake_drag_runs
+
+    wake_profile = _import_script("wake_profile", "wake profile.py")
+    positions = load_chordwise_positions(CHORDWISE_POSITIONS_FILE)
+    weights = default_weights(positions)
+
+    def load_no_cache(path, size):
+        return (lambda: load_log(path, cache=False)), None
+
+    def load_cached(path, size):
+        load_log(path)  # Make sure the sidecar cache exists
+        return (lambda: load_log(path)), None
+
+    def cp_per_run(path, size):
+        data = load_log(path)
+        runs = _sample_runs(data)
+        return (lambda: [pressurecoefficient.calculate_cp(data, run) for run in runs]), len(runs)
+
+    def cp_many(path, size):
+        data = load_log(path)
+        return (lambda: pressurecoefficient.calculate_cp_many(data, data.run)), None
+
+    def polar(path, size):
+        data = load_log(path)
+        return (lambda: reduce_polar(data, weights)), None
+
+    def wake_per_run(path, size):
+        dataset = wake_profile.load_data(path)
+        runs = _sample_runs(dataset.data)
+        return (lambda: [wake_profile.calculate_velocity(dataset, run) for run in runs]), len(runs)
+
+    def wake_drag(path, size):
+        data = load_log(path)
+        return (lambda: wake_drag_runs(data)), None
+
+    def airfoil(path, size):
+        return (lambda: process_airfoil(AIRFOIL_DATA)), 1
+
+    def slope(path, size):
+        # Evaluate the slope at as many points as the log has runs
+        interpolations = process_airfoil(AIRFOIL_DATA)
+        x = np.linspace(0, 160, size)
+        return (lambda: (get_slope(interpolations, x, "upper"), get_slope(interpolations, x, "lower"))), len(x)
+
+    return [
+        ("load_data (parse)", load_no_cache),
+        ("load_data (cached)", load_cached),
+        ("calculate_cp (per run)", cp_per_run),
+        ("calculate_cp_many", cp_many),
+        ("polar (aerodynamic.py)", polar),
+        ("wake velocity (wake profile.py, per run)", wake_per_run),
+        ("wake_drag_runs", wake_drag),
+        ("process_airfoil", airfoil),
+        ("get_slope", slope),
+    ]
+
+
+def time_call(function):
+    """Return the best wall time of `function` over enough repeats to run MIN_TIME seconds."""
+    best = float("inf")
+    total = 0.0
+    for _ in range(MAX_REPEATS):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+        if total >= MIN_TIME:
+            break
+    return best
+
+
+def peak_memory(function):
+    """Return the peak memory (bytes) traced while `function` runs."""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def scaling_exponent(sizes, seconds):
+    """Return the slope of log(time) over log(size): 1 is linear, 2 quadratic."""
+    sizes, seconds = np.asarray(sizes, dtype=float), np.asarray(seconds, dtype=float)
+    if len(sizes) < 2:
+        return None
+    return float(np.polyfit(np.log(sizes), np.log(seconds), 1)[0])
+
+
+def run_suite(sizes, names=None):
+    """
+    Run the benchmarks on synthetic logs of the given sizes.
+
+    Returns:
+        dict: "results" (one entry per benchmark and size) and "scaling" (exponent per benchmark).
+    """
+    suite = benchmarks()
+    results = []
+    for size in sizes:
+        path = synthetic_log(size)
+        for name, setup in suite:
+            if names and not any(part in name for part in names):
+                continue
+            function, items = setup(path, size)
+            items = size if items is None else items
+            seconds = time_call(function)
+            peak = peak_memory(function)
+            results.append({"name": name, "runs": size, "items": items, "seconds": seconds,
+                            "throughput": items / seconds, "peak_bytes": peak})
+            print(f"{name:42s} {size:>8d} runs {seconds * 1000:10.2f} ms {items / seconds:12.4g} /s "
+                  f"{peak / 2**20:9.1f} MiB", file=sys.stderr)
+
+    scaling = {}
+    for name in dict.fromkeys(result["name"] for result in results):
+        entries = [result for result in results if result["name"] == name]
+        scaling[name] = scaling_exponent([e["runs"] for e in entries], [e["seconds"] for e in entries])
+    return {"results": results, "scaling": scaling}
+
+
+def environment():
+    """Describe the code version and machine the results were measured on."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(current, previous, ratio=REGRESSION_RATIO):
+    """
+    Compare two result sets.
+
+    Returns:
+        list: (name, runs, previous seconds, current seconds, slowdown) of every
+            benchmark that ran at the same size in both, slowest first.
+    """
+    old = {(r["name"], r["runs"]): r["seconds"] for r in previous["results"]}
+    rows = [(r["name"], r["runs"], old[r["name"], r["runs"]], r["seconds"], r["seconds"] / old[r["name"], r["runs"]])
+            for r in current["results"] if (r["name"], r["runs"]) in old]
+    return sorted(rows, key=lambda row: -row[4])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the reduction steps on synthetic tunnel logs.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="runs per synthetic log")
+    parser.add_argument("--only", nargs="+", help="only run benchmarks whose name contains one of these")
+    parser.add_argument("--label", help="name of the results file (default: the git commit)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    suite = run_suite(sorted(args.sizes), args.only)
+    suite["environment"] = environment()
+    label = args.label or suite["environment"]["commit"] or time.strftime("%Y%m%d-%H%M%S")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out = os.path.join(RESULTS_DIR, f"{label}.json")
+    with open(out, 'w') as f:
+        json.dump(suite, f, indent=1)
+    print(f"results written to {out}")
+
+    print("\nscaling exponent (time ~ runs^k)")
+    for name, exponent in suite["scaling"].items():
+        print(f"  {name:42s} {'-' if exponent is None else f'{exponent:.2f}'}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            previous = json.load(f)
+        regressions = 0
+        print(f"\ncompared with {args.compare}")
+        for name, runs, old, new, slowdown in compare(suite, previous):
+            flag = "REGRESSION" if slowdown > REGRESSION_RATIO else ""
+            regressions += bool(flag)
+            print(f"  {name:42s} {runs:>8d} runs {old * 1000:10.2f} -> {new * 1000:10.2f} ms  x{slowdown:.2f} {flag}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
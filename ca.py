@@ -1,6 +1,5 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.interpolate import interp1d
+from lswt.geometry import AirfoilGeometry
 
 # Airfoil data (x, y coordinates)
 airfoil_data = np.array([
@@ -16,70 +15,73 @@ airfoil_data = np.array([
     [77.67783, -1.61034], [82.07965, -1.28273], [86.47978, -0.94874], [100, 0]
 ])
 
-# Split the data into upper and lower surfaces
-upper_surface = airfoil_data[:25]
-lower_surface = airfoil_data[25:]
-
-# Extract x and y values for upper and lower surfaces
-x_upper = upper_surface[:, 0]
-y_upper = upper_surface[:, 1]
-x_lower = lower_surface[:, 0]
-y_lower = lower_surface[:, 1]
-
-# Normalize x to be between 0 and 1 (as percentage of chord) for both surfaces
-x_upper_normalized = x_upper / x_upper[-1]  # Normalize by the last x-value of the upper surface
-x_lower_normalized = x_lower / x_lower[-1]  # Normalize by the last x-value of the lower surface
-
-# Interpolate y-values for a finer grid of x (as percentage) for both surfaces
-interp_upper = interp1d(x_upper_normalized, y_upper, kind='cubic', fill_value='extrapolate')
-interp_lower = interp1d(x_lower_normalized, y_lower, kind='cubic', fill_value='extrapolate')
-
-x_fine_upper = np.linspace(0, 1, 500)  # A finer grid for the upper surface (0 to 1)
-x_fine_lower = np.linspace(0, 1, 500)  # A finer grid for the lower surface (0 to 1)
-
-y_fine_upper = interp_upper(x_fine_upper)
-y_fine_lower = interp_lower(x_fine_lower)
-
-# Calculate the slope (dy/dx) using numerical differentiation for both surfaces
-slopes_upper = np.diff(y_fine_upper) / np.diff(x_fine_upper)
-slopes_lower = np.diff(y_fine_lower) / np.diff(x_fine_lower)
-
-# To match the length of the original data (since np.diff reduces the array size by 1)
-# Add NaN at the end to align with the original x and y arrays
-slopes_upper = np.concatenate(([np.nan], slopes_upper))
-slopes_lower = np.concatenate(([np.nan], slopes_lower))
-
-# Print the slopes for both surfaces
-print("Slopes of the upper surface (dy/dx):")
-print(slopes_upper)
-
-print("Slopes of the lower surface (dy/dx):")
-print(slopes_lower)
-
-# Plot the results
-plt.figure(figsize=(10, 8))
-
-# Plot the airfoil data for both surfaces
-plt.subplot(2, 1, 1)
-plt.plot(x_upper_normalized, y_upper, label='Upper Surface (Original)', color='b')
-plt.plot(x_lower_normalized, y_lower, label='Lower Surface (Original)', color='r')
-plt.plot(x_fine_upper, y_fine_upper, label='Upper Surface (Interpolated)', color='g', linestyle='--')
-plt.plot(x_fine_lower, y_fine_lower, label='Lower Surface (Interpolated)', color='orange', linestyle='--')
-plt.title('Airfoil Shape (Upper and Lower Surfaces)')
-plt.xlabel('x (Chord Position as Percentage)')
-plt.ylabel('y (Surface Height)')
-plt.grid(True)
-plt.legend()
-
-# Plot the slopes (dy/dx) for both surfaces
-plt.subplot(2, 1, 2)
-plt.plot(x_fine_upper, slopes_upper, label='Slopes (Upper Surface)', color='b')
-plt.plot(x_fine_lower, slopes_lower, label='Slopes (Lower Surface)', color='r')
-plt.title('Slopes of the Airfoil (dy/dx)')
-plt.xlabel('x (Chord Position as Percentage)')
-plt.ylabel('Slope (dy/dx)')
-plt.grid(True)
-plt.legend()
-
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+
+def main():
+    import matplotlib.pyplot as plt
+
+    # Split the data into upper and lower surfaces
+    upper_surface = airfoil_data[:25]
+    lower_surface = airfoil_data[25:]
+
+    # Extract x and y values for upper and lower surfaces
+    x_upper = upper_surface[:, 0]
+    y_upper = upper_surface[:, 1]
+    x_lower = lower_surface[:, 0]
+    y_lower = lower_surface[:, 1]
+
+    # Normalize x to be between 0 and 1 (as percentage of chord) for both surfaces
+    x_upper_normalized = x_upper / x_upper[-1]  # Normalize by the last x-value of the upper surface
+    x_lower_normalized = x_lower / x_lower[-1]  # Normalize by the last x-value of the lower surface
+
+    # Cubic splines of both surfaces over the normalized chord (built once by the geometry)
+    geometry = AirfoilGeometry(airfoil_data)
+    scale_factor = 1 / x_upper[-1]
+
+    x_fine_upper = np.linspace(0, 1, 500)  # A finer grid for the upper surface (0 to 1)
+    x_fine_lower = np.linspace(0, 1, 500)  # A finer grid for the lower surface (0 to 1)
+
+    y_fine_upper, _ = geometry.surfaces(x_fine_upper, scale_factor)
+    _, y_fine_lower = geometry.surfaces(x_fine_lower, scale_factor)
+
+    # Slope (dy/dx) of both surfaces from the spline derivatives
+    slopes_upper, _ = geometry.slopes(x_fine_upper, scale_factor)
+    _, slopes_lower = geometry.slopes(x_fine_lower, scale_factor)
+
+    # Print the slopes for both surfaces
+    print("Slopes of the upper surface (dy/dx):")
+    print(slopes_upper)
+
+    print("Slopes of the lower surface (dy/dx):")
+    print(slopes_lower)
+
+    # Plot the results
+    plt.figure(figsize=(10, 8))
+
+    # Plot the airfoil data for both surfaces
+    plt.subplot(2, 1, 1)
+    plt.plot(x_upper_normalized, y_upper, label='Upper Surface (Original)', color='b')
+    plt.plot(x_lower_normalized, y_lower, label='Lower Surface (Original)', color='r')
+    plt.plot(x_fine_upper, y_fine_upper, label='Upper Surface (Interpolated)', color='g', linestyle='--')
+    plt.plot(x_fine_lower, y_fine_lower, label='Lower Surface (Interpolated)', color='orange', linestyle='--')
+    plt.title('Airfoil Shape (Upper and Lower Surfaces)')
+    plt.xlabel('x (Chord Position as Percentage)')
+    plt.ylabel('y (Surface Height)')
+    plt.grid(True)
+    plt.legend()
+
+    # Plot the slopes (dy/dx) for both surfaces
+    plt.subplot(2, 1, 2)
+    plt.plot(x_fine_upper, slopes_upper, label='Slopes (Upper Surface)', color='b')
+    plt.plot(x_fine_lower, slopes_lower, label='Slopes (Lower Surface)', color='r')
+    plt.title('Slopes of the Airfoil (dy/dx)')
+    plt.xlabel('x (Chord Position as Percentage)')
+    plt.ylabel('Slope (dy/dx)')
+    plt.grid(True)
+    plt.legend()
+
+    plt.tight_layout()
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Reduction of low speed wind tunnel (LSWT) airfoil measurements.
+
+Submodules are imported on first use, so `import lswt` is cheap and the
+heavy dependencies (scipy, matplotlib) are only loaded by the code that
+needs them.
+"""
+import importlib
+
+_EXPORTS = {
+    "TunnelLog": "data",
+    "load_log": "data",
+    "parse_log": "data",
+    "LocalWorkers": "cluster",
+    "run_cluster": "cluster",
+    "align_campaigns": "compare",
+    "compare_campaigns": "compare",
+    "Dataset": "dataset",
+    "reconcile_drag": "dataset",
+    "AIRFOIL_DATA": "geometry",
+    "AirfoilGeometry": "geometry",
+    "process_airfoil": "geometry",
+    "get_slope": "geometry",
+    "calculate_cp": "pressure",
+    "calculate_cp_many": "pressure",
+    "load_chordwise_positions": "pressure",
+    "load_wake_positions": "pressure",
+    "calculate_polar": "polar",
+    "default_weights": "polar",
+    "polar_weights": "polar",
+    "reduce_polar": "polar",
+    "wake_drag": "wakedrag",
+    "wake_drag_runs": "wakedrag",
+    "screen_log": "health",
+    "screened_reduction": "health",
+    "masked_polar": "health",
+    "masked_wake_drag": "health",
+    "PanelSolver": "panel",
+    "compare_cp": "panel",
+    "PolarTable": "polartable",
+    "Blade": "bem",
+    "rotor_performance": "bem",
+    "iter_log": "stream",
+    "stream_reduce": "stream",
+    "polar_uncertainty": "uncertainty",
+    "Pipeline": "pipeline",
+    "PolarStore": "store",
+    "QueryService": "service",
+    "TimeSeries": "timeseries",
+    "welch": "spectral",
+    "spectral_table": "spectral",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,192 @@
+"""
+Blade element momentum (BEM) rotor performance from the measured polars.
+
+Every blade element of every operating point (tip speed ratio x pitch) is
+iterated at the same time as one array. Elements whose induction factors
+have converged are masked out of the following iterations, so the work
+shrinks as the solution settles and no Python loop runs over elements or
+operating points. Cl and Cd come from a PolarTable (measured sweep with
+Viterna extrapolation), whose uniform-grid lookup is the same cost for
+every element whatever angle of attack it reaches.
+
+The axial induction uses Prandtl tip and hub losses and the Spera
+correction above a = 0.2 (high thrust); results are non-dimensional
+(freestream velocity 1), so only the blade geometry needs units.
+"""
+import numpy as np
+
+from .polar import trapezoid_weights
+from .profiling import instrumented
+
+TOLERANCE = 1e-6  # Largest change of a and a' between iterations of a converged element
+MAX_ITERATIONS = 200
+RELAXATION = 0.5  # Fraction of the new induction factors taken every iteration
+MIN_RELAXATION = 0.02  # Smallest fraction, reached by elements that keep overshooting
+CRITICAL_INDUCTION = 0.2  # Axial induction above which the Spera (high thrust) correction applies
+
+# Columns of the per operating point table of `rotor_performance`
+PERFORMANCE_COLUMNS = ["tsr", "pitch", "cp", "ct", "cq", "converged"]
+
+
+class Blade:
+    """
+    Blade geometry: chord and twist at radial stations.
+
+    Parameters:
+        radius (numpy.ndarray): Increasing radial stations (m).
+        chord (numpy.ndarray): Chord at every station (m).
+        twist (numpy.ndarray): Twist at every station (degrees, positive towards feather).
+        blades (int): Number of blades.
+        hub_radius (float): Hub radius (m). Defaults to the first station.
+        tip_radius (float): Tip radius (m). Defaults to the last station.
+    """
+
+    def __init__(self, radius, chord, twist, blades=3, hub_radius=None, tip_radius=None):
+        self.radius = np.asarray(radius, dtype=float)
+        self.chord = np.broadcast_to(np.asarray(chord, dtype=float), self.radius.shape).copy()
+        self.twist = np.broadcast_to(np.asarray(twist, dtype=float), self.radius.shape).copy()
+        if self.radius.ndim != 1 or len(self.radius) < 2 or np.any(np.diff(self.radius) <= 0):
+            raise ValueError("A blade needs at least two increasing radial stations")
+        self.blades = int(blades)
+        self.hub_radius = float(self.radius[0] if hub_radius is None else hub_radius)
+        self.tip_radius = float(self.radius[-1] if tip_radius is None else tip_radius)
+        if not self.hub_radius <= self.radius[0] or not self.radius[-1] <= self.tip_radius:
+            raise ValueError("The radial stations must lie between the hub and tip radius")
+
+    @property
+    def solidity(self):
+        """Local solidity B c / (2 pi r) at every station."""
+        return self.blades * self.chord / (2 * np.pi * self.radius)
+
+
+def load_blade(file_path, blades=3, hub_radius=None, tip_radius=None):
+    """
+    Load a blade definition: whitespace separated radius (m), chord (m) and twist (degrees) per line.
+
+    Lines starting with '#' are comments.
+    """
+    table = np.loadtxt(file_path, comments="#", ndmin=2)
+    if table.shape[1] < 3:
+        raise ValueError(f"{file_path} must have radius, chord and twist columns")
+    return Blade(table[:, 0], table[:, 1], table[:, 2], blades, hub_radius, tip_radius)
+
+
+def _losses(blade, r, sin_phi):
+    """Prandtl tip and hub loss factor of every element."""
+    sin_phi = np.maximum(np.abs(sin_phi), 1e-6)
+    tip = blade.blades * (blade.tip_radius - r) / (2 * r * sin_phi)
+    hub = blade.blades * (r - blade.hub_radius) / (2 * blade.hub_radius * sin_phi) if blade.hub_radius > 0 else np.inf
+    loss = (2 / np.pi) ** 2 * np.arccos(np.exp(-tip)) * np.arccos(np.exp(-hub))
+    return np.maximum(loss, 1e-4)
+
+
+def _induction(blade, r, solidity, local_tsr, theta, a, a_prime, table, branch):
+    """One fixed-point update of the induction factors of a set of elements."""
+    phi = np.arctan2(1 - a, local_tsr * (1 + a_prime))
+    alpha = np.degrees(phi) - theta
+    coefficients = table.lookup(alpha, branch)
+    sin, cos = np.sin(phi), np.cos(phi)
+    cn = coefficients["cl"] * cos + coefficients["cd"] * sin
+    ct = coefficients["cl"] * sin - coefficients["cd"] * cos
+    loss = _losses(blade, r, sin)
+
+    # Axial induction with the Spera correction for heavily loaded elements
+    k = 4 * loss * sin**2 / np.where(np.abs(solidity * cn) > 1e-12, solidity * cn, 1e-12)
+    a_new = 1 / (k + 1)
+    high = a_new > CRITICAL_INDUCTION
+    if high.any():
+        kh = k[high] * (1 - 2 * CRITICAL_INDUCTION)
+        a_new[high] = 0.5 * (2 + kh - np.sqrt(np.maximum((kh + 2)**2 + 4 * (k[high] * CRITICAL_INDUCTION**2 - 1), 0)))
+    denominator = 4 * loss * sin * cos / np.where(np.abs(solidity * ct) > 1e-12, solidity * ct, 1e-12) - 1
+    a_prime_new = 1 / np.where(np.abs(denominator) > 1e-6, denominator, 1e-6)
+    return np.clip(a_new, -0.5, 0.99), np.clip(a_prime_new, -0.5, 2.0), phi, alpha, cn, ct
+
+
+@instrumented("bem.rotor_performance", rows=lambda result: result["cp"].size)
+def rotor_performance(table, blade, tsr, pitch, branch="all", tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS,
+                      relaxation=RELAXATION):
+    """
+    Solve the BEM equations for every combination of tip speed ratio and pitch at once.
+
+    Parameters:
+        table (PolarTable): Airfoil polars (all blade elements use the same airfoil).
+        blade (Blade): Blade geometry.
+        tsr (array_like): Tip speed ratios.
+        pitch (array_like): Blade pitch angles (degrees, positive towards feather).
+        branch (str): Polar table branch ("all", "up" or "down").
+        tolerance (float): Largest change of a and a' of a converged element.
+        max_iterations (int): Iterations before unconverged elements are given up.
+        relaxation (float): Fraction of the new induction factors taken every iteration (halved
+            for an element every time it overshoots).
+
+    Returns:
+        dict: "tsr", "pitch", the power, thrust and torque coefficients "cp", "ct", "cq" and the
+            fraction of "converged" elements (tsr x pitch), the element values "a", "a_prime",
+            "alpha", "phi" (tsr x pitch x stations), the "converged" mask of every element as
+            "element_converged" and the number of "iterations" run.
+    """
+    tsr = np.atleast_1d(np.asarray(tsr, dtype=float))
+    pitch = np.atleast_1d(np.asarray(pitch, dtype=float))
+    shape = (len(tsr), len(pitch), len(blade.radius))
+
+    # Every element of every operating point as one flat array
+    r = np.broadcast_to(blade.radius, shape).ravel()
+    solidity = np.broadcast_to(blade.solidity, shape).ravel()
+    local_tsr = (tsr[:, None, None] * blade.radius / blade.tip_radius + np.zeros(shape)).ravel()
+    theta = (blade.twist + pitch[None, :, None] + np.zeros(shape)).ravel()
+
+    a = np.full(r.size, 0.3)
+    a_prime = np.zeros(r.size)
+    step = np.zeros(r.size)
+    relax = np.full(r.size, float(relaxation))
+    converged = np.zeros(r.size, dtype=bool)
+    active = np.arange(r.size)
+    iterations = 0
+    while active.size and iterations < max_iterations:
+        iterations += 1
+        a_new, a_prime_new, _, _, cn, ct = _induction(blade, r[active], solidity[active], local_tsr[active],
+                                                      theta[active], a[active], a_prime[active], table, branch)
+        # Without finite coefficients (e.g. a NaN pitch) the loss and load guards would
+        # still give a finite induction, so such elements are given up instead
+        failed = ~(np.isfinite(cn) & np.isfinite(ct))
+        residual = a_new - a[active]
+        residual_prime = a_prime_new - a_prime[active]
+        done = (np.abs(residual) < tolerance) & (np.abs(residual_prime) < tolerance) & ~failed
+        # Elements that overshoot (the change of a flips sign) take smaller steps from then on
+        relax[active] = np.where(residual * step[active] < 0, np.maximum(0.5 * relax[active], MIN_RELAXATION),
+                                 relax[active])
+        delta = relax[active] * residual
+        delta_prime = relax[active] * residual_prime
+        a[active] += delta
+        a_prime[active] += delta_prime
+        step[active] = delta
+        converged[active[done]] = True
+        a[active[failed]] = a_prime[active[failed]] = np.nan
+        active = active[~(done | failed)]
+
+    # Loads from the final induction factors of every element
+    _, _, phi, alpha, cn, ct = _induction(blade, r, solidity, local_tsr, theta, a, a_prime, table, branch)
+    w2 = (1 - a)**2 + (local_tsr * (1 + a_prime))**2
+    thrust = (w2 * cn).reshape(shape) * blade.blades * blade.chord
+    torque = (w2 * ct).reshape(shape) * blade.blades * blade.chord * blade.radius
+
+    # Integrate dT/dr and dQ/dr over the stations, normalised by the swept area (V = 1)
+    weights = trapezoid_weights(blade.radius)
+    area = np.pi * blade.tip_radius**2
+    ct_rotor = thrust @ weights / area
+    cq = torque @ weights / (area * blade.tip_radius)
+    element_converged = converged.reshape(shape)
+    return {
+        "tsr": np.repeat(tsr[:, None], len(pitch), axis=1),
+        "pitch": np.repeat(pitch[None, :], len(tsr), axis=0),
+        "cp": cq * tsr[:, None],
+        "ct": ct_rotor,
+        "cq": cq,
+        "converged": element_converged.mean(axis=2),
+        "a": a.reshape(shape),
+        "a_prime": a_prime.reshape(shape),
+        "alpha": alpha.reshape(shape),
+        "phi": np.degrees(phi).reshape(shape),
+        "element_converged": element_converged,
+        "iterations": iterations,
+    }
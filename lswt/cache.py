@@ -0,0 +1,29 @@
+"""
+Bounded in-memory caches shared by the long-lived parts of lswt (the
+airfoil geometry tables, the query service).
+"""
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Mapping that keeps at most `size` items, dropping the least recently used one."""
+
+    def __init__(self, size):
+        self.size = size
+        self._items = OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            self._items.move_to_end(key)
+        except KeyError:
+            return default
+        return self._items[key]
+
+    def put(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.size:
+            self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
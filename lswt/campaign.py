@@ -0,0 +1,147 @@
+"""
+Reduce a whole test campaign (many raw tunnel logs) across a process pool.
+
+Every log is reduced independently (Cp, pressure polar and wake rake drag)
+and the per-file results are merged into one table tagged by source file.
+A log that fails to load or reduce is reported instead of aborting the batch.
+"""
+import glob
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .data import load_log
+
+# Columns of the merged result, one value per run
+RESULT_COLUMNS = ["run", "alpha", "cl", "cd", "cm", "x_cop", "cd_wake", "cd_wake_momentum", "cd_wake_pressure"]
+
+
+def is_tunnel_log(file_path):
+    """Return True if the file starts with a tunnel log header."""
+    try:
+        with open(file_path, 'r') as f:
+            header = f.readline().split()
+    except (OSError, UnicodeDecodeError):
+        return False
+    return header[:1] == ["Run_nr"]
+
+
+def find_logs(source):
+    """
+    Expand a directory, glob pattern or file name into a sorted list of tunnel logs.
+
+    Files in a directory are only picked up if they start with a tunnel log header.
+    """
+    if isinstance(source, (list, tuple)):
+        return [path for item in source for path in find_logs(item)]
+    if os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, "*"))
+        return sorted(path for path in paths if os.path.isfile(path) and is_tunnel_log(path))
+    paths = sorted(glob.glob(source))
+    return paths if paths else [source]
+
+
+def reduce_file(file_path, weights, cache=True):
+    """
+    Reduce one tunnel log to its per-run Cp, polar and wake rake drag.
+
+    Parameters:
+        file_path (str): Raw tunnel log.
+        weights (numpy.ndarray): Polar weights from `default_weights`.
+        cache (bool): Use the binary sidecar cache of the log.
+
+    Returns:
+        dict: Arrays of RESULT_COLUMNS plus "C_p" (runs x taps).
+    """
+    from .polar import calculate_polar
+    from .pressure import calculate_cp_many
+    from .wakedrag import wake_drag_runs
+
+    data = load_log(file_path, cache=cache)
+    runs = data.run
+    C_p, alpha, _ = calculate_cp_many(data, runs)
+    polar = calculate_polar(C_p, alpha, weights)
+    wake = wake_drag_runs(data, runs)
+
+    return {
+        "run": runs,
+        "alpha": polar["alpha"],
+        "cl": polar["cl"],
+        "cd": polar["cd"],
+        "cm": polar["cm"],
+        "x_cop": polar["x_cop"],
+        "cd_wake": wake["cd"],
+        "cd_wake_momentum": wake["cd_momentum"],
+        "cd_wake_pressure": wake["cd_pressure"],
+        "C_p": C_p,
+    }
+
+
+def _reduce_file_safe(file_path, weights, cache):
+    try:
+        return file_path, reduce_file(file_path, weights, cache), None
+    except Exception:
+        return file_path, None, traceback.format_exc()
+
+
+def merge_results(results):
+    """
+    Merge per-file results into one table.
+
+    Parameters:
+        results (dict): Per-file results from `reduce_file`, keyed by file path.
+
+    Returns:
+        dict: Concatenated arrays of RESULT_COLUMNS and "C_p", plus "source" (file of every run).
+    """
+    results = {path: result for path, result in results.items() if result is not None}
+    if not results:
+        merged = {name: np.empty(0) for name in RESULT_COLUMNS}
+        merged["C_p"] = np.empty((0, 0))
+        merged["source"] = np.empty(0, dtype=str)
+        return merged
+
+    merged = {name: np.concatenate([result[name] for result in results.values()]) for name in RESULT_COLUMNS}
+    merged["C_p"] = np.concatenate([result["C_p"] for result in results.values()])
+    merged["source"] = np.concatenate([np.full(len(result["run"]), path) for path, result in results.items()])
+    return merged
+
+
+def run_campaign(source, positions, workers=None, cache=True):
+    """
+    Reduce every tunnel log of a campaign in parallel.
+
+    Parameters:
+        source (str or list): Directory, glob pattern, file name, or a list of them.
+        positions (list): Chordwise tap positions (% chord).
+        workers (int): Number of worker processes (default: one per CPU). 1 runs in-process.
+        cache (bool): Use the binary sidecar caches of the logs.
+
+    Returns:
+        tuple: The merged result (see `merge_results`) and a dict of failed files
+            mapped to their traceback.
+    """
+    from .polar import default_weights
+
+    paths = find_logs(source)
+    # The weights only depend on the tap layout and geometry, so build them once
+    weights = default_weights(positions)
+
+    if workers == 1 or len(paths) <= 1:
+        outcomes = [_reduce_file_safe(path, weights, cache) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_reduce_file_safe, path, weights, cache) for path in paths]
+            outcomes = []
+            for path, future in zip(paths, futures):
+                try:
+                    outcomes.append(future.result())
+                except Exception:
+                    # The worker process itself died, report it like any other failure
+                    outcomes.append((path, None, traceback.format_exc()))
+
+    results = {path: result for path, result, _ in outcomes}
+    failures = {path: error for path, _, error in outcomes if error is not None}
+    return merge_results(results), failures
@@ -0,0 +1,576 @@
+"""
+Command line interface: `lswt cp|polar|wake <file>` (or `python -m lswt ...`).
+
+Results are written to stdout as whitespace separated tables. Plots are
+only made when an output location is given, and always headless.
+"""
+import argparse
+import sys
+
+CHORDWISE_POSITIONS_FILE = "positions p.txt"
+
+
+def _write_table(columns, names, out):
+    import numpy as np
+
+    np.savetxt(out, np.column_stack(columns), fmt="%.6g", delimiter="\t", header="\t".join(names), comments="")
+
+
+def _load(args):
+    from .data import load_log
+
+    return load_log(args.file, cache=not args.no_cache)
+
+
+def _runs(args, data):
+    return data.run if args.runs is None else args.runs
+
+
+def cmd_cp(args):
+    from .pressure import calculate_cp_many, SURFACE_TAPS
+
+    data = _load(args)
+    runs = _runs(args, data)
+    C_p, alpha, _ = calculate_cp_many(data, runs)
+    first, last = (data.column_index(name) for name in SURFACE_TAPS)
+    taps = data.columns[first:last + 1]
+    _write_table([runs, alpha, C_p], ["Run_nr", "Alpha"] + taps, args.out)
+
+
+def cmd_polar(args):
+    from .polar import default_weights, reduce_polar
+    from .pressure import load_chordwise_positions
+
+    data = _load(args)
+    weights = default_weights(load_chordwise_positions(args.positions))
+    polar = reduce_polar(data, weights, _runs(args, data))
+    names = ["run", "alpha", "cl", "cd", "cm", "x_cop"]
+    _write_table([polar[name] for name in names], names, args.out)
+
+    if args.plot_dir is not None:
+        from .plotting import plot_polar
+
+        plot_polar(polar, args.plot_dir)
+
+
+def cmd_wake(args):
+    from .wakedrag import wake_drag_runs
+
+    data = _load(args)
+    runs = _runs(args, data)
+    result = wake_drag_runs(data, runs)
+    names = ["alpha", "cd", "cd_momentum", "cd_pressure"]
+    _write_table([runs] + [result[name] for name in names], ["run"] + names, args.out)
+
+    if args.plot is not None:
+        from .plotting import plot_wake_drag
+
+        plot_wake_drag(result["alpha"], result["cd"], args.plot)
+
+
+def cmd_reconcile(args):
+    from .dataset import RECONCILIATION_COLUMNS, Dataset, load_column_map, reconcile_drag
+    from .polar import default_weights
+    from .pressure import load_chordwise_positions
+
+    column_map = None if args.column_map is None else load_column_map(args.column_map)
+    dataset = Dataset.load(args.file, column_map, cache=not args.no_cache)
+    table = reconcile_drag(dataset, default_weights(load_chordwise_positions(args.positions)), args.runs)
+    _write_table([table[name] for name in RECONCILIATION_COLUMNS], RECONCILIATION_COLUMNS, args.out)
+
+
+def cmd_health(args):
+    from .data import COLUMN_MAP
+    from .health import SCREENED_COLUMNS, flag_summary, screened_reduction
+    from .pressure import load_chordwise_positions
+
+    data = _load(args)
+    rows = slice(None) if args.runs is None else data.rows(args.runs)
+    limits = None if args.limits is None else tuple(args.limits)
+    table, flags = screened_reduction(data, load_chordwise_positions(args.positions), rows, cp_max=args.cp_max,
+                                      limits=limits)
+    _write_table([table[name] for name in SCREENED_COLUMNS], SCREENED_COLUMNS, args.out)
+
+    # Flagged ports with the number of runs per reason
+    for group in ("surface_taps", "rake_total", "rake_static"):
+        first, last = (data.column_index(column) for column in COLUMN_MAP[group])
+        summary = flag_summary(flags[group.replace("_taps", "")], data.columns[first:last + 1])
+        for port, reasons in summary.items():
+            described = ", ".join(f"{reason} in {count} runs" for reason, count in reasons.items())
+            print(f"lswt: {port} flagged: {described}", file=sys.stderr)
+
+
+def cmd_uncertainty(args):
+    from .pressure import load_chordwise_positions
+    from .uncertainty import UNCERTAINTY_COLUMNS, polar_uncertainty
+
+    data = _load(args)
+    result = polar_uncertainty(data, load_chordwise_positions(args.positions), _runs(args, data),
+                               samples=args.samples, confidence=args.confidence, seed=args.seed)
+    names = ["run", "alpha"] + [name + suffix for name in UNCERTAINTY_COLUMNS for suffix in ("", "_low", "_high")]
+    _write_table([result[name] for name in names], names, args.out)
+
+
+def cmd_campaign(args):
+    from .campaign import run_campaign
+    from .pressure import load_chordwise_positions
+
+    merged, failures = run_campaign(args.sources, load_chordwise_positions(args.positions), workers=args.workers,
+                                    cache=not args.no_cache)
+    _write_campaign(merged, failures, args.out)
+
+
+def _write_campaign(merged, failures, out):
+    from .campaign import RESULT_COLUMNS
+
+    print("\t".join(["source"] + RESULT_COLUMNS), file=out)
+    for i, source in enumerate(merged["source"]):
+        print("\t".join([source] + [f"{merged[name][i]:.6g}" for name in RESULT_COLUMNS]), file=out)
+
+    for path, error in failures.items():
+        print(f"lswt: {path} failed:\n{error}", file=sys.stderr)
+    if failures:
+        raise ValueError(f"{len(failures)} of {len(failures) + len(set(merged['source']))} files failed")
+
+
+def cmd_stream(args):
+    import numpy as np
+
+    from .campaign import RESULT_COLUMNS
+    from .polar import default_weights
+    from .pressure import load_chordwise_positions
+    from .stream import iter_log, stream_reduce
+
+    weights = default_weights(load_chordwise_positions(args.positions))
+    print("\t".join(RESULT_COLUMNS), file=args.out)
+    for block in stream_reduce(iter_log(args.file, args.chunk_runs), weights):
+        np.savetxt(args.out, np.column_stack([block[name] for name in RESULT_COLUMNS]), fmt="%.6g", delimiter="\t")
+
+
+def cmd_cluster(args):
+    from .cluster import LocalWorkers, run_cluster
+    from .pressure import load_chordwise_positions
+
+    positions = load_chordwise_positions(args.positions)
+    kwargs = dict(shard_runs=args.shard_runs, retries=args.retries, timeout=args.timeout, cache=not args.no_cache)
+    if args.local:
+        with LocalWorkers(args.local) as workers:
+            addresses = workers.addresses + (args.worker or [])
+            merged, failures = run_cluster(args.sources, positions, addresses, **kwargs)
+    elif args.worker:
+        merged, failures = run_cluster(args.sources, positions, args.worker, **kwargs)
+    else:
+        raise ValueError("Give the workers with --worker HOST:PORT or start local ones with --local N")
+    _write_campaign(merged, failures, args.out)
+
+
+def cmd_worker(args):
+    from .cluster import run_worker
+
+    def ready(port):
+        print(f"worker listening on {args.host}:{port}", file=sys.stderr, flush=True)
+
+    run_worker(args.host, args.port, ready=ready)
+
+
+def cmd_compare(args):
+    from .compare import align_campaigns, compare_campaigns, load_campaigns
+    from .pressure import load_chordwise_positions
+
+    positions = None if args.store else load_chordwise_positions(args.positions)
+    campaigns = load_campaigns(args.sources, positions, store=args.store, cache=not args.no_cache)
+    aligned = align_campaigns(campaigns, branch=args.branch, step=args.step)
+    comparison = compare_campaigns(aligned)
+
+    pairs = comparison["pairs"]
+    names = [name for name in pairs if name not in ("campaign_a", "campaign_b", "points")]
+    print("\t".join(["campaign_a", "campaign_b", "points"] + names), file=args.out)
+    for i in range(len(pairs["points"])):
+        values = [f"{pairs[name][i]:.6g}" for name in names]
+        print("\t".join([pairs["campaign_a"][i], pairs["campaign_b"][i], str(pairs["points"][i])] + values),
+              file=args.out)
+    if args.grid_out is not None:
+        grid = comparison["grid"]
+        _write_table(list(grid.values()), list(grid), args.grid_out)
+
+    repeatability = comparison["repeatability"]
+    for quantity in aligned["quantities"]:
+        repeat, reproduce = (f"{repeatability[f'{quantity}_{kind}_std']:.3g} "
+                             f"(limit {repeatability[f'{quantity}_{kind}_limit']:.3g})"
+                             for kind in ("repeat", "reproduce"))
+        print(f"{quantity:8s} repeatability {repeat}, reproducibility {reproduce}", file=sys.stderr)
+
+
+def cmd_pipeline(args):
+    from .campaign import RESULT_COLUMNS
+    from .pipeline import Pipeline
+
+    pipeline = Pipeline(args.file, args.positions, cache_dir=args.cache_dir, vinf=args.vinf,
+                        rake_positions_file=args.rake_positions, plot_dir=args.plot_dir)
+    result = pipeline.run()
+    _write_table([result[name] for name in RESULT_COLUMNS], RESULT_COLUMNS, args.out)
+    for stage, status, rows, seconds in pipeline.report:
+        print(f"{stage:10s} {status:14s} {rows:8d} rows {seconds * 1000:9.1f} ms", file=sys.stderr)
+
+
+def cmd_store(args):
+    from .campaign import find_logs, run_campaign
+    from .pipeline import Pipeline
+    from .pressure import load_chordwise_positions
+    from .store import PolarStore
+
+    paths = find_logs(args.sources)
+    positions = load_chordwise_positions(args.positions)
+    if len(paths) == 1:
+        result = Pipeline(paths[0], args.positions).run()
+    else:
+        result, failures = run_campaign(paths, positions, workers=args.workers)
+        if failures:
+            raise ValueError(f"{len(failures)} of {len(paths)} files failed: {sorted(failures)}")
+    PolarStore(args.store).write(args.campaign, result, positions=positions)
+    print(f"{len(result['run'])} runs stored as {args.campaign!r} in {args.store}", file=args.out)
+
+
+def cmd_serve(args):
+    from .service import run_service
+
+    print(f"serving {args.store} on http://{args.host}:{args.port}", file=sys.stderr)
+    run_service(args.store, args.host, args.port)
+
+
+def cmd_average(args):
+    from .timeseries import TimeSeries
+
+    series = TimeSeries(args.directory)
+    series.write_averaged_log(args.log, args.runs, chunk_samples=args.chunk_samples)
+    print(f"{len(args.runs or series.runs)} time-averaged runs written to {args.log}", file=sys.stderr)
+
+
+def cmd_spectra(args):
+    from .campaign import RESULT_COLUMNS
+    from .polar import default_weights
+    from .pressure import load_chordwise_positions
+    from .spectral import SPECTRAL_COLUMNS, spectral_table
+    from .timeseries import TimeSeries
+
+    weights = default_weights(load_chordwise_positions(args.positions))
+    table = spectral_table(TimeSeries(args.directory), weights, args.runs, nperseg=args.nperseg,
+                           min_frequency=args.min_frequency)
+    names = RESULT_COLUMNS + SPECTRAL_COLUMNS
+    _write_table([table[name] for name in names], names, args.out)
+
+
+def cmd_panel(args):
+    from .panel import COMPARISON_COLUMNS, PanelSolver, compare_cp
+    from .pressure import calculate_cp_many, load_chordwise_positions, SURFACE_TAPS
+
+    data = _load(args)
+    runs = _runs(args, data)
+    C_p, alpha, _ = calculate_cp_many(data, runs)
+    comparison = compare_cp(C_p, alpha, load_chordwise_positions(args.positions), PanelSolver(panels=args.panels))
+    _write_table([runs, alpha] + [comparison[name] for name in COMPARISON_COLUMNS],
+                 ["run", "alpha"] + COMPARISON_COLUMNS, args.out)
+
+    if args.predicted is not None:
+        first, last = (data.column_index(name) for name in SURFACE_TAPS)
+        with open(args.predicted, 'w') as f:
+            _write_table([runs, alpha, comparison["C_p_panel"]], ["Run_nr", "Alpha"] + data.columns[first:last + 1], f)
+
+
+def cmd_table(args):
+    from .polar import default_weights, reduce_polar
+    from .polartable import TABLE_COLUMNS, PolarTable
+    from .pressure import load_chordwise_positions
+    from .wakedrag import wake_drag_runs
+
+    data = _load(args)
+    runs = _runs(args, data)
+    polar = reduce_polar(data, default_weights(load_chordwise_positions(args.positions)), runs)
+    cd = wake_drag_runs(data, runs)["cd"] if args.drag == "wake" else polar["cd"]
+    table = PolarTable.from_polar(polar["alpha"], polar["cl"], cd, polar["cm"], data.sweep_direction[data.rows(runs)],
+                                  step=args.step, method=args.method, cd_max=args.cd_max)
+    table.save(args.table)
+    values = table.lookup(table.alpha)
+    _write_table([table.alpha] + [values[name] for name in TABLE_COLUMNS], ["alpha"] + TABLE_COLUMNS, args.out)
+    print(f"{table.points} points per branch, branches {table.branches}, written to {args.table}", file=sys.stderr)
+
+
+def _polar_table(args):
+    """Load a saved polar table, or build one from a raw log like `lswt table` does."""
+    from .polartable import PolarTable
+
+    if args.table is not None:
+        return PolarTable.load(args.table)
+    if args.file is None:
+        raise ValueError("give a raw tunnel log or a polar table (--table)")
+    from .polar import default_weights, reduce_polar
+    from .pressure import load_chordwise_positions
+    from .wakedrag import wake_drag_runs
+
+    data = _load(args)
+    polar = reduce_polar(data, default_weights(load_chordwise_positions(args.positions)))
+    cd = wake_drag_runs(data)["cd"] if args.drag == "wake" else polar["cd"]
+    return PolarTable.from_polar(polar["alpha"], polar["cl"], cd, polar["cm"], data.sweep_direction)
+
+
+def cmd_bem(args):
+    import numpy as np
+
+    from .bem import PERFORMANCE_COLUMNS, load_blade, rotor_performance
+
+    blade = load_blade(args.blade, args.blades, args.hub_radius, args.tip_radius)
+    tsr = np.linspace(args.tsr[0], args.tsr[1], int(args.tsr[2]))
+    pitch = np.linspace(args.pitch[0], args.pitch[1], int(args.pitch[2]))
+    result = rotor_performance(_polar_table(args), blade, tsr, pitch, branch=args.branch)
+    _write_table([result[name].ravel() for name in PERFORMANCE_COLUMNS], PERFORMANCE_COLUMNS, args.out)
+    unconverged = (~result["element_converged"]).sum()
+    if unconverged:
+        print(f"lswt: {unconverged} of {result['element_converged'].size} blade elements did not converge",
+              file=sys.stderr)
+
+
+def cmd_render(args):
+    from .pressure import load_chordwise_positions
+    from .render import render_log
+
+    result = render_log(_load(args), load_chordwise_positions(args.positions), args.out_dir, workers=args.workers,
+                        force=args.force)
+    print(f"{len(result['rendered'])} rendered, {len(result['skipped'])} unchanged", file=args.out)
+    for file_name, error in result["failed"].items():
+        print(f"lswt: {file_name} failed:\n{error}", file=sys.stderr)
+    if result["failed"]:
+        raise ValueError(f"{len(result['failed'])} plots failed")
+
+
+def cmd_live(args):
+    from .live import LIVE_COLUMNS, LiveReduction
+    from .polar import default_weights
+    from .pressure import load_chordwise_positions
+
+    live = LiveReduction(args.file, default_weights(load_chordwise_positions(args.positions)))
+    print("\t".join(LIVE_COLUMNS), file=args.out, flush=True)
+
+    def report(result):
+        for i in range(len(result["run"])):
+            print("\t".join(f"{result[name][i]:.6g}" for name in LIVE_COLUMNS), file=args.out, flush=True)
+
+    live.follow(report, interval=args.interval, timeout=args.timeout)
+
+
+def cmd_dashboard(args):
+    from .dashboard import run_dashboard
+    from .pressure import load_chordwise_positions
+
+    dashboard = run_dashboard(args.file, load_chordwise_positions(args.positions), interval=args.interval,
+                              timeout=args.timeout, headless=args.headless)
+    if args.save is not None:
+        dashboard.figure.savefig(args.save)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="lswt", description="Reduce low speed wind tunnel airfoil measurements.")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="write the time, calls, rows and peak memory of every stage to FILE (JSON) and a CSV")
+    parser.add_argument("--profile-trace", action="store_true",
+                        help="with --profile, also write a flamegraph-compatible collapsed-stack trace (.folded)")
+    parser.add_argument("--profile-no-memory", action="store_true",
+                        help="with --profile, skip the peak memory (tracemalloc slows allocation-heavy stages)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_command(name, func, help):
+        command = commands.add_parser(name, help=help)
+        command.add_argument("file", help="raw tunnel log")
+        command.add_argument("--runs", type=int, nargs="+", help="run numbers to reduce (default: all)")
+        command.add_argument("--no-cache", action="store_true", help="do not read or write the binary cache")
+        command.add_argument("--out", type=argparse.FileType("w"), default=sys.stdout, help="output table")
+        command.set_defaults(func=func)
+        return command
+
+    add_command("cp", cmd_cp, "surface pressure coefficients per run")
+
+    polar = add_command("polar", cmd_polar, "Cl, Cd, Cm and x_cop per run from the surface taps")
+    polar.add_argument("--positions", default=CHORDWISE_POSITIONS_FILE, help="chordwise tap positions file")
+    polar.add_argument("--plot-dir", help="write the polar plots (PDF) to this directory")
+
+    wake = add_command("wake", cmd_wake, "wake rake drag per run")
+    wake.add_argument("--plot", help="write the drag plot to this file")
+
+    reconcile = add_command("reconcile", cmd_reconcile, "surface pressure drag next to the wake rake drag per run")
+    reconcile.add_argument("--positions", default=CHORDWISE_POSITIONS_FILE, help="chordwise tap positions file")
+    reconcile.add_argument("--column-map", help="JSON file mapping channels (surface_taps, rake_total, rake_static, "
+                                                "reference, ...) to columns of the log")
+
+    health = add_command("health", cmd_health, "polar and wake drag over the taps and probes that pass screening")
+    health.add_argument("--positions", default=CHORDWISE_POSITIONS_FILE, help="chordwise tap positions file")
+    health.add_argument("--cp-max", type=float, default=1.15, help="largest physical pressure coefficient")
+    health.add_argument("--limits", type=float, nargs=2, metavar=("LOW", "HIGH"), help="transducer range (Pa)")
+
+    uncertainty = add_command("uncertainty", cmd_uncertainty,
+                              "Monte Carlo confidence intervals of Cl, Cd, Cm and wake Cd")
+    uncertainty.add_argument("--positions", default=CHORDWISE_POSITIONS_FILE, help="chordwise tap positions file")
+    uncertainty.add_argument("--samples", type=int, default=2000, help="samples per run")
+    uncertainty.add_argument("--confidence", type=float, default=0.95, help="coverage of the intervals")
+    uncertainty.add_argument("--seed", type=int, help="random seed, for reproducible intervals")
+
+    panel = add_command("panel", cmd_panel, "measured Cp against an inviscid panel method prediction per run")
+    panel.add_argument("--positions", default=CHORDWISE_POSITIONS_FILE, help="chordwise tap positions file")
+    panel.add_argument("--panels", type=int, default=400, help="number of panels around the airfoil (even)")
+    panel.add_argument("--predicted", help="write the panel Cp at the taps to this file, laid out like `lswt cp`")
+
+    table = add_command("table", cmd_table, "Cl, Cd and Cm lookup tables from -180 to 180 degrees (binary file)")
+    table.add_argument("--table", required=True, help="polar table file to write")
+    table.add_argument("--positions", default=CHORDWISE_POSITIONS_FILE, help="chordwise tap positions file")
+    table.add_argument("--drag", choices=["pressure", "wake"], default="pressure", help="source of the measured Cd")
+    table.add_argument("--step", type=float, default=0.1, help="grid spacing (degrees), must divide 360")
+    table.add_argument("--method", choices=["pchip", "linear"], default="pchip", help="resampling of the measured range")
+    table.add_argument("--cd-max", type=float, default=2.0, help="drag at 90 degrees of the Viterna extrapolation")
+
+    render = add_command("render", cmd_render, "Cp, wake profile and polar plots (headless, skips unchanged plots)")
+    render.add_argument("--positions", default=CHORDWISE_POSITIONS_FILE, help="chordwise tap positions file")
+    render.add_argument("--out-dir", default="coefficients of pressure", help="output directory")
+    render.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    render.add_argument("--force", action="store_true", help="re-render unchanged plots")
+
+    stream = commands.add_parser("stream", help="polar and wake drag of a log larger than memory, in blocks of runs")
+    stream.add_argument("file", help="raw tunnel log")
+    stream.add_argument("--positions", default=CHORDWISE_POSITIONS_FILE, help="chordwise tap positions file")
+    stream.add_argument("--chunk-runs", type=int, default=10000, help="runs parsed and reduced at once")
+    stream.add_argument("--out", type=argparse.FileType("w"), default=sys.stdout, help="output table")
+    stream.set_defaults(func=cmd_stream)
+
+    pipeline = commands.add_parser("pipeline", help="polar and wake drag, recomputing only the stages that changed")
+    pipeline.add_argument("file", help="raw tunnel log")
+    pipeline.add_argument("--positions", default=CHORDWISE_POSITIONS_FILE, help="chordwise tap positions file")
+    pipeline.add_argument("--rake-positions", help="total pressure probe positions file (mm)")
+    pipeline.add_argument("--vinf", type=float, default=19.515, help="freestream velocity used for Cp (m/s)")
+    pipeline.add_argument("--cache-dir", help="stage cache directory (default: .lswt-cache next to the log)")
+    pipeline.add_argument("--plot-dir", help="write the Cp, wake profile and polar plots to this directory")
+    pipeline.add_argument("--out", type=argparse.FileType("w"), default=sys.stdout, help="output table")
+    pipeline.set_defaults(func=cmd_pipeline)
+
+    store = commands.add_parser("store", help="reduce logs and write the per-run results to a polar store")
+    store.add_argument("sources", nargs="+", help="raw tunnel logs, glob patterns or directories of one campaign")
+    store.add_argument("--store", required=True, help="store directory")
+    store.add_argument("--campaign", required=True, help="campaign name (replaces a stored campaign of that name)")
+    store.add_argument("--positions", default=CHORDWISE_POSITIONS_FILE, help="chordwise tap positions file")
+    store.add_argument("--workers", type=int, help="worker processes for several logs (default: one per CPU)")
+    store.add_argument("--out", type=argparse.FileType("w"), default=sys.stdout, help="output messages")
+    store.set_defaults(func=cmd_store)
+
+    serve = commands.add_parser("serve", help="answer polar and Cp queries from a polar store over HTTP")
+    serve.add_argument("--store", required=True, help="store directory")
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    serve.add_argument("--port", type=int, default=8765, help="port to listen on")
+    serve.set_defaults(func=cmd_serve)
+
+    average = commands.add_parser("average", help="time-average the runs of a time-series directory into a raw log")
+    average.add_argument("directory", help="time-series directory")
+    average.add_argument("--log", required=True, help="raw tunnel log to write")
+    average.add_argument("--runs", type=int, nargs="+", help="run numbers to average (default: all)")
+    average.add_argument("--chunk-samples", type=int, default=16384, help="samples per port processed at once")
+    average.set_defaults(func=cmd_average)
+
+    spectra = commands.add_parser("spectra", help="polar with the dominant frequency and Strouhal number per run")
+    spectra.add_argument("directory", help="time-series directory")
+    spectra.add_argument("--runs", type=int, nargs="+", help="run numbers to reduce (default: all)")
+    spectra.add_argument("--positions", default=CHORDWISE_POSITIONS_FILE, help="chordwise tap positions file")
+    spectra.add_argument("--nperseg", type=int, default=1024, help="samples per Welch segment")
+    spectra.add_argument("--min-frequency", type=float, default=1.0, help="ignore content below this frequency (Hz)")
+    spectra.add_argument("--out", type=argparse.FileType("w"), default=sys.stdout, help="output table")
+    spectra.set_defaults(func=cmd_spectra)
+
+    bem = commands.add_parser("bem", help="rotor power and thrust over a tip speed ratio x pitch grid (BEM)")
+    bem.add_argument("file", nargs="?", help="raw tunnel log to build the polar table from")
+    bem.add_argument("--table", help="polar table written by `lswt table` (instead of a raw log)")
+    bem.add_argument("--blade", required=True, help="blade file: radius (m), chord (m) and twist (deg) per line")
+    bem.add_argument("--blades", type=int, default=3, help="number of blades")
+    bem.add_argument("--hub-radius", type=float, help="hub radius (m, default: first station)")
+    bem.add_argument("--tip-radius", type=float, help="tip radius (m, default: last station)")
+    bem.add_argument("--tsr", type=float, nargs=3, default=[2, 12, 41], metavar=("FIRST", "LAST", "COUNT"),
+                     help="tip speed ratios")
+    bem.add_argument("--pitch", type=float, nargs=3, default=[-5, 15, 21], metavar=("FIRST", "LAST", "COUNT"),
+                     help="pitch angles (degrees)")
+    bem.add_argument("--branch", default="all", help="polar table branch: all, up or down")
+    bem.add_argument("--positions", default=CHORDWISE_POSITIONS_FILE, help="chordwise tap positions file")
+    bem.add_argument("--drag", choices=["pressure", "wake"], default="wake", help="source of the measured Cd")
+    bem.add_argument("--no-cache", action="store_true", help="do not read or write the binary cache")
+    bem.add_argument("--out", type=argparse.FileType("w"), default=sys.stdout, help="output table")
+    bem.set_defaults(func=cmd_bem)
+
+    live = commands.add_parser("live", help="follow a growing log and reduce every new run as it arrives")
+    live.add_argument("file", help="raw tunnel log being written by the acquisition system")
+    live.add_argument("--positions", default=CHORDWISE_POSITIONS_FILE, help="chordwise tap positions file")
+    live.add_argument("--interval", type=float, default=0.2, help="seconds between polls")
+    live.add_argument("--timeout", type=float, help="stop after this many seconds without new runs")
+    live.add_argument("--out", type=argparse.FileType("w"), default=sys.stdout, help="output table")
+    live.set_defaults(func=cmd_live)
+
+    dashboard = commands.add_parser("dashboard", help="live plots of the running polar and the current run")
+    dashboard.add_argument("file", help="raw tunnel log being written by the acquisition system")
+    dashboard.add_argument("--positions", default=CHORDWISE_POSITIONS_FILE, help="chordwise tap positions file")
+    dashboard.add_argument("--interval", type=float, default=0.1, help="seconds between polls")
+    dashboard.add_argument("--timeout", type=float, help="stop after this many seconds without new runs")
+    dashboard.add_argument("--headless", action="store_true", help="render offscreen instead of opening a window")
+    dashboard.add_argument("--save", help="save the last frame to this image file when the dashboard stops")
+    dashboard.set_defaults(func=cmd_dashboard)
+
+    campaign = commands.add_parser("campaign", help="polar and wake drag of many logs, merged by source file")
+    campaign.add_argument("sources", nargs="+", help="raw tunnel logs, glob patterns or directories")
+    campaign.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    campaign.add_argument("--positions", default=CHORDWISE_POSITIONS_FILE, help="chordwise tap positions file")
+    campaign.add_argument("--no-cache", action="store_true", help="do not read or write the binary caches")
+    campaign.add_argument("--out", type=argparse.FileType("w"), default=sys.stdout, help="output table")
+    campaign.set_defaults(func=cmd_campaign)
+
+    compare = commands.add_parser("compare", help="pairwise differences and repeatability of repeated campaigns")
+    compare.add_argument("sources", nargs="+", help="one raw log, glob pattern or directory per campaign "
+                         "(campaign names with --store)")
+    compare.add_argument("--store", help="read the campaigns from this polar store")
+    compare.add_argument("--branch", choices=["all", "up", "down"], default="all",
+                         help="hysteresis branch: all runs, or increasing or decreasing alpha only")
+    compare.add_argument("--step", type=float, default=0.5, help="spacing of the common alpha grid (degrees)")
+    compare.add_argument("--positions", default=CHORDWISE_POSITIONS_FILE, help="chordwise tap positions file")
+    compare.add_argument("--no-cache", action="store_true", help="do not read or write the binary caches")
+    compare.add_argument("--grid-out", type=argparse.FileType("w"), help="write the spread per grid alpha to this file")
+    compare.add_argument("--out", type=argparse.FileType("w"), default=sys.stdout, help="output table")
+    compare.set_defaults(func=cmd_compare)
+
+    cluster = commands.add_parser("cluster", help="polar and wake drag of many logs, sharded across TCP workers")
+    cluster.add_argument("sources", nargs="+", help="raw tunnel logs, glob patterns or directories")
+    cluster.add_argument("--worker", action="append", metavar="HOST:PORT",
+                         help="address of an `lswt worker` process (repeat for every worker)")
+    cluster.add_argument("--local", type=int, help="start this many workers on this machine")
+    cluster.add_argument("--shard-runs", type=int, help="runs per shard (default: one shard per log)")
+    cluster.add_argument("--retries", type=int, default=3, help="times a shard is resent after its worker failed")
+    cluster.add_argument("--timeout", type=float, default=600.0, help="seconds a worker may take for one shard")
+    cluster.add_argument("--positions", default=CHORDWISE_POSITIONS_FILE, help="chordwise tap positions file")
+    cluster.add_argument("--no-cache", action="store_true", help="do not read or write the binary caches")
+    cluster.add_argument("--out", type=argparse.FileType("w"), default=sys.stdout, help="output table")
+    cluster.set_defaults(func=cmd_cluster)
+
+    worker = commands.add_parser("worker", help="reduce shards sent by `lswt cluster` over TCP")
+    worker.add_argument("--host", default="127.0.0.1", help="address to listen on (0.0.0.0 for remote coordinators)")
+    worker.add_argument("--port", type=int, default=8766, help="port to listen on (0 for any free port)")
+    worker.set_defaults(func=cmd_worker)
+
+    return parser
+
+
+def main(argv=None):
+    from . import profiling
+
+    args = build_parser().parse_args(argv)
+    profiler = None
+    if args.profile is not None:
+        profiler = profiling.enable(memory=not args.profile_no_memory)
+    try:
+        with profiling.stage(args.command):
+            args.func(args)
+    except (OSError, KeyError, ValueError) as error:
+        print(f"lswt: error: {error}", file=sys.stderr)
+        return 1
+    finally:
+        if profiler is not None:
+            profiling.disable()
+            profiler.write(args.profile, trace=args.profile_trace)
+    return 0
@@ -0,0 +1,411 @@
+"""
+Campaign reduction sharded across worker processes reachable over TCP.
+
+A worker (`lswt worker`) listens on a port and reduces the shards it is
+sent: the rows `start:stop` of one raw log, with the same Cp, polar and
+wake rake drag functions as `campaign.reduce_file`. The coordinator
+(`run_cluster`) splits the logs of a campaign into shards, keeps one shard
+in flight per worker and merges the results in file and row order, so the
+merged table equals the one of `run_campaign`. Workers read the logs
+themselves, so every node must see them under the same path.
+
+Messages are frames of a one-byte kind and a little-endian payload length.
+Shards go out as JSON; results come back as a JSON header followed by the
+raw float64 (int64 for the run numbers) arrays of RESULT_COLUMNS and C_p.
+
+A worker that cannot be reached, drops the connection or exceeds the
+timeout is a failed worker: its shard goes back in the queue for another
+worker (up to `retries` times) and the coordinator reconnects to it before
+giving it up. A shard that raises in the reduction fails its file at once,
+as it would fail the same way on any worker.
+
+`LocalWorkers` starts workers on 127.0.0.1 in local processes, standing in
+for remote nodes on a single machine.
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import struct
+import traceback
+
+import numpy as np
+
+from .campaign import RESULT_COLUMNS, find_logs, merge_results
+from .data import HEADER_LINES, load_log
+
+DEFAULT_PORT = 8766
+RETRIES = 3  # Times a shard is sent again after the worker it was sent to failed
+TASK_TIMEOUT = 600.0  # Seconds a worker may take for one shard before it counts as failed
+CONNECT_TIMEOUT = 5.0  # Seconds to wait for a connection to a worker
+RECONNECT_DELAY = 0.5  # Seconds before reconnecting to a failed worker (times the attempt number)
+
+# Frame kinds: shard (coordinator -> worker), result and error (worker -> coordinator)
+TASK, RESULT, ERROR = b"T", b"R", b"E"
+FRAME = struct.Struct("<cQ")
+RESULT_HEADER = struct.Struct("<I")
+
+
+# Last log loaded by this worker process, so shards of the same log are parsed once
+_loaded = {}
+
+
+class WorkerError(Exception):
+    """A worker that failed (unreachable, disconnected or too slow) rather than its shard."""
+
+
+def parse_address(address, default_port=DEFAULT_PORT):
+    """Return (host, port) of a "host:port" string (or a (host, port) pair)."""
+    if isinstance(address, (list, tuple)):
+        return address[0], int(address[1])
+    host, _, port = address.rpartition(":")
+    if not host:
+        return port or "127.0.0.1", default_port
+    try:
+        return host, int(port)
+    except ValueError:
+        raise ValueError(f"Invalid worker address {address!r}, expected host:port") from None
+
+
+def count_rows(file_path):
+    """Return an upper bound of the number of runs of a raw log (its lines after the header)."""
+    lines = 0
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            lines += chunk.count(b"\n")
+    return max(lines + 1 - HEADER_LINES, 0)
+
+
+def plan_shards(paths, shard_runs=None):
+    """
+    Split logs into shards of at most `shard_runs` rows (one shard per log by default).
+
+    Returns:
+        list: Shard dicts with "path", "start" and "stop" (None for the end of the log).
+    """
+    if shard_runs is not None and shard_runs < 1:
+        raise ValueError(f"shard_runs must be at least 1, got {shard_runs}")
+    shards = []
+    for path in paths:
+        if shard_runs is None:
+            shards.append({"path": path, "start": 0, "stop": None})
+            continue
+        rows = max(count_rows(path), 1)
+        shards.extend({"path": path, "start": start, "stop": start + shard_runs}
+                      for start in range(0, rows, shard_runs))
+    return shards
+
+
+def reduce_shard(path, start, stop, weights, cache=True):
+    """
+    Reduce the rows `start:stop` of one tunnel log, like `campaign.reduce_file` does for all of them.
+
+    The log stays loaded until a shard of another log (or a changed file) arrives.
+
+    Returns:
+        dict: Arrays of RESULT_COLUMNS plus "C_p" (runs x taps).
+    """
+    from .polar import calculate_polar
+    from .pressure import calculate_cp_rows
+    from .wakedrag import wake_drag_rows
+
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    data = _loaded.get(key)
+    if data is None:
+        data = load_log(path, cache=cache)
+        _loaded.clear()
+        _loaded[key] = data
+    rows = slice(start, stop)
+    C_p, alpha, _ = calculate_cp_rows(data, rows)
+    polar = calculate_polar(C_p, alpha, weights)
+    wake = wake_drag_rows(data, rows)
+    return {
+        "run": data.run[rows],
+        "alpha": polar["alpha"],
+        "cl": polar["cl"],
+        "cd": polar["cd"],
+        "cm": polar["cm"],
+        "x_cop": polar["x_cop"],
+        "cd_wake": wake["cd"],
+        "cd_wake_momentum": wake["cd_momentum"],
+        "cd_wake_pressure": wake["cd_pressure"],
+        "C_p": C_p,
+    }
+
+
+def encode_result(task, result):
+    """Encode a shard result as a JSON header followed by the raw arrays."""
+    arrays = [np.ascontiguousarray(result[name], dtype="<i8" if name == "run" else "<f8") for name in RESULT_COLUMNS]
+    arrays.append(np.ascontiguousarray(result["C_p"], dtype="<f8"))
+    header = json.dumps({
+        "task": task,
+        "runs": len(result["run"]),
+        "taps": result["C_p"].shape[1] if result["C_p"].ndim == 2 else 0,
+        "columns": RESULT_COLUMNS,
+    }).encode()
+    return b"".join([RESULT_HEADER.pack(len(header)), header] + [array.tobytes() for array in arrays])
+
+
+def decode_result(payload):
+    """Decode a payload written by `encode_result` into (task, result)."""
+    (length,) = RESULT_HEADER.unpack_from(payload)
+    header = json.loads(payload[RESULT_HEADER.size:RESULT_HEADER.size + length])
+    runs, taps = header["runs"], header["taps"]
+    offset = RESULT_HEADER.size + length
+    result = {}
+    for name in header["columns"]:
+        dtype = np.dtype("<i8" if name == "run" else "<f8")
+        result[name] = np.frombuffer(payload, dtype=dtype, count=runs, offset=offset)
+        offset += runs * dtype.itemsize
+    result["C_p"] = np.frombuffer(payload, dtype="<f8", count=runs * taps, offset=offset).reshape(runs, taps)
+    return header["task"], result
+
+
+async def read_frame(reader):
+    """Read one frame and return (kind, payload)."""
+    kind, length = FRAME.unpack(await reader.readexactly(FRAME.size))
+    return kind, await reader.readexactly(length)
+
+
+def write_frame(writer, kind, payload):
+    writer.write(FRAME.pack(kind, len(payload)) + payload)
+
+
+def _run_task(task):
+    """Reduce the shard of a task message and return the reply frame."""
+    try:
+        result = reduce_shard(task["path"], task["start"], task["stop"], np.asarray(task["weights"], dtype=float),
+                              task.get("cache", True))
+        return RESULT, encode_result(task["task"], result)
+    except Exception:
+        return ERROR, json.dumps({"task": task["task"], "error": traceback.format_exc()}).encode()
+
+
+async def handle_worker_connection(reader, writer):
+    """Reduce the shards sent over one coordinator connection, one at a time."""
+    try:
+        while True:
+            try:
+                kind, payload = await read_frame(reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            if kind != TASK:
+                return
+            # The reduction runs in a thread so the event loop keeps serving other connections
+            reply = await asyncio.to_thread(_run_task, json.loads(payload))
+            write_frame(writer, *reply)
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+async def serve_worker(host="127.0.0.1", port=DEFAULT_PORT, ready=None):
+    """Serve shards until cancelled; `ready` is called with the bound port once listening."""
+    server = await asyncio.start_server(handle_worker_connection, host, port)
+    async with server:
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[1])
+        await server.serve_forever()
+
+
+def run_worker(host="127.0.0.1", port=DEFAULT_PORT, ready=None):
+    """Serve shards on a port until interrupted."""
+    try:
+        asyncio.run(serve_worker(host, port, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+class _Connection:
+    """Coordinator side of the connection to one worker, reconnecting after failures."""
+
+    def __init__(self, address, timeout):
+        self.address = address
+        self.timeout = timeout
+        self.reader = self.writer = None
+
+    async def connect(self):
+        self.close()
+        try:
+            self.reader, self.writer = await asyncio.wait_for(asyncio.open_connection(*self.address),
+                                                              CONNECT_TIMEOUT)
+        except (OSError, asyncio.TimeoutError) as error:
+            raise WorkerError(f"Cannot connect to worker {self.address[0]}:{self.address[1]}: {error}") from None
+
+    async def send(self, task):
+        """Send a task and return the reply frame."""
+        try:
+            write_frame(self.writer, TASK, json.dumps(task).encode())
+            await self.writer.drain()
+            return await asyncio.wait_for(read_frame(self.reader), self.timeout)
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as error:
+            self.close()
+            host, port = self.address
+            raise WorkerError(f"Worker {host}:{port} failed: {error!r}") from None
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def _coordinate(tasks, addresses, retries, timeout):
+    """
+    Send every task to the workers and return (results, errors), both keyed by task id.
+
+    Every worker takes the next shard of a shared queue as soon as it has
+    answered the previous one, so fast workers take more shards.
+    """
+    queue = asyncio.Queue()
+    for task in tasks:
+        queue.put_nowait((task, 0))
+    results, errors = {}, {}
+    remaining = len(tasks)
+
+    def finish(task_id, result=None, error=None):
+        nonlocal remaining
+        if error is None:
+            results[task_id] = result
+        else:
+            errors[task_id] = error
+        remaining -= 1
+        if remaining == 0:
+            for _ in addresses:
+                queue.put_nowait(None)
+
+    async def drive(address):
+        connection = _Connection(address, timeout)
+        failures = 0
+        while remaining:
+            try:
+                if connection.writer is None:
+                    await connection.connect()
+            except WorkerError:
+                failures += 1
+                if failures > retries:
+                    return
+                await asyncio.sleep(RECONNECT_DELAY * failures)
+                continue
+
+            item = await queue.get()
+            if item is None:
+                break
+            task, attempts = item
+            try:
+                kind, payload = await connection.send(task)
+            except WorkerError as error:
+                # Hand the shard to any worker, and reconnect to this one before taking another
+                if attempts >= retries:
+                    finish(task["task"], error=f"{error} (after {attempts + 1} attempts)")
+                else:
+                    queue.put_nowait((task, attempts + 1))
+                failures += 1
+                if failures > retries:
+                    return
+                await asyncio.sleep(RECONNECT_DELAY * failures)
+                continue
+            failures = 0
+            if kind == RESULT:
+                finish(*decode_result(payload))
+            else:
+                message = json.loads(payload)
+                finish(message["task"], error=message["error"])
+        connection.close()
+
+    await asyncio.gather(*(drive(address) for address in addresses))
+    # Shards left over once no worker could be reached
+    while not queue.empty():
+        item = queue.get_nowait()
+        if item is not None:
+            errors[item[0]["task"]] = "No worker left to reduce this shard"
+    return results, errors
+
+
+def run_cluster(source, positions, workers, shard_runs=None, retries=RETRIES, timeout=TASK_TIMEOUT, cache=True):
+    """
+    Reduce every tunnel log of a campaign on TCP workers.
+
+    Parameters:
+        source (str or list): Directory, glob pattern, file name, or a list of them.
+        positions (list): Chordwise tap positions (% chord).
+        workers (list): Worker addresses ("host:port" or (host, port)).
+        shard_runs (int): Rows per shard (default: one shard per log).
+        retries (int): Times a shard is sent again after its worker failed, and reconnections
+            to a failed worker before it is given up.
+        timeout (float): Seconds a worker may take for one shard.
+        cache (bool): Let the workers use the binary sidecar caches of the logs.
+
+    Returns:
+        tuple: The merged result (see `campaign.merge_results`) and a dict of failed files
+            mapped to their error.
+    """
+    from .polar import default_weights
+
+    addresses = [parse_address(address) for address in workers]
+    if not addresses:
+        raise ValueError("At least one worker address is needed")
+    paths = find_logs(source)
+    weights = default_weights(positions).tolist()
+    shards = plan_shards(paths, shard_runs)
+    tasks = [{"task": i, **shard, "weights": weights, "cache": cache} for i, shard in enumerate(shards)]
+    results, errors = asyncio.run(_coordinate(tasks, addresses, retries, timeout))
+
+    # A file is only merged if all of its shards were reduced
+    failures = {}
+    for i, shard in enumerate(shards):
+        if i in errors and shard["path"] not in failures:
+            failures[shard["path"]] = errors[i]
+    merged = {}
+    for path in paths:
+        if path in failures:
+            continue
+        parts = [results[i] for i, shard in enumerate(shards) if shard["path"] == path]
+        merged[path] = {name: np.concatenate([part[name] for part in parts]) for name in RESULT_COLUMNS + ["C_p"]}
+    return merge_results(merged), failures
+
+
+def _local_worker(connection):
+    run_worker("127.0.0.1", 0, ready=connection.send)
+
+
+class LocalWorkers:
+    """
+    Worker processes listening on 127.0.0.1, standing in for remote nodes.
+
+    Use as a context manager; `addresses` lists the workers and `processes`
+    their processes (terminate one to simulate a failed node).
+
+    Parameters:
+        count (int): Number of workers.
+    """
+
+    def __init__(self, count):
+        self.processes = []
+        self.addresses = []
+        try:
+            for _ in range(count):
+                receiver, sender = multiprocessing.Pipe(duplex=False)
+                process = multiprocessing.Process(target=_local_worker, args=(sender,), daemon=True)
+                process.start()
+                self.processes.append(process)
+                sender.close()
+                if not receiver.poll(30):
+                    raise OSError("A local worker did not start")
+                self.addresses.append(("127.0.0.1", receiver.recv()))
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        """Stop every worker."""
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,256 @@
+"""
+Comparison of repeated tunnel entries (campaigns) of the same model.
+
+Every campaign is reduced to its per-run polar and C_p, split into a
+hysteresis branch (all runs, or only the increasing or decreasing alpha
+runs), averaged per alpha set point and interpolated onto one common alpha
+grid. The interpolation finds the bracketing set points of all grid alphas
+with one binary search and moves every coefficient and every tap in one
+array operation. Grid points outside the measured range of a campaign are
+NaN, never extrapolated.
+
+Once aligned, the differences of every pair of campaigns (Cl, Cd, Cm, the
+wake drag and the C_p of every tap) are single array subtractions over
+all pairs at once. Two kinds of scatter are reported:
+
+    repeatability    within a campaign, from the repeated set points
+    reproducibility  between campaigns, from the spread at every grid alpha
+
+together with the 95% limits (2.77 standard deviations) that two results
+are expected to stay within.
+"""
+import numpy as np
+
+from .data import ALPHA_DECIMALS
+from .polartable import BRANCHES, average_duplicates, sweep_directions
+
+QUANTITIES = ["cl", "cd", "cm", "cd_wake"]  # Coefficients compared when every campaign has them
+STEP = 0.5  # Default spacing of the common alpha grid (degrees)
+LIMIT_FACTOR = 2.77  # 95% limit of the difference of two results: 1.96 * sqrt(2) standard deviations
+
+# Columns of the per-pair table of `compare_campaigns`, after "campaign_a" and "campaign_b"
+STATISTICS = ["mean", "rms", "max"]
+
+
+def load_campaigns(sources, positions=None, store=None, cache=True):
+    """
+    Load the per-run results of several campaigns.
+
+    Parameters:
+        sources (list): One (distinct) entry per campaign: a raw log, glob pattern or directory
+            of logs, or a campaign name if `store` is given.
+        positions (list): Chordwise tap positions (% chord), needed for raw logs.
+        store (PolarStore or str): Read the campaigns from this store instead of raw logs.
+        cache (bool): Use the binary sidecar caches of the logs.
+
+    Returns:
+        dict: Campaign name -> arrays of RESULT_COLUMNS, "C_p" and "source".
+    """
+    from .campaign import run_campaign
+    from .store import PolarStore
+
+    repeated = sorted({source for source in sources if list(sources).count(source) > 1})
+    if repeated:
+        raise ValueError(f"Campaigns given more than once: {repeated}")
+
+    campaigns = {}
+    if store is not None:
+        store = store if isinstance(store, PolarStore) else PolarStore(store)
+        for name in sources:
+            campaigns[name] = dict(store.load(name, mmap=False).columns)
+        return campaigns
+
+    if positions is None:
+        raise ValueError("The tap positions are needed to reduce raw logs")
+    for source in sources:
+        merged, failures = run_campaign(source, positions, workers=1, cache=cache)
+        if failures:
+            raise ValueError(f"Campaign {source!r}: {len(failures)} files failed: {sorted(failures)}")
+        if not len(merged["run"]):
+            raise ValueError(f"Campaign {source!r} has no runs")
+        campaigns[source] = merged
+    return campaigns
+
+
+def _bracket(grid, xp):
+    """Lower bracketing index and interpolation fraction of every grid point, plus the inside mask."""
+    if len(xp) == 1:
+        return np.zeros(len(grid), dtype=np.intp), np.zeros(len(grid)), grid == xp[0]
+    index = np.clip(np.searchsorted(xp, grid, side='right') - 1, 0, len(xp) - 2)
+    fraction = (grid - xp[index]) / (xp[index + 1] - xp[index])
+    return index, fraction, (grid >= xp[0]) & (grid <= xp[-1])
+
+
+def align_campaigns(results, grid=None, branch="all", step=STEP, quantities=None, decimals=ALPHA_DECIMALS):
+    """
+    Put several campaigns on one alpha grid.
+
+    Parameters:
+        results (dict): Campaign name -> per-run arrays ("run", "alpha", the quantities, and
+            optionally "C_p" and "source"), e.g. from `load_campaigns`.
+        grid (numpy.ndarray): Alphas to align on. Defaults to `step` spaced alphas over the
+            range that every campaign measured.
+        branch (str): "all", or "up"/"down" for the increasing or decreasing alpha runs only.
+        step (float): Spacing of the default grid (degrees).
+        quantities (list): Coefficients to align. Defaults to the QUANTITIES of every campaign.
+        decimals (int): Alphas rounded to this many decimals are the same set point.
+
+    Returns:
+        dict: "alpha" (grid), "campaigns" (names), "branch", every quantity and "C_p" (if
+            every campaign has the same taps) as campaigns x grid (x taps) arrays, "measured"
+            (campaigns x grid, inside the measured range), and "repeat_ss" / "repeat_dof"
+            (campaigns x quantities) from the repeated set points of every campaign.
+    """
+    if branch not in BRANCHES:
+        raise ValueError(f"Unknown branch {branch!r}, expected one of {list(BRANCHES)}")
+    names = list(results)
+    if len(names) < 2:
+        raise ValueError(f"At least two campaigns are needed for a comparison, got {len(names)}")
+    if quantities is None:
+        quantities = [name for name in QUANTITIES if all(name in result for result in results.values())]
+    taps = {np.shape(result["C_p"])[1] for result in results.values() if "C_p" in result}
+    with_cp = len(taps) == 1 and all("C_p" in result for result in results.values())
+
+    # Mean of every set point of every campaign, one column per quantity and tap
+    set_points = []
+    repeat_ss = np.zeros((len(names), len(quantities)))
+    repeat_dof = np.zeros(len(names), dtype=int)
+    for k, name in enumerate(names):
+        result = results[name]
+        alpha = np.asarray(result["alpha"], dtype=float)
+        rows = np.arange(len(alpha))
+        if branch != "all":
+            rows = np.flatnonzero(sweep_directions(result) == BRANCHES[branch])
+        if not len(rows):
+            raise ValueError(f"Campaign {name!r} has no runs on the {branch!r} branch")
+        columns = [np.asarray(result[quantity], dtype=float)[rows, None] for quantity in quantities]
+        if with_cp:
+            columns.append(np.asarray(result["C_p"], dtype=float)[rows])
+        values = np.hstack(columns)
+        xp, mean, counts = average_duplicates(alpha[rows], values, decimals)
+        set_points.append((xp, mean))
+
+        # Scatter of the repeated set points around their mean
+        inverse = np.searchsorted(xp, np.round(alpha[rows], decimals))
+        deviation = values[:, :len(quantities)] - mean[inverse, :len(quantities)]
+        repeat_ss[k] = np.nansum(deviation**2, axis=0)
+        repeat_dof[k] = int((counts - 1).sum())
+
+    if grid is None:
+        low = max(xp[0] for xp, _ in set_points)
+        high = min(xp[-1] for xp, _ in set_points)
+        if low > high:
+            raise ValueError(f"The campaigns have no alpha range in common on the {branch!r} branch")
+        grid = np.arange(np.ceil(low / step - 1e-9) * step, high + 1e-9, step)
+    grid = np.round(np.atleast_1d(np.asarray(grid, dtype=float)), 10)
+
+    width = set_points[0][1].shape[1]
+    aligned_values = np.empty((len(names), len(grid), width))
+    measured = np.empty((len(names), len(grid)), dtype=bool)
+    for k, (xp, mean) in enumerate(set_points):
+        index, fraction, inside = _bracket(grid, xp)
+        upper = np.minimum(index + 1, len(xp) - 1)
+        aligned_values[k] = mean[index] * (1 - fraction)[:, None] + mean[upper] * fraction[:, None]
+        aligned_values[k, ~inside] = np.nan
+        measured[k] = inside
+
+    aligned = {"alpha": grid, "campaigns": names, "branch": branch, "quantities": list(quantities),
+               "measured": measured, "repeat_ss": repeat_ss, "repeat_dof": repeat_dof}
+    for q, quantity in enumerate(quantities):
+        aligned[quantity] = aligned_values[:, :, q]
+    if with_cp:
+        aligned["C_p"] = aligned_values[:, :, len(quantities):]
+    return aligned
+
+
+def _nan_statistics(values, axis):
+    """Mean, RMS and largest magnitude over an axis, ignoring NaN (NaN where nothing is left)."""
+    finite = np.isfinite(values)
+    count = finite.sum(axis=axis)
+    zeroed = np.where(finite, values, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = zeroed.sum(axis=axis) / count
+        rms = np.sqrt((zeroed**2).sum(axis=axis) / count)
+    largest = np.where(finite, np.abs(values), -np.inf).max(axis=axis, initial=-np.inf)
+    return mean, rms, np.where(count > 0, largest, np.nan)
+
+
+def _nan_std(values, axis):
+    """Sample standard deviation over an axis, ignoring NaN (NaN below two values)."""
+    finite = np.isfinite(values)
+    count = finite.sum(axis=axis, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(finite, values, 0.0).sum(axis=axis, keepdims=True) / count
+        ss = np.where(finite, (values - mean)**2, 0.0).sum(axis=axis, keepdims=True)
+        std = np.sqrt(ss / (count - 1))
+    return np.squeeze(np.where(count > 1, std, np.nan), axis=axis)
+
+
+def compare_campaigns(aligned):
+    """
+    Differences of every pair of aligned campaigns, and their repeatability.
+
+    Parameters:
+        aligned (dict): Result of `align_campaigns`.
+
+    Returns:
+        dict:
+            "pairs": table of every pair (campaign_a < campaign_b in input order) with
+                "campaign_a", "campaign_b", the grid "points" both measured and, per quantity
+                and for "dcp", the "d<quantity>_mean", "_rms" and "_max" of campaign_b - campaign_a.
+            "delta": per quantity (pairs x grid) and "C_p" (pairs x grid x taps) differences.
+            "grid": per grid alpha the number of "campaigns" and every quantity's "_mean",
+                "_std" and "_range" across campaigns.
+            "repeatability": per quantity the within-campaign ("repeat_std") and between-campaign
+                ("reproduce_std") standard deviations and their 95% limits ("_limit"), and the
+                between-campaign C_p standard deviation of every tap ("tap_std").
+    """
+    names = aligned["campaigns"]
+    quantities = aligned["quantities"]
+    if len(names) < 2:
+        raise ValueError(f"At least two campaigns are needed for a comparison, got {len(names)}")
+    first, second = np.triu_indices(len(names), 1)
+    both = aligned["measured"][first] & aligned["measured"][second]
+
+    pairs = {
+        "campaign_a": np.asarray(names, dtype=object)[first],
+        "campaign_b": np.asarray(names, dtype=object)[second],
+        "points": both.sum(axis=1),
+    }
+    delta = {}
+    for quantity in quantities + (["C_p"] if "C_p" in aligned else []):
+        values = aligned[quantity]
+        delta[quantity] = values[second] - values[first]
+        flat = delta[quantity].reshape(len(first), -1)
+        label = "dcp" if quantity == "C_p" else "d" + quantity
+        for statistic, column in zip(STATISTICS, _nan_statistics(flat, axis=1)):
+            pairs[f"{label}_{statistic}"] = column
+
+    grid = {"alpha": aligned["alpha"], "campaigns": aligned["measured"].sum(axis=0)}
+    repeatability = {}
+    repeat_dof = aligned["repeat_dof"].sum()
+    for q, quantity in enumerate(quantities):
+        values = aligned[quantity]
+        finite = np.isfinite(values)
+        grid[quantity + "_mean"] = _nan_statistics(values, axis=0)[0]
+        grid[quantity + "_std"] = _nan_std(values, axis=0)
+        high = np.where(finite, values, -np.inf).max(axis=0, initial=-np.inf)
+        low = np.where(finite, values, np.inf).min(axis=0, initial=np.inf)
+        grid[quantity + "_range"] = np.where(finite.any(axis=0), high - low, np.nan)
+
+        # Pooled over the repeated set points of all campaigns, and over the grid alphas
+        repeat_std = np.sqrt(aligned["repeat_ss"][:, q].sum() / repeat_dof) if repeat_dof else np.nan
+        variance = grid[quantity + "_std"]**2
+        reproduce_std = np.sqrt(np.nanmean(variance)) if np.isfinite(variance).any() else np.nan
+        repeatability.update({
+            quantity + "_repeat_std": repeat_std,
+            quantity + "_repeat_limit": LIMIT_FACTOR * repeat_std,
+            quantity + "_reproduce_std": reproduce_std,
+            quantity + "_reproduce_limit": LIMIT_FACTOR * reproduce_std,
+        })
+    if "C_p" in aligned:
+        variance = _nan_std(aligned["C_p"], axis=0)**2
+        with np.errstate(invalid='ignore'):
+            repeatability["tap_std"] = np.sqrt(np.where(np.isfinite(variance), variance, 0.0).sum(axis=0)
+                                               / np.isfinite(variance).sum(axis=0))
+    return {"pairs": pairs, "delta": delta, "grid": grid, "repeatability": repeatability}
@@ -0,0 +1,271 @@
+"""
+Operator dashboard for a running tunnel entry.
+
+One persistent figure holds the running polar (Cl-alpha, drag bucket,
+Cm-alpha, x_cop-alpha) and the Cp and wake profile of the current run. The
+static parts (axes, grid, labels) are rendered once and cached; an update
+restores that background and redraws only the data artists (blitting).
+The axis limits grow in steps, so a full redraw is only needed when a point
+falls outside them. Headless dashboards render offscreen with Agg.
+"""
+import time
+
+import numpy as np
+
+# Fraction of the data range added around the data when the limits grow
+LIMIT_MARGIN = 0.25
+
+
+class Dashboard:
+    """
+    Persistent, blitted dashboard of the running polar and the current run.
+
+    Parameters:
+        positions (list): Chordwise tap positions (% chord).
+        rake_positions (numpy.ndarray): Wake rake probe positions (mm).
+        headless (bool): Render offscreen with Agg instead of opening a window.
+    """
+
+    def __init__(self, positions, rake_positions=None, headless=False):
+        from .wakedrag import pt_positions
+
+        self.positions = np.asarray(positions, dtype=float)
+        self.rake_positions = pt_positions * 1000 if rake_positions is None else np.asarray(rake_positions)
+        self.headless = headless
+        self.redraws = 0
+        self._fitted = set()
+        self._columns = {name: np.empty(0) for name in ("alpha", "cl", "cd", "cm", "x_cop", "cd_wake")}
+        self._length = 0
+        self._build_figure()
+
+    def _build_figure(self):
+        if self.headless:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+
+            self.figure = Figure(figsize=(14, 8))
+            FigureCanvasAgg(self.figure)
+        else:
+            import matplotlib.pyplot as plt
+
+            self.figure = plt.figure(figsize=(14, 8))
+            plt.show(block=False)
+        self.canvas = self.figure.canvas
+
+        axes = self.figure.subplots(2, 3)
+        self.axes = {
+            "cl": axes[0, 0], "bucket": axes[0, 1], "cp": axes[0, 2],
+            "cm": axes[1, 0], "x_cop": axes[1, 1], "wake": axes[1, 2],
+        }
+        labels = {
+            "cl": ("Angle of Attack ($\\alpha$)", "Lift Coefficient ($C_l$)"),
+            "bucket": ("Drag Coefficient ($C_d$)", "Lift Coefficient ($C_l$)"),
+            "cp": ("Chordwise Position (%)", "Pressure Coefficient (Cp)"),
+            "cm": ("Angle of Attack ($\\alpha$)", "Moment Coefficient ($C_m$)"),
+            "x_cop": ("Angle of Attack ($\\alpha$)", "XCoP values ($x$)"),
+            "wake": ("Total wake rake probe locations (mm)", "Velocity (m/s)"),
+        }
+        for name, ax in self.axes.items():
+            ax.set_xlabel(labels[name][0])
+            ax.set_ylabel(labels[name][1])
+            ax.grid(True)
+            ax.set_xlim(0, 1)
+            ax.set_ylim(0, 1)
+
+        def line(ax, **style):
+            artist, = ax.plot([], [], animated=True, **style)
+            return artist
+
+        self.artists = {
+            "cl": line(self.axes["cl"], marker='o', color='b', markersize=3),
+            "bucket": line(self.axes["bucket"], marker='o', color='purple', markersize=3, label='Pressure'),
+            "bucket_wake": line(self.axes["bucket"], marker='s', color='black', markersize=3, linestyle='',
+                                label='Wake rake'),
+            "cm": line(self.axes["cm"], marker='o', color='r', markersize=3),
+            "x_cop": line(self.axes["x_cop"], marker='o', color='g', markersize=3),
+            "current": line(self.axes["cl"], marker='o', color='orange', markersize=9, linestyle=''),
+            "cp_upper": line(self.axes["cp"], marker='o', color='blue', label='Upper Surface'),
+            "cp_lower": line(self.axes["cp"], marker='o', color='red', label='Lower Surface'),
+            "wake": line(self.axes["wake"], marker='o', color='blue'),
+        }
+        # A placeholder title reserves its space in the layout
+        self.title = self.axes["cp"].set_title("Current run", animated=True)
+        self.axes["bucket"].legend(loc='lower right')
+        self.axes["cp"].legend(loc='lower right')
+        self.figure.tight_layout()
+        self._redraw()
+
+    def _redraw(self):
+        """Render the static parts and cache them as the blitting background."""
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.redraws += 1
+
+    def _fit(self, ax, x, y, invert_y=False):
+        """Grow the limits of `ax` to contain x, y. Returns True if they changed."""
+        changed = False
+        for data, axis in ((x, "x"), (y, "y")):
+            data = np.asarray(data, dtype=float)
+            data = data[np.isfinite(data)]
+            if not data.size:
+                continue
+            limits = ax.get_xlim() if axis == "x" else ax.get_ylim()
+            low, high = sorted(limits)
+            fitted = (ax, axis) in self._fitted
+            if fitted and data.min() >= low and data.max() <= high:
+                continue
+            if fitted:
+                # Only move the side that overflowed, by a margin of the new range
+                span = max(max(high, data.max()) - min(low, data.min()), 1e-3)
+                if data.min() < low:
+                    low = data.min() - LIMIT_MARGIN * span
+                if data.max() > high:
+                    high = data.max() + LIMIT_MARGIN * span
+            else:
+                span = max(data.max() - data.min(), 1e-3)
+                low, high = data.min() - LIMIT_MARGIN * span, data.max() + LIMIT_MARGIN * span
+            if axis == "x":
+                ax.set_xlim(low, high)
+            else:
+                ax.set_ylim((high, low) if invert_y else (low, high))
+            self._fitted.add((ax, axis))
+            changed = True
+        return changed
+
+    def reset(self):
+        """Forget every run, e.g. when the log was truncated and a new session starts."""
+        self._columns = {name: np.empty(0) for name in self._columns}
+        self._length = 0
+        self._fitted = set()
+        self.current = None
+        for ax in self.axes.values():
+            ax.set_xlim(0, 1)
+            ax.set_ylim(0, 1)
+        for artist in self.artists.values():
+            artist.set_data([], [])
+        self.title.set_text("Current run")
+        self._redraw()
+        self.canvas.blit(self.figure.bbox)
+
+    def add(self, result):
+        """
+        Add the runs of a live result and show the last one as the current run.
+
+        Parameters:
+            result (dict): Result of `LiveReduction.update` (needs "C_p" and "velocity"
+                for the current run panels).
+        """
+        from .data import grow_buffer
+
+        count = len(result["alpha"])
+        stop = self._length + count
+        for name, column in self._columns.items():
+            column = grow_buffer(column, self._length, stop)
+            column[self._length:stop] = result[name]
+            self._columns[name] = column
+        self._length = stop
+
+        self.current = {
+            "alpha": float(result["alpha"][-1]),
+            "cl": float(result["cl"][-1]),
+            "C_p": result["C_p"][-1] if "C_p" in result else None,
+            "velocity": result["velocity"][-1] if "velocity" in result else None,
+        }
+        self.draw()
+
+    def draw(self):
+        """Update the data artists, blitting them over the cached background."""
+        from .pressure import split_cp_profile
+
+        n = self._length
+        c = {name: column[:n] for name, column in self._columns.items()}
+        current = self.current
+        data = {
+            "cl": (c["alpha"], c["cl"]),
+            "bucket": (c["cd"], c["cl"]),
+            "bucket_wake": (c["cd_wake"], c["cl"]),
+            "cm": (c["alpha"], c["cm"]),
+            "x_cop": (c["alpha"], c["x_cop"]),
+            "current": ([current["alpha"]], [current["cl"]]),
+        }
+        if current["C_p"] is not None:
+            C_p_upper, positions_upper, C_p_lower, positions_lower = split_cp_profile(self.positions, current["C_p"])
+            data["cp_upper"] = (positions_upper, C_p_upper)
+            data["cp_lower"] = (positions_lower, C_p_lower)
+        if current["velocity"] is not None:
+            data["wake"] = (self.rake_positions, current["velocity"])
+
+        changed = False
+        for name, ax_name in (("cl", "cl"), ("cm", "cm"), ("x_cop", "x_cop"), ("wake", "wake")):
+            if name in data:
+                changed |= self._fit(self.axes[ax_name], *data[name])
+        changed |= self._fit(self.axes["bucket"], np.concatenate((c["cd"], c["cd_wake"])), np.tile(c["cl"], 2))
+        if "cp_upper" in data:
+            changed |= self._fit(self.axes["cp"], self.positions, current["C_p"], invert_y=True)
+        if changed:
+            self._redraw()
+
+        self.canvas.restore_region(self.background)
+        for name, (x, y) in data.items():
+            artist = self.artists[name]
+            artist.set_data(x, y)
+            artist.axes.draw_artist(artist)
+        self.title.set_text(f"Current run: α = {current['alpha']}°")
+        self.axes["cp"].draw_artist(self.title)
+        self.canvas.blit(self.figure.bbox)
+        if not self.headless:
+            self.canvas.flush_events()
+
+    def frame(self):
+        """Return the current frame as an RGBA array (height x width x 4)."""
+        return np.asarray(self.canvas.buffer_rgba())
+
+    @property
+    def closed(self):
+        """Whether the window has been closed (never for a headless dashboard)."""
+        if self.headless:
+            return False
+        import matplotlib.pyplot as plt
+
+        return not plt.fignum_exists(self.figure.number)
+
+    def wait(self, interval):
+        """Wait `interval` seconds, handling window events (move, resize, close) meanwhile."""
+        if self.headless:
+            time.sleep(interval)
+        else:
+            self.canvas.start_event_loop(interval)
+
+
+def run_dashboard(file_path, positions, weights=None, interval=0.1, timeout=None, headless=False):
+    """
+    Follow a growing tunnel log and show every new run on a dashboard.
+
+    Parameters:
+        file_path (str): Tunnel log being written by the acquisition system.
+        positions (list): Chordwise tap positions (% chord).
+        weights (numpy.ndarray): Polar weights (built from `positions` if not given).
+        interval (float): Seconds between polls.
+        timeout (float): Stop after this many seconds without new runs (forever if None),
+            or when the window is closed.
+        headless (bool): Render offscreen instead of opening a window.
+
+    Returns:
+        Dashboard: The dashboard, with the last frame drawn.
+    """
+    from .live import LiveReduction
+    from .polar import default_weights
+
+    weights = default_weights(positions) if weights is None else weights
+    live = LiveReduction(file_path, weights)
+    dashboard = Dashboard(positions, headless=headless)
+    last_data = time.monotonic()
+    while (timeout is None or time.monotonic() - last_data <= timeout) and not dashboard.closed:
+        result = live.update()
+        if live.follower.restarted:
+            dashboard.reset()
+        if result is not None:
+            dashboard.add(result)
+            last_data = time.monotonic()
+        dashboard.wait(interval)
+    return dashboard
@@ -0,0 +1,465 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from .profiling import instrumented
+
+# Number of header lines in a raw tunnel log (column names and units)
+HEADER_LINES = 2
+
+# Sidecar files written next to the raw log
+CACHE_SUFFIX = ".lswt.npy"
+META_SUFFIX = ".lswt.json"
+CACHE_VERSION = 1
+
+# Alphas closer than this are treated as the same set point when grouping runs
+ALPHA_DECIMALS = 2
+
+# Where every channel sits in a raw log: a column name, or an inclusive
+# (first, last) range of contiguous port columns
+COLUMN_MAP = {
+    "run": "Run_nr",
+    "alpha": "Alpha",
+    "rho": "rho",
+    "surface_taps": ("P001", "P049"),
+    "rake_total": ("P050", "P096"),
+    "rake_static": ("P098", "P109"),
+    "reference": "P110",  # p097 of the tunnel software, field 104+13 of a log line
+}
+
+
+class TunnelLog:
+    """
+    Columnar view of a raw tunnel log.
+
+    All columns are stored as float64 in a single column-major 2D array, so a
+    named column or a contiguous block of pressure ports is a cheap view.
+    The "Time" column is stored as seconds since midnight.
+
+    Run numbers and alphas are indexed on construction: `rows` maps run
+    numbers to rows with a binary search, and `alpha_groups` maps every alpha
+    set point to the rows (in acquisition order) measured at it. Rows added
+    with `append` only index the new rows.
+    """
+
+    def __init__(self, values, columns, source=None):
+        if values.ndim != 2 or values.shape[1] != len(columns):
+            raise ValueError("values must be a 2D array with one column per name")
+        self.columns = list(columns)
+        self.source = source
+        self._column_index = {name: i for i, name in enumerate(self.columns)}
+        self._values = values
+        self._length = 0
+        self._run_order = np.empty(0, dtype=int)
+        self._sorted_runs = np.empty(0, dtype=int)
+        self._sweep = np.empty(0, dtype=int)
+        self._last_step = 0
+        self.alpha_groups = {}
+        self._index_rows(values.shape[0])
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, name):
+        return self.values[:, self.column_index(name)]
+
+    @property
+    def values(self):
+        """All rows as a (runs x columns) array."""
+        return self._values[:self._length]
+
+    @property
+    def sweep_direction(self):
+        """
+        +1 for runs taken while alpha was increasing, -1 while decreasing
+        (+1 until alpha first changes), so repeated set points can be split
+        into hysteresis branches.
+        """
+        return self._sweep[:self._length]
+
+    def column_index(self, name):
+        """Return the position of a named column."""
+        try:
+            return self._column_index[name]
+        except KeyError:
+            raise KeyError(f"No column named {name!r} in tunnel log") from None
+
+    def block(self, first, last):
+        """Return the columns from `first` to `last` (inclusive) as a 2D array."""
+        return self.values[:, self.column_index(first):self.column_index(last) + 1]
+
+    def append(self, rows):
+        """
+        Append rows (with the same columns) and index them.
+
+        Storage grows geometrically, so appending one run at a time costs O(1)
+        amortized regardless of how many runs the log already holds.
+        """
+        rows = np.atleast_2d(np.asarray(rows, dtype=float))
+        if rows.shape[1] != len(self.columns):
+            raise ValueError(f"rows must have {len(self.columns)} columns, got {rows.shape[1]}")
+        stop = self._length + len(rows)
+        self._values = grow_buffer(self._values, self._length, stop, order='F')
+        self._values[self._length:stop] = rows
+        self._index_rows(stop)
+
+    def _index_rows(self, stop):
+        """Index the rows from the current length up to `stop` and make them visible."""
+        start = self._length
+        values = self._values
+        if "Run_nr" in self._column_index:
+            runs = values[start:stop, self._column_index["Run_nr"]].astype(int)
+        else:
+            runs = np.arange(start + 1, stop + 1)
+
+        # Runs normally arrive in increasing order, which only needs the new
+        # rows added at the end; otherwise merge them into the sorted index
+        in_order = bool(np.all(np.diff(runs) >= 0))
+        if start and len(runs):
+            in_order = in_order and runs[0] >= self._sorted_runs[start - 1]
+        if in_order:
+            self._run_order = grow_buffer(self._run_order, start, stop)
+            self._sorted_runs = grow_buffer(self._sorted_runs, start, stop)
+            self._run_order[start:stop] = np.arange(start, stop)
+            self._sorted_runs[start:stop] = runs
+        else:
+            # A stable sort, inserting after equal run numbers, keeps the
+            # first occurrence of a repeated run number first
+            order = np.argsort(runs, kind='stable')
+            at = np.searchsorted(self._sorted_runs[:start], runs[order], side='right')
+            self._run_order = np.insert(self._run_order[:start], at, order + start)
+            self._sorted_runs = np.insert(self._sorted_runs[:start], at, runs[order])
+
+        self._sweep = grow_buffer(self._sweep, start, stop)
+        self._length = stop
+        if "Alpha" not in self._column_index or stop == start:
+            self._sweep[start:stop] = 1
+            return
+
+        alphas = np.round(values[start:stop, self._column_index["Alpha"]], ALPHA_DECIMALS)
+        keys, inverse = np.unique(alphas, return_inverse=True)
+        order = np.argsort(inverse, kind='stable')
+        splits = np.cumsum(np.bincount(inverse, minlength=len(keys)))[:-1]
+        for key, group in zip(keys.tolist(), np.split(order + start, splits)):
+            previous = self.alpha_groups.get(key)
+            self.alpha_groups[key] = group if previous is None else np.concatenate((previous, group))
+
+        # Hold the last non-zero alpha step across repeated points
+        previous_alpha = alphas[0] if start == 0 else round(values[start - 1, self._column_index["Alpha"]],
+                                                              ALPHA_DECIMALS)
+        steps = np.sign(np.diff(np.concatenate(([previous_alpha], alphas))))
+        steps = np.concatenate(([self._last_step], steps)).astype(int)
+        nonzero = np.where(steps != 0, np.arange(steps.size), 0)
+        np.maximum.accumulate(nonzero, out=nonzero)
+        held = steps[nonzero]
+        self._last_step = held[-1]
+        held = held[1:]
+        held[held == 0] = 1
+        self._sweep[start:stop] = held
+
+    def rows(self, runs):
+        """
+        Return the row positions of the given run numbers.
+
+        Parameters:
+            runs (array_like): Run numbers to look up.
+
+        Returns:
+            numpy.ndarray: Row position for every run number.
+        """
+        runs = np.asarray(runs, dtype=int)
+        sorted_runs = self._sorted_runs[:self._length]
+        if not len(sorted_runs):
+            raise KeyError(f"No data found for Run_nr {np.atleast_1d(runs).tolist()}")
+        pos = np.searchsorted(sorted_runs, runs)
+        pos_clipped = np.minimum(pos, len(sorted_runs) - 1)
+        found = (pos < len(sorted_runs)) & (sorted_runs[pos_clipped] == runs)
+        if not found.all():
+            missing = np.atleast_1d(runs)[~np.atleast_1d(found)]
+            raise KeyError(f"No data found for Run_nr {missing.tolist()}")
+        return self._run_order[pos_clipped]
+
+    def row(self, run):
+        """Return the row position of a run number, or None if it is not in the log."""
+        try:
+            return int(self.rows(run))
+        except KeyError:
+            return None
+
+    def runs_at(self, alpha):
+        """Return the run numbers measured at an alpha set point (retests included)."""
+        rows = self.alpha_groups.get(round(float(alpha), ALPHA_DECIMALS), np.empty(0, dtype=int))
+        return self.run[rows]
+
+    @property
+    def run(self):
+        return self["Run_nr"].astype(int)
+
+    @property
+    def alpha(self):
+        return self["Alpha"]
+
+    @property
+    def rho(self):
+        return self["rho"]
+
+
+def grow_buffer(buffer, used, size, order='C'):
+    """Return `buffer` if it can hold `size` rows, otherwise a writeable copy with twice the capacity."""
+    if len(buffer) >= size and buffer.flags.writeable and not isinstance(buffer, np.memmap):
+        return buffer
+    capacity = max(size, 2 * len(buffer), 16)
+    grown = np.empty((capacity,) + buffer.shape[1:], dtype=buffer.dtype, order=order)
+    grown[:used] = buffer[:used]
+    return grown
+
+
+def parse_rows(text, columns, source="log"):
+    """
+    Parse whitespace separated data lines into a (rows x columns) array in one vectorized pass.
+
+    Parameters:
+        text (str): Data lines (no header).
+        columns (list): Column names of the log.
+        source (str): Name used in error messages.
+
+    Returns:
+        numpy.ndarray: Column-major array of the parsed rows.
+    """
+    # Fields such as "09:30:20" expand into several numbers once ':' is
+    # treated as whitespace, so count how wide every field is from the first row
+    first_row = text.lstrip().split('\n', 1)[0].split()
+    if not first_row:
+        return np.empty((0, len(columns)), order='F')
+    if len(first_row) != len(columns):
+        raise ValueError(f"{source}: header has {len(columns)} columns, data has {len(first_row)}")
+    widths = np.array([token.count(':') + 1 for token in first_row])
+
+    flat = np.fromstring(text.replace(':', ' '), sep=' ')
+    if flat.size % widths.sum():
+        raise ValueError(f"{source}: rows do not all have {len(columns)} columns")
+    raw = flat.reshape(-1, widths.sum())
+
+    if (widths == 1).all():
+        return np.asfortranarray(raw)
+
+    # Collapse h:m:s style fields back into one column (base 60)
+    values = np.empty((raw.shape[0], len(columns)), order='F')
+    starts = np.concatenate(([0], np.cumsum(widths)[:-1]))
+    for i, (start, width) in enumerate(zip(starts, widths)):
+        values[:, i] = raw[:, start]
+        for j in range(1, width):
+            values[:, i] = values[:, i] * 60 + raw[:, start + j]
+    return values
+
+
+def _column_formats(columns):
+    formats = []
+    for name in columns:
+        if name == "Run_nr":
+            formats.append("%8d")
+        elif name == "Time":
+            formats.append(" %02d:%02d:%02d")
+        elif name in ("Alpha", "rho"):
+            formats.append("%8.3f")
+        else:
+            formats.append("%8.2f")
+    return formats
+
+
+def format_rows(rows, columns):
+    """Format rows as the tab separated lines of a raw tunnel log."""
+    if not len(rows):
+        return ""
+    formats = _column_formats(columns)
+    values = rows
+    if "Time" in columns:
+        # Split the seconds into hours, minutes and seconds fields
+        i = columns.index("Time")
+        seconds = np.round(rows[:, i]).astype(int)
+        values = np.column_stack((rows[:, :i], seconds // 3600, seconds // 60 % 60, seconds % 60, rows[:, i + 1:]))
+    line = "\t".join(formats) + "\n"
+    # One formatting operation per chunk instead of one per value
+    return (line * len(rows)) % tuple(values.ravel().tolist())
+
+
+def read_header(f):
+    """Read the header lines of an open tunnel log and return its column names."""
+    columns = f.readline().split()
+    for _ in range(HEADER_LINES - 1):
+        f.readline()
+    return columns
+
+
+@instrumented("data.parse_log", rows=len)
+def parse_log(file_path):
+    """
+    Parse a raw tunnel log into a TunnelLog in a single vectorized pass.
+
+    Parameters:
+        file_path (str): Path to the whitespace separated tunnel log.
+
+    Returns:
+        TunnelLog: Parsed columns.
+    """
+    with open(file_path, 'r') as f:
+        columns = read_header(f)
+        body = f.read()
+
+    return TunnelLog(parse_rows(body, columns, source=file_path), columns, source=file_path)
+
+
+def _file_key(file_path):
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _file_hash(file_path, size=None):
+    """Return the sha1 of the file, or of its first `size` bytes."""
+    digest = hashlib.sha1()
+    remaining = float("inf") if size is None else size
+    with open(file_path, 'rb') as f:
+        while remaining > 0:
+            chunk = f.read(int(min(1 << 20, remaining)))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def _appended_rows(file_path, meta, size):
+    """
+    Return the rows added to a log since its cache was written, or None if
+    the log changed in any other way than lines being appended.
+    """
+    if size <= meta["size"] or _file_hash(file_path, meta["size"]) != meta.get("sha1"):
+        return None
+    with open(file_path, 'rb') as f:
+        f.seek(meta["size"] - 1)
+        tail = f.read(size - meta["size"] + 1)
+    # The cached part must have ended with a complete line
+    if not tail.startswith(b'\n'):
+        return None
+    return parse_rows(tail[1:].decode(), meta["columns"], source=file_path)
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(log, cache_path, meta_path, meta):
+    # Write to temporary files first so a concurrent reader never sees a partial cache
+    tmp_cache = cache_path + ".tmp"
+    tmp_meta = meta_path + ".tmp"
+    with open(tmp_cache, 'wb') as f:
+        np.save(f, log.values)
+    with open(tmp_meta, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_cache, cache_path)
+    os.replace(tmp_meta, meta_path)
+
+
+@instrumented("data.load_log", rows=len)
+def load_log(file_path, cache=True):
+    """
+    Load a raw tunnel log, using a memory-mapped binary sidecar when possible.
+
+    The sidecar is reused when the log's size and modification time match.
+    If only the modification time changed, the content hash decides. If
+    lines were appended to the log, only the new lines are parsed.
+
+    Parameters:
+        file_path (str): Path to the raw tunnel log.
+        cache (bool): Read and write the binary sidecar next to the log.
+
+    Returns:
+        TunnelLog: Parsed columns (memory-mapped when loaded from the sidecar).
+    """
+    if not cache:
+        return parse_log(file_path)
+
+    cache_path = file_path + CACHE_SUFFIX
+    meta_path = file_path + META_SUFFIX
+    size, mtime_ns = _file_key(file_path)
+    meta = _read_meta(meta_path)
+
+    if meta is not None and meta.get("version") == CACHE_VERSION and meta.get("size") == size:
+        valid = meta.get("mtime_ns") == mtime_ns
+        if not valid and meta.get("sha1") == _file_hash(file_path):
+            valid = True
+            meta["mtime_ns"] = mtime_ns
+            try:
+                with open(meta_path, 'w') as f:
+                    json.dump(meta, f)
+            except OSError:
+                pass
+        if valid:
+            try:
+                values = np.load(cache_path, mmap_mode='r')
+                return TunnelLog(values, meta["columns"], source=file_path)
+            except (OSError, ValueError):
+                pass
+
+    log = None
+    if meta is not None and meta.get("version") == CACHE_VERSION and meta.get("size", 0) > 0:
+        try:
+            rows = _appended_rows(file_path, meta, size)
+            if rows is not None:
+                cached = np.load(cache_path, mmap_mode='r')
+                log = TunnelLog(np.asfortranarray(np.concatenate((cached, rows))), meta["columns"],
+                                source=file_path)
+        except (OSError, ValueError):
+            log = None
+    if log is None:
+        log = parse_log(file_path)
+
+    meta = {
+        "version": CACHE_VERSION,
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "sha1": _file_hash(file_path),
+        "columns": log.columns,
+    }
+    try:
+        _write_cache(log, cache_path, meta_path, meta)
+    except OSError:
+        # A read-only data directory should not stop the analysis
+        pass
+    return log
+
+
+def log_signature(file_path):
+    """
+    Return the size and sha1 of a log file.
+
+    The hash is taken from the binary sidecar written by load_log when the
+    sidecar describes the file as it is, so an unchanged log is not read again.
+
+    Parameters:
+        file_path (str): Path to the raw tunnel log.
+
+    Returns:
+        dict: "size" (bytes) and "sha1" of the file.
+    """
+    size, mtime_ns = _file_key(file_path)
+    meta = _read_meta(file_path + META_SUFFIX)
+    if meta is not None and meta.get("size") == size and meta.get("mtime_ns") == mtime_ns and "sha1" in meta:
+        return {"size": size, "sha1": meta["sha1"]}
+    return {"size": size, "sha1": _file_hash(file_path)}
+
+
+def has_prefix(file_path, signature):
+    """
+    Return True if a log still starts with the bytes described by an earlier
+    log_signature, i.e. it is unchanged or lines were only appended to it.
+    """
+    if os.path.getsize(file_path) < signature["size"]:
+        return False
+    return _file_hash(file_path, signature["size"]) == signature["sha1"]
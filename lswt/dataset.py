@@ -0,0 +1,123 @@
+"""
+One parsed log shared by every reduction, with its channels named by a column map.
+
+The column map says where the surface taps, rake total and static probes,
+reference pressure, alpha and density sit in the raw log. The channels are
+views of the single parsed TunnelLog, so the Cp, the pressure polar and the
+wake rake drag all read the same arrays, and the file is loaded once. Logs
+with a different port layout only need a different map (a dict, or a JSON
+file of the same shape).
+
+`reconcile_drag` puts the drag integrated from the surface pressures next
+to the wake rake drag of every run. Below stall their difference is an
+estimate of the skin friction drag, which the surface taps cannot see.
+"""
+import json
+
+import numpy as np
+
+from .data import COLUMN_MAP, load_log
+
+# Columns of the table returned by `reconcile_drag`
+RECONCILIATION_COLUMNS = ["run", "alpha", "cl", "cd_surface", "cd_wake", "cd_wake_momentum", "cd_wake_pressure",
+                          "cd_difference", "cd_ratio"]
+
+
+def load_column_map(file_path):
+    """Load a column map from JSON: channel name -> column name or [first, last] port range."""
+    with open(file_path, 'r') as f:
+        column_map = json.load(f)
+    if not isinstance(column_map, dict):
+        raise ValueError(f"{file_path} must hold a JSON object of channel names")
+    return {name: tuple(value) if isinstance(value, list) else value for name, value in column_map.items()}
+
+
+class Dataset:
+    """
+    A TunnelLog with its channels resolved from a column map.
+
+    Parameters:
+        data (TunnelLog): Parsed log.
+        column_map (dict): Channels to override or add to COLUMN_MAP.
+    """
+
+    def __init__(self, data, column_map=None):
+        self.data = data
+        self.column_map = {**COLUMN_MAP, **(column_map or {})}
+        self.channels = {}
+        for name, columns in self.column_map.items():
+            try:
+                if isinstance(columns, str):
+                    self.channels[name] = data[columns]
+                elif len(columns) == 2:
+                    self.channels[name] = data.block(*columns)
+                else:
+                    raise ValueError(f"Channel {name!r} must be a column name or a (first, last) range")
+            except KeyError as error:
+                raise KeyError(f"Channel {name!r}: {error.args[0]}") from None
+
+    @classmethod
+    def load(cls, file_path, column_map=None, cache=True):
+        """Load a raw log once and resolve its channels."""
+        return cls(load_log(file_path, cache=cache), column_map)
+
+    def __getitem__(self, name):
+        return self.channels[name]
+
+    def __len__(self):
+        return len(self.data)
+
+    def rows(self, runs=None):
+        """Row positions of run numbers (all rows by default)."""
+        return slice(None) if runs is None else self.data.rows(runs)
+
+    def columns(self, name):
+        """Return the column names of a channel."""
+        columns = self.column_map[name]
+        if isinstance(columns, str):
+            return [columns]
+        first, last = (self.data.column_index(column) for column in columns)
+        return self.data.columns[first:last + 1]
+
+
+def reconcile_drag(dataset, weights, runs=None, vinf=None, **kwargs):
+    """
+    Reduce the surface pressure polar and the wake rake drag of the same runs in one pass.
+
+    Parameters:
+        dataset (Dataset): Loaded log with its channels.
+        weights (numpy.ndarray): Polar weights from `default_weights` for the surface taps.
+        runs (list): Run numbers (default: all).
+        vinf (float): Freestream velocity of the Cp (default: pressure.Vinf).
+        **kwargs: Passed on to `wake_drag` (e.g. the probe positions pt_pos).
+
+    Returns:
+        dict: Arrays of RECONCILIATION_COLUMNS, one value per run. "cd_difference" is
+            cd_wake - cd_surface and "cd_ratio" is cd_wake / cd_surface.
+    """
+    from .polar import calculate_polar
+    from .pressure import Vinf, pressure_coefficient
+    from .wakedrag import wake_drag
+
+    rows = dataset.rows(runs)
+    vinf = Vinf if vinf is None else vinf
+    rho = dataset["rho"][rows]
+    alpha = dataset["alpha"][rows]
+
+    C_p = pressure_coefficient(dataset["surface_taps"][rows], dataset["reference"][rows], rho, vinf)
+    polar = calculate_polar(C_p, alpha, weights)
+    wake = wake_drag(dataset["rake_total"][rows], dataset["rake_static"][rows], rho, **kwargs)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = wake["cd"] / polar["cd"]
+    return {
+        "run": dataset["run"][rows].astype(int),
+        "alpha": alpha,
+        "cl": polar["cl"],
+        "cd_surface": polar["cd"],
+        "cd_wake": wake["cd"],
+        "cd_wake_momentum": wake["cd_momentum"],
+        "cd_wake_pressure": wake["cd_pressure"],
+        "cd_difference": wake["cd"] - polar["cd"],
+        "cd_ratio": ratio,
+    }
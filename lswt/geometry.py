@@ -0,0 +1,160 @@
+import weakref
+
+import numpy as np
+
+from .cache import LRUCache
+from .profiling import instrumented
+
+MAX_TABLES = 64  # Surface and slope tables kept per geometry, least recently used first out
+MAX_SPLINES = 8  # Chord scales whose splines are kept per geometry
+
+# Airfoil coordinates (% chord): upper surface from leading to trailing edge,
+# then the lower surface from leading to trailing edge
+AIRFOIL_DATA = np.array([
+    [0, 0], [0.35626, 0.77154], [1.33331, 1.60115], [3.66108, 2.87759], [7.2922, 4.15707],
+    [11.35604, 5.13022], [15.59135, 5.85007], [19.91328, 6.3748], [24.28443, 6.74148], [28.68627, 6.9748],
+    [33.10518, 7.09219], [37.53128, 7.10225], [41.95991, 7.00937], [46.38793, 6.81628], [50.8156, 6.52532],
+    [55.2486, 6.14225], [59.69223, 5.68254], [64.13685, 5.16453], [68.579, 4.59453], [73.02401, 3.97658],
+    [77.47357, 3.32133], [81.93114, 2.63941], [86.38589, 1.94846], [90.8108, 1.27669], [100, 0],
+    [0, 0], [0.43123, -0.57176], [1.47147, -1.09275], [3.92479, -1.77203], [7.79506, -2.3727],
+    [12.0143, -2.76684], [16.32276, -3.02746], [20.67013, -3.19868], [25.03792, -3.30615], [29.41554, -3.36298],
+    [33.79772, -3.37697], [38.18675, -3.35304], [42.57527, -3.29378], [46.96278, -3.20029], [51.35062, -3.07206],
+    [55.73662, -2.9106], [60.12075, -2.71424], [64.50502, -2.48323], [68.8901, -2.21935], [73.28011, -1.92575],
+    [77.67783, -1.61034], [82.07965, -1.28273], [86.47978, -0.94874], [100, 0]
+])
+
+@instrumented("geometry.process_airfoil")
+def process_airfoil(data, scale_factor=1.6):
+    """
+    Process airfoil data, scale x-coordinates, and prepare interpolations for upper and lower surfaces.
+
+    Parameters:
+        data (numpy.ndarray): Airfoil data as a 2D array (x, y). It is not modified.
+        scale_factor (float): Scaling factor for x-coordinates.
+
+    Returns:
+        dict: A dictionary containing interpolation objects for upper and lower surfaces.
+    """
+    # Scale x-coordinates (on a copy, so processing the same array twice is safe)
+    data = np.array(data, dtype=float)
+    data[:, 0] *= scale_factor
+
+    # Separate into upper and lower surfaces
+    upper_surface = data[:25]
+    lower_surface = data[25:]
+
+    # Remove duplicate (0, 0) from lower surface
+    lower_surface = lower_surface[1:]
+
+    # Create cubic interpolations for both surfaces
+    from scipy.interpolate import CubicSpline
+
+    upper_interp = CubicSpline(upper_surface[:, 0], upper_surface[:, 1])
+    lower_interp = CubicSpline(lower_surface[:, 0], lower_surface[:, 1])
+
+    return {"upper": upper_interp, "lower": lower_interp}
+
+
+@instrumented("geometry.get_slope", rows=np.size)
+def get_slope(interpolations, x, surface="upper"):
+    """
+    Calculate the slope of the airfoil at a given x-coordinate.
+
+    Parameters:
+        interpolations (dict): Dictionary containing interpolation objects for "upper" and "lower" surfaces.
+        x (float): x-coordinate to calculate the slope.
+        surface (str): Specify "upper" or "lower" to choose the surface.
+
+    Returns:
+        float: The slope at the given x-coordinate on the specified surface.
+    """
+    if surface not in interpolations:
+        raise ValueError("Invalid surface. Choose 'upper' or 'lower'.")
+
+    # Get the derivative (slope) of the cubic spline at x, building it only once per spline
+    spline = interpolations[surface]
+    derivative = _derivatives.get(spline)
+    if derivative is None:
+        derivative = _derivatives[spline] = spline.derivative()
+    return derivative(x)
+
+
+_derivatives = weakref.WeakKeyDictionary()
+
+
+def _read_only(array):
+    array = np.asarray(array)
+    array.setflags(write=False)
+    return array
+
+
+class AirfoilGeometry:
+    """
+    Immutable airfoil geometry built from a coordinate table.
+
+    The upper/lower splines and their derivatives are built once per chord
+    scale, and the surface and slope tables of the last `max_tables` x-grids
+    are memoized, so repeated sweeps fetch precomputed (read-only) arrays.
+    Both memos drop the least recently used entry when full.
+    """
+
+    def __init__(self, data=AIRFOIL_DATA, max_tables=MAX_TABLES, max_splines=MAX_SPLINES):
+        self._data = _read_only(np.array(data, dtype=float))
+        self._splines = LRUCache(max_splines)
+        self._tables = LRUCache(max_tables)
+
+    @property
+    def data(self):
+        """The (read-only) coordinate table."""
+        return self._data
+
+    def interpolations(self, scale_factor=1.6):
+        """
+        Return the surface splines for a chord scale, as `process_airfoil` does.
+
+        The dictionary also holds the derivative splines under "upper_slope" and "lower_slope".
+        """
+        splines = self._splines.get(scale_factor)
+        if splines is None:
+            splines = process_airfoil(self._data, scale_factor)
+            splines["upper_slope"] = splines["upper"].derivative()
+            splines["lower_slope"] = splines["lower"].derivative()
+            self._splines.put(scale_factor, splines)
+        return dict(splines)
+
+    def _table(self, kind, x, scale_factor):
+        x = np.asarray(x, dtype=float)
+        key = (kind, scale_factor, x.shape, x.tobytes())
+        table = self._tables.get(key)
+        if table is None:
+            splines = self.interpolations(scale_factor)
+            suffix = "_slope" if kind == "slope" else ""
+            table = (_read_only(splines["upper" + suffix](x)), _read_only(splines["lower" + suffix](x)))
+            self._tables.put(key, table)
+        return table
+
+    def surfaces(self, x, scale_factor=1.6):
+        """
+        Return the upper and lower surface heights at x.
+
+        Parameters:
+            x (numpy.ndarray): x-coordinates, scaled by `scale_factor` like the splines.
+            scale_factor (float): Scaling factor for x-coordinates.
+
+        Returns:
+            tuple: Read-only arrays of the upper and lower surface heights.
+        """
+        return self._table("surface", x, scale_factor)
+
+    def slopes(self, x, scale_factor=1.6):
+        """
+        Return the upper and lower surface slopes (dy/dx) at x.
+
+        Parameters:
+            x (numpy.ndarray): x-coordinates, scaled by `scale_factor` like the splines.
+            scale_factor (float): Scaling factor for x-coordinates.
+
+        Returns:
+            tuple: Read-only arrays of the upper and lower surface slopes.
+        """
+        return self._table("slope", x, scale_factor)
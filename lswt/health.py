@@ -0,0 +1,332 @@
+"""
+Tap health screening and integration over the healthy taps only.
+
+Every check runs on the whole runs x taps array at once and sets a bit in
+a uint8 flag array of the same shape:
+
+    DEAD       not finite, or the port barely changes over the whole log (blocked)
+    SATURATED  pinned at the transducer limit, or at a column extreme that repeats (clipped)
+    CP_LIMIT   C_p above stagnation (plus a margin for the nominal Vinf in q)
+    NOISY      jitter between adjacent alphas far above that of the neighbouring taps
+    BIASED     sticks out of its neighbours along the surface in most runs (leaking)
+    OUTLIER    sticks out of both its neighbours along the surface and its adjacent
+               alpha runs, so a suction peak or a stall jump alone is not flagged
+
+"Sticks out" is measured as the distance of a value outside the range of
+its two neighbours, relative to the spread of those neighbours, so steep
+but smooth regions near the leading edge are not mistaken for faults.
+
+`masked_polar` and `masked_wake_drag` then reduce every run with only its
+unflagged taps and probes. Runs are grouped by their mask pattern and the
+weights are built once per pattern, so the cost grows with the number of
+distinct patterns (usually a handful), not with the number of runs.
+"""
+import numpy as np
+
+from .polar import SCALE_FACTOR, X_DATA, calculate_polar, polar_weights, split_surfaces
+from .pressure import Vinf, calculate_cp_rows, pressure_coefficient
+
+# Flag bits
+DEAD = 1
+SATURATED = 2
+NOISY = 4
+CP_LIMIT = 8
+BIASED = 16
+OUTLIER = 32
+FLAG_NAMES = {DEAD: "dead", SATURATED: "saturated", NOISY: "noisy", CP_LIMIT: "cp_limit", BIASED: "biased",
+              OUTLIER: "outlier"}
+
+MIN_RUNS = 3  # Runs needed for the checks that compare runs
+DEAD_SPAN = 0.5  # Pa; a port whose reading spans less than this over the log is blocked
+SATURATION_RUNS = 3  # Runs at exactly the same column extreme that count as clipping
+SATURATION_FRACTION = 0.002  # ... or this fraction of the runs, as long logs repeat values by resolution alone
+CP_MAX = 1.15  # Stagnation is C_p = 1; the margin covers q from the nominal Vinf
+RATIO_FLOOR = 0.1  # C_p added to the neighbour spread, so flat regions are not judged on noise
+OUTLIER_RATIO = 1.0  # Distance outside the neighbours, relative to their spread, of an outlier
+BIAS_RATIO = 0.5  # Median (over runs) of that ratio along the surface of a biased tap
+NOISE_RATIO = 3.0  # Jitter of a noisy tap relative to its neighbouring taps
+NOISE_FLOOR = 0.05  # C_p; jitter below this is never noisy
+
+# Columns of the per-run table of `screened_reduction`
+SCREENED_COLUMNS = ["run", "alpha", "cl", "cd", "cm", "x_cop", "cd_wake", "cd_wake_momentum", "cd_wake_pressure",
+                    "taps_flagged", "probes_flagged"]
+
+
+def _neighbour_ratio(values):
+    """
+    Distance of every value outside the range of its two neighbours along axis 1,
+    relative to their spread. The first and last columns are 0.
+    """
+    ratio = np.zeros(values.shape)
+    if values.shape[1] < 3:
+        return ratio
+    low = np.minimum(values[:, :-2], values[:, 2:])
+    high = np.maximum(values[:, :-2], values[:, 2:])
+    middle = values[:, 1:-1]
+    with np.errstate(invalid='ignore'):
+        outside = np.maximum(np.maximum(low - middle, middle - high), 0)
+        ratio[:, 1:-1] = np.nan_to_num(outside / (RATIO_FLOOR + high - low))
+    return ratio
+
+
+def screen_taps(pressure, coefficient, alpha, x, groups=None, cp_max=CP_MAX, limits=None):
+    """
+    Flag unhealthy taps of every run.
+
+    Parameters:
+        pressure (numpy.ndarray): Port pressures (runs x taps), for the dead and saturated checks.
+        coefficient (numpy.ndarray): Their pressure coefficients (runs x taps).
+        alpha (numpy.ndarray): Angle of attack of every run (degrees).
+        x (numpy.ndarray): Position of every tap along its surface or rake.
+        groups (list): Index arrays of taps that are neighbours of each other (e.g. the upper
+            and lower surface). Defaults to all taps in one group.
+        cp_max (float): Largest physical coefficient (None to skip the check).
+        limits (tuple): Transducer range (low, high) in the units of `pressure`.
+
+    Returns:
+        numpy.ndarray: Flags (runs x taps, uint8) made of the bits in FLAG_NAMES.
+    """
+    pressure = np.atleast_2d(np.asarray(pressure, dtype=float))
+    coefficient = np.atleast_2d(np.asarray(coefficient, dtype=float))
+    alpha = np.asarray(alpha, dtype=float)
+    x = np.asarray(x, dtype=float)
+    groups = [np.arange(len(x))] if groups is None else groups
+    runs = len(pressure)
+    flags = np.zeros(pressure.shape, dtype=np.uint8)
+
+    finite = np.isfinite(pressure) & np.isfinite(coefficient)
+    flags[~finite] |= DEAD
+    if runs >= MIN_RUNS:
+        with np.errstate(invalid='ignore'):
+            span = np.nanmax(pressure, axis=0) - np.nanmin(pressure, axis=0)
+        flags[:, ~(span >= DEAD_SPAN)] |= DEAD
+
+    if limits is not None:
+        flags[(pressure <= limits[0]) | (pressure >= limits[1])] |= SATURATED
+    if runs >= MIN_RUNS:
+        # Clipped readings repeat the column extreme exactly; a blocked (constant) port is only dead
+        repeats = max(SATURATION_RUNS, SATURATION_FRACTION * runs)
+        for extreme in (np.nanmax, np.nanmin):
+            at_extreme = pressure == extreme(pressure, axis=0)
+            clipped = (at_extreme.sum(axis=0) >= repeats) & (span >= DEAD_SPAN)
+            flags[at_extreme & clipped] |= SATURATED
+
+    if cp_max is not None:
+        with np.errstate(invalid='ignore'):
+            flags[coefficient > cp_max] |= CP_LIMIT
+
+    # Neighbours along the surface, taps ordered by position within every group
+    spatial = np.zeros(pressure.shape)
+    for group in groups:
+        group = np.asarray(group)[np.argsort(x[group], kind='stable')]
+        spatial[:, group] = _neighbour_ratio(coefficient[:, group])
+    if runs < MIN_RUNS:
+        return flags
+
+    # Neighbours in alpha, runs ordered by angle of attack
+    order = np.argsort(alpha, kind='stable')
+    in_alpha = np.empty(pressure.shape)
+    in_alpha[order] = _neighbour_ratio(coefficient[order].T).T
+    flags[(spatial > OUTLIER_RATIO) & (in_alpha > OUTLIER_RATIO)] |= OUTLIER
+    flags[:, np.median(spatial, axis=0) > BIAS_RATIO] |= BIASED
+
+    # Jitter: RMS second difference over alpha, against the larger of the neighbouring taps
+    jitter = np.sqrt(np.nanmean(np.diff(coefficient[order], 2, axis=0)**2, axis=0))
+    for group in groups:
+        group = np.asarray(group)[np.argsort(x[group], kind='stable')]
+        if len(group) < 2:
+            continue
+        values = jitter[group]
+        neighbours = np.concatenate(([values[1]], np.maximum(values[:-2], values[2:]), [values[-2]]))
+        noisy = (values > NOISE_RATIO * neighbours) & (values > NOISE_FLOOR)
+        flags[:, group[noisy]] |= NOISY
+    return flags
+
+
+def screen_log(data, positions, rows=slice(None), vinf=Vinf, cp_max=CP_MAX, limits=None):
+    """
+    Screen the surface taps, rake total and rake static probes of a TunnelLog.
+
+    Parameters:
+        data (TunnelLog): Parsed log.
+        positions (list): Chordwise tap positions (% chord), upper then lower surface.
+        rows: Rows (positions, not run numbers) to screen (default: all).
+        vinf (float): Freestream velocity of the Cp.
+        cp_max (float): Largest physical coefficient.
+        limits (tuple): Transducer range (low, high) in Pa.
+
+    Returns:
+        dict: "run", "alpha" and the flags (runs x ports, uint8) of the "surface",
+            "rake_total" and "rake_static" ports.
+    """
+    from .data import COLUMN_MAP
+    from .wakedrag import ps_positions, pt_positions
+
+    positions = np.asarray(positions, dtype=float)
+    C_p, alpha, C_pt_wake = calculate_cp_rows(data, rows, vinf)
+    static = data.block(*COLUMN_MAP["rake_static"])[rows]
+    static_cp = pressure_coefficient(static, data[COLUMN_MAP["reference"]][rows], data.rho[rows], vinf)
+    return {
+        "run": data.run[rows],
+        "alpha": alpha,
+        "surface": screen_taps(data.block(*COLUMN_MAP["surface_taps"])[rows], C_p, alpha, positions,
+                               split_surfaces(positions), cp_max, limits),
+        "rake_total": screen_taps(data.block(*COLUMN_MAP["rake_total"])[rows], C_pt_wake, alpha, pt_positions,
+                                  cp_max=cp_max, limits=limits),
+        "rake_static": screen_taps(static, static_cp, alpha, ps_positions, cp_max=cp_max, limits=limits),
+    }
+
+
+def _patterns(mask):
+    """Yield every distinct mask row and the rows that have it."""
+    # One integer per row when the packed mask fits in 64 bits; sorting rows as records is far slower
+    packed = np.packbits(mask, axis=1)
+    if packed.shape[1] <= 8:
+        keys = np.zeros((len(mask), 8), dtype=np.uint8)
+        keys[:, :packed.shape[1]] = packed
+        keys = keys.view(np.uint64)[:, 0]
+    else:
+        keys = packed
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True, axis=0 if keys.ndim == 2 else None)
+    inverse = inverse.reshape(-1)
+    for k, row in enumerate(first):
+        yield mask[row], np.flatnonzero(inverse == k)
+
+
+def masked_polar(C_p, alpha, mask, positions, x_data=None, geometry=None, scale_factor=SCALE_FACTOR):
+    """
+    Reduce every run to its polar with only the taps of its mask.
+
+    Parameters:
+        C_p (numpy.ndarray): Pressure coefficients (runs x taps).
+        alpha (numpy.ndarray): Angle of attack of every run (degrees).
+        mask (numpy.ndarray): Taps to use (runs x taps, bool), e.g. `flags == 0`.
+        positions (list): Chordwise tap positions (% chord), upper then lower surface.
+        x_data (numpy.ndarray): Chordwise integration grid (x/c). Defaults to X_DATA.
+        geometry (AirfoilGeometry): Airfoil geometry. Defaults to the tunnel model.
+        scale_factor (float): Chord scale the surface slopes are taken at.
+
+    Returns:
+        dict: The arrays of `calculate_polar` plus "taps_used" per run. Runs without a
+            usable tap on either surface are NaN.
+    """
+    from .geometry import AirfoilGeometry
+
+    C_p = np.atleast_2d(np.asarray(C_p, dtype=float))
+    alpha = np.atleast_1d(np.asarray(alpha, dtype=float))
+    mask = np.broadcast_to(np.asarray(mask, dtype=bool), C_p.shape)
+    x_data = X_DATA if x_data is None else np.asarray(x_data, dtype=float)
+    geometry = AirfoilGeometry() if geometry is None else geometry
+    upper_slopes, lower_slopes = geometry.slopes(x_data * (100 * scale_factor), scale_factor)
+
+    result = {name: np.empty(len(C_p)) for name in ["cn", "ca", "cm", "cl", "cd", "x_cop"]}
+    result["alpha"] = alpha
+    for pattern, rows in _patterns(mask):
+        weights = polar_weights(positions, x_data, upper_slopes, lower_slopes, mask=pattern)
+        # Masked taps may hold NaN; their weight is 0 but NaN * 0 is still NaN
+        polar = calculate_polar(np.where(pattern, C_p[rows], 0.0), alpha[rows], weights)
+        for name in result:
+            if name != "alpha":
+                result[name][rows] = polar[name]
+    result["taps_used"] = mask.sum(axis=1)
+    return result
+
+
+def masked_wake_drag(pt, ps, rho, total_mask=None, static_mask=None, pt_pos=None, ps_pos=None, **kwargs):
+    """
+    Wake rake drag of every run with only the probes of its masks.
+
+    Parameters:
+        pt (numpy.ndarray): Total pressures (runs x total probes).
+        ps (numpy.ndarray): Static pressures (runs x static probes).
+        rho (numpy.ndarray): Air density of every run.
+        total_mask (numpy.ndarray): Total probes to use (runs x probes, bool; default all).
+        static_mask (numpy.ndarray): Static probes to use (runs x probes, bool; default all).
+        pt_pos (numpy.ndarray): Total pressure probe positions.
+        ps_pos (numpy.ndarray): Static pressure probe positions.
+        **kwargs: Passed on to `wake_drag` (u_inf, p_inf, chord).
+
+    Returns:
+        dict: The arrays of `wake_drag`, with NaN wake velocities at masked probes, plus
+            "probes_used" per run. Runs with fewer than two usable probes of either kind are NaN.
+    """
+    from .wakedrag import ps_positions, pt_positions, wake_drag
+
+    pt = np.atleast_2d(np.asarray(pt, dtype=float))
+    ps = np.atleast_2d(np.asarray(ps, dtype=float))
+    runs = len(pt)
+    rho = np.broadcast_to(np.asarray(rho, dtype=float), (runs,))
+    pt_pos = pt_positions if pt_pos is None else np.asarray(pt_pos, dtype=float)
+    ps_pos = ps_positions if ps_pos is None else np.asarray(ps_pos, dtype=float)
+    total_mask = np.ones(pt.shape, dtype=bool) if total_mask is None else np.asarray(total_mask, dtype=bool)
+    static_mask = np.ones(ps.shape, dtype=bool) if static_mask is None else np.asarray(static_mask, dtype=bool)
+    # Per-run freestream values have to follow their runs into the pattern groups
+    per_run = {name: np.broadcast_to(np.asarray(value, dtype=float), (runs,)) for name, value in kwargs.items()
+               if name in ("u_inf", "p_inf") and value is not None}
+
+    result = {name: np.full(runs, np.nan) for name in ["cd", "cd_momentum", "cd_pressure", "u_inf", "p_inf"]}
+    result["velocity"] = np.full(pt.shape, np.nan)
+    total_probes = pt.shape[1]
+    for pattern, rows in _patterns(np.hstack((total_mask, static_mask))):
+        total, static = pattern[:total_probes], pattern[total_probes:]
+        if total.sum() < 2 or static.sum() < 2:
+            continue
+        options = {**kwargs, **{name: value[rows] for name, value in per_run.items()}}
+        wake = wake_drag(pt[np.ix_(rows, total)], ps[np.ix_(rows, static)], rho[rows], pt_pos=pt_pos[total],
+                         ps_pos=ps_pos[static], **options)
+        for name in ["cd", "cd_momentum", "cd_pressure", "u_inf", "p_inf"]:
+            result[name][rows] = wake[name]
+        result["velocity"][np.ix_(rows, total)] = wake["velocity"]
+    result["probes_used"] = total_mask.sum(axis=1) + static_mask.sum(axis=1)
+    return result
+
+
+def screened_reduction(data, positions, rows=slice(None), vinf=Vinf, cp_max=CP_MAX, limits=None):
+    """
+    Screen a TunnelLog and reduce its polar and wake rake drag over the healthy ports only.
+
+    Returns:
+        tuple: A dict of SCREENED_COLUMNS arrays (one value per run) and the flags of
+            `screen_log`.
+    """
+    from .data import COLUMN_MAP
+
+    flags = screen_log(data, positions, rows, vinf, cp_max, limits)
+    C_p, alpha, _ = calculate_cp_rows(data, rows, vinf)
+    polar = masked_polar(C_p, alpha, flags["surface"] == 0, positions)
+    wake = masked_wake_drag(data.block(*COLUMN_MAP["rake_total"])[rows], data.block(*COLUMN_MAP["rake_static"])[rows],
+                            data.rho[rows], flags["rake_total"] == 0, flags["rake_static"] == 0)
+    table = {
+        "run": flags["run"],
+        "alpha": alpha,
+        "cl": polar["cl"],
+        "cd": polar["cd"],
+        "cm": polar["cm"],
+        "x_cop": polar["x_cop"],
+        "cd_wake": wake["cd"],
+        "cd_wake_momentum": wake["cd_momentum"],
+        "cd_wake_pressure": wake["cd_pressure"],
+        "taps_flagged": (flags["surface"] != 0).sum(axis=1),
+        "probes_flagged": (flags["rake_total"] != 0).sum(axis=1) + (flags["rake_static"] != 0).sum(axis=1),
+    }
+    return table, flags
+
+
+def flag_summary(flags, columns):
+    """
+    Describe the flagged ports.
+
+    Parameters:
+        flags (numpy.ndarray): Flags (runs x ports).
+        columns (list): Port names.
+
+    Returns:
+        dict: Port name -> {flag name: number of runs flagged} for every flagged port.
+    """
+    summary = {}
+    for bit, name in FLAG_NAMES.items():
+        counts = ((flags & bit) != 0).sum(axis=0)
+        for column, count in zip(columns, counts):
+            if count:
+                summary.setdefault(column, {})[name] = int(count)
+    return summary
@@ -0,0 +1,172 @@
+"""
+Live mode: follow a tunnel log while the acquisition software appends to it.
+
+Only the complete lines added since the last poll are parsed. They are
+appended to the in-memory TunnelLog, and only the new runs are reduced, so
+the cost per point does not depend on how many runs came before.
+"""
+import os
+import time
+
+import numpy as np
+
+from .data import HEADER_LINES, TunnelLog, parse_rows
+
+# Results kept per run by LiveReduction
+LIVE_COLUMNS = ["run", "alpha", "cl", "cd", "cm", "x_cop", "cd_wake"]
+
+
+class LogFollower:
+    """Read the complete lines appended to a growing tunnel log since the last poll (like tail -f)."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.columns = None
+        self.restarted = False
+        self._offset = 0
+
+    def poll(self):
+        """
+        Return the rows appended since the last call.
+
+        Returns:
+            numpy.ndarray: New rows (possibly none), or None while the file or its header is incomplete.
+        """
+        self.restarted = False
+        try:
+            size = os.path.getsize(self.file_path)
+        except FileNotFoundError:
+            return None
+        if size < self._offset:
+            # The log was truncated or replaced: start over
+            self._offset = 0
+            self.columns = None
+            self.restarted = True
+
+        with open(self.file_path, 'rb') as f:
+            f.seek(self._offset)
+            chunk = f.read(size - self._offset)
+
+        # Leave an incomplete last line for the next poll
+        end = chunk.rfind(b'\n') + 1
+        if end == 0:
+            return None if self.columns is None else np.empty((0, len(self.columns)))
+        text = chunk[:end].decode()
+
+        if self.columns is None:
+            lines = text.split('\n', HEADER_LINES)
+            if len(lines) <= HEADER_LINES:
+                return None
+            self.columns = lines[0].split()
+            self._offset += len('\n'.join(lines[:HEADER_LINES]).encode()) + 1
+            text = lines[HEADER_LINES]
+            end = len(text.encode())
+
+        self._offset += end
+        return parse_rows(text, self.columns, source=self.file_path)
+
+
+class LiveReduction:
+    """
+    Incrementally reduce a growing tunnel log.
+
+    Every `update` parses the new lines, appends them to `data` and computes
+    the Cp, polar and wake rake drag of the new runs only.
+    """
+
+    def __init__(self, file_path, weights):
+        self.file_path = file_path
+        self.weights = weights
+        self.follower = LogFollower(file_path)
+        self.data = None
+        self._chunks = []
+
+    def update(self):
+        """
+        Process the lines appended since the last update.
+
+        Returns:
+            dict: Arrays of LIVE_COLUMNS, "C_p" and the wake "velocity" for the new runs,
+                or None if there are none.
+        """
+        from .polar import calculate_polar
+        from .pressure import calculate_cp_rows
+        from .wakedrag import wake_drag_rows
+
+        rows = self.follower.poll()
+        if self.follower.restarted:
+            self.data = None
+            self._chunks = []
+        if rows is None or not len(rows):
+            return None
+
+        if self.data is None:
+            self.data = TunnelLog(rows, self.follower.columns, source=self.file_path)
+        else:
+            self.data.append(rows)
+        new_rows = np.arange(len(self.data) - len(rows), len(self.data))
+
+        C_p, alpha, _ = calculate_cp_rows(self.data, new_rows)
+        polar = calculate_polar(C_p, alpha, self.weights)
+        wake = wake_drag_rows(self.data, new_rows)
+
+        result = {name: polar[name] for name in ("alpha", "cl", "cd", "cm", "x_cop")}
+        result["run"] = self.data["Run_nr"][new_rows].astype(int)
+        result["cd_wake"] = wake["cd"]
+        result["C_p"] = C_p
+        result["velocity"] = wake["velocity"]
+        self._chunks.append(result)
+        return result
+
+    @property
+    def results(self):
+        """All results so far, as arrays of LIVE_COLUMNS, "C_p" and the wake "velocity"."""
+        if not self._chunks:
+            return None
+        if len(self._chunks) > 1:
+            self._chunks = [{name: np.concatenate([chunk[name] for chunk in self._chunks])
+                             for name in self._chunks[0]}]
+        return self._chunks[0]
+
+    def follow(self, callback=None, interval=0.2, timeout=None):
+        """
+        Poll the log until `timeout` seconds pass without new lines (forever if None).
+
+        Parameters:
+            callback (callable): Called with the result of every update that has new runs.
+            interval (float): Seconds between polls.
+            timeout (float): Stop after this many seconds without new lines.
+        """
+        last_data = time.monotonic()
+        while True:
+            result = self.update()
+            if result is not None:
+                last_data = time.monotonic()
+                if callback is not None:
+                    callback(result)
+            elif timeout is not None and time.monotonic() - last_data > timeout:
+                return
+            time.sleep(interval)
+
+
+def replay_log(source, target, interval=1.0, initial_runs=0):
+    """
+    Stand in for the acquisition system: copy a tunnel log line by line into `target`.
+
+    Parameters:
+        source (str): Existing tunnel log.
+        target (str): Log file to write (overwritten).
+        interval (float): Seconds between runs.
+        initial_runs (int): Runs written at once before the timed replay starts.
+    """
+    with open(source, 'r') as f:
+        lines = f.readlines()
+    header, runs = lines[:HEADER_LINES], lines[HEADER_LINES:]
+
+    with open(target, 'w') as f:
+        f.writelines(header + runs[:initial_runs])
+        f.flush()
+        for line in runs[initial_runs:]:
+            time.sleep(interval)
+            f.write(line if line.endswith('\n') else line + '\n')
+            f.flush()
@@ -0,0 +1,251 @@
+"""
+Inviscid reference Cp from a source/vortex (Hess-Smith) panel method.
+
+The airfoil contour of AirfoilGeometry is cut into cosine-spaced flat
+panels, each with its own constant source strength, plus one vortex
+strength shared by all panels; the Kutta condition closes the system. The
+influence matrix is assembled with array operations a block of rows at a
+time and LU-factorized once. The freestream enters the right-hand side as
+cos(alpha) and sin(alpha) terms only, so one two-column solve gives the
+flow at every angle of attack of a sweep.
+
+The predicted Cp is interpolated to the pressure taps with the same
+linear maps as the polar, for overlay on the measured Cp and for delta-Cp
+statistics per run and per tap.
+"""
+import numpy as np
+
+from .polar import interpolation_matrix, split_surfaces
+from .profiling import instrumented
+
+PANELS = 400  # Default number of panels around the airfoil
+BLOCK_BYTES = 64 * 2**20  # Memory budget of the influence coefficients built at once
+
+# Columns of the per-run comparison table of `compare_cp`
+COMPARISON_COLUMNS = ["cl_panel", "dcp_mean", "dcp_rms", "dcp_max"]
+
+
+def _contour(data):
+    """
+    Closed parametric spline through the coordinate table, from the trailing edge along the
+    lower surface to the leading edge and back along the upper surface.
+
+    Returns:
+        tuple: The x and y splines (% chord) of the arc length, the arc length of the
+            leading edge (smallest x) and the total arc length.
+    """
+    from scipy.interpolate import CubicSpline
+
+    data = np.asarray(data, dtype=float)
+    upper, lower = data[:25], data[25:]
+    # Both surfaces start at the same leading edge point; keep it once
+    points = np.vstack((lower[::-1], upper[1:]))
+    s = np.concatenate(([0.0], np.cumsum(np.hypot(*np.diff(points, axis=0).T))))
+    x_spline = CubicSpline(s, points[:, 0])
+    y_spline = CubicSpline(s, points[:, 1])
+
+    # The nose is round, so the smallest x lies near (not exactly at) the table's leading edge point
+    nose = len(lower) - 1
+    roots = x_spline.derivative().roots(extrapolate=False)
+    roots = roots[(roots > s[nose - 1]) & (roots < s[nose + 1])]
+    leading_edge = roots[np.argmin(x_spline(roots))] if len(roots) else s[nose]
+    return x_spline, y_spline, leading_edge, s[-1]
+
+
+def panel_nodes(geometry=None, panels=PANELS):
+    """
+    Return the panel end points around the airfoil, in chord units.
+
+    The nodes lie on one closed spline through the coordinate table, so the
+    surface is smooth around the leading edge, and are cosine spaced in arc
+    length over each surface, so the panels are short near the leading and
+    trailing edges. They run from the trailing edge along the lower surface
+    to the leading edge and back along the upper surface, and the trailing
+    edge node appears at both ends.
+
+    Parameters:
+        geometry (AirfoilGeometry): Airfoil geometry. Defaults to the tunnel model.
+        panels (int): Number of panels (even).
+
+    Returns:
+        tuple: x/c and y/c of the panels + 1 nodes.
+    """
+    from .geometry import AirfoilGeometry
+
+    if panels < 4 or panels % 2:
+        raise ValueError(f"The number of panels must be even and at least 4, got {panels}")
+    geometry = AirfoilGeometry() if geometry is None else geometry
+
+    x_spline, y_spline, leading_edge, length = _contour(geometry.data)
+    spacing = 0.5 * (1 - np.cos(np.linspace(0, np.pi, panels // 2 + 1)))
+    s = np.concatenate((leading_edge * spacing, leading_edge + (length - leading_edge) * spacing[1:]))
+    return x_spline(s) / 100, y_spline(s) / 100
+
+
+class PanelSolver:
+    """
+    Source/vortex panel method for one airfoil, factorized once for any number of alphas.
+
+    Parameters:
+        geometry (AirfoilGeometry): Airfoil geometry. Defaults to the tunnel model.
+        panels (int): Number of panels (even); thousands are fine.
+        block_bytes (int): Memory budget of the influence coefficients built at once.
+    """
+
+    def __init__(self, geometry=None, panels=PANELS, block_bytes=BLOCK_BYTES):
+        from scipy.linalg import lu_factor, lu_solve
+
+        self.panels = panels
+        self.block_bytes = block_bytes
+        self.x_nodes, self.y_nodes = panel_nodes(geometry, panels)
+
+        dx = np.diff(self.x_nodes)
+        dy = np.diff(self.y_nodes)
+        self.length = np.hypot(dx, dy)
+        self.theta = np.arctan2(dy, dx)
+        self._sin = dy / self.length
+        self._cos = dx / self.length
+        self.x = 0.5 * (self.x_nodes[:-1] + self.x_nodes[1:])  # Control points at the panel midpoints
+        self.y = 0.5 * (self.y_nodes[:-1] + self.y_nodes[1:])
+
+        # Unknowns: the source strength of every panel, then the vortex strength
+        system = np.empty((panels + 1, panels + 1))
+        for rows, normal, _ in self._influence_blocks():
+            system[rows] = normal
+        # Kutta condition: equal tangential velocities leaving the trailing edge
+        kutta = next(self._influence_blocks([0, panels - 1]))[2]
+        system[panels] = kutta[0] + kutta[1]
+
+        # The freestream normal and tangential velocities are linear in (cos(alpha), sin(alpha))
+        rhs = np.zeros((panels + 1, 2))
+        rhs[:panels, 0] = self._sin
+        rhs[:panels, 1] = -self._cos
+        rhs[panels] = -np.array([self._cos[0] + self._cos[-1], self._sin[0] + self._sin[-1]])
+        self.strengths = lu_solve(lu_factor(system, overwrite_a=True, check_finite=False), rhs, check_finite=False)
+
+        # Surface tangential velocity of both freestream components
+        self.tangential = np.empty((panels, 2))
+        self.tangential[:] = np.column_stack((self._cos, self._sin))
+        for rows, _, tangential in self._influence_blocks():
+            self.tangential[rows] += tangential @ self.strengths
+
+    def _influence_blocks(self, rows=None):
+        """
+        Yield (rows, normal, tangential) influence coefficients for blocks of control points.
+
+        Both matrices have one column per panel source plus one for the shared vortex.
+        """
+        n = self.panels
+        if rows is None:
+            block = max(1, int(self.block_bytes // (8 * 8 * (n + 1))))
+            blocks = [slice(start, min(start + block, n)) for start in range(0, n, block)]
+        else:
+            blocks = [np.asarray(rows)]
+
+        for rows in blocks:
+            # Control point to node vectors; the end of panel j is the start of panel j + 1
+            dx = self.x[rows, None] - self.x_nodes[None, :]
+            dy = self.y[rows, None] - self.y_nodes[None, :]
+            log_distance = 0.5 * np.log(dx**2 + dy**2)
+            # Log of the distance ratio to the panel ends and the angle the panel subtends
+            log_ratio = log_distance[:, 1:] - log_distance[:, :-1]
+            dx0, dy0, dx1, dy1 = dx[:, :-1], dy[:, :-1], dx[:, 1:], dy[:, 1:]
+            beta = np.arctan2(dy1 * dx0 - dx1 * dy0, dx0 * dx1 + dy0 * dy1)
+            own = np.arange(n)[rows]
+            log_ratio[np.arange(len(own)), own] = 0.0
+            beta[np.arange(len(own)), own] = np.pi
+
+            # sin and cos of theta_i - theta_j from the panel directions, without evaluating them per pair
+            sin = np.outer(self._sin[rows], self._cos) - np.outer(self._cos[rows], self._sin)
+            cos = np.outer(self._cos[rows], self._cos) + np.outer(self._sin[rows], self._sin)
+            normal = np.empty((len(own), n + 1))
+            tangential = np.empty((len(own), n + 1))
+            normal[:, :n] = (sin * log_ratio + cos * beta) / (2 * np.pi)
+            normal[:, n] = (cos * log_ratio - sin * beta).sum(axis=1) / (2 * np.pi)
+            tangential[:, :n] = (sin * beta - cos * log_ratio) / (2 * np.pi)
+            tangential[:, n] = (sin * log_ratio + cos * beta).sum(axis=1) / (2 * np.pi)
+            yield rows, normal, tangential
+
+    @instrumented("panel.solve", rows=lambda result: len(result["alpha"]))
+    def solve(self, alpha):
+        """
+        Return the panel Cp and Cl at every angle of attack.
+
+        Parameters:
+            alpha (array_like): Angles of attack (degrees).
+
+        Returns:
+            dict: "alpha", "C_p" (alphas x panels, at the control points `x`, `y`) and
+                "cl" from the circulation.
+        """
+        alpha = np.atleast_1d(np.asarray(alpha, dtype=float))
+        freestream = np.vstack((np.cos(np.radians(alpha)), np.sin(np.radians(alpha))))
+        velocity = self.tangential @ freestream
+        circulation = (self.strengths[-1] @ freestream) * self.length.sum()
+        return {"alpha": alpha, "C_p": 1 - velocity.T**2, "cl": 2 * circulation}
+
+    def tap_matrix(self, positions):
+        """
+        Return the matrix W such that C_p @ W.T gives the panel C_p at the taps.
+
+        Every tap is placed on its surface by x, then interpolated between the
+        control points by arc length, which (unlike x) keeps changing around
+        the nose. Taps at the trailing edge take the C_p of the last panel,
+        which approaches the inviscid stagnation value only slowly with the
+        number of panels.
+
+        Parameters:
+            positions (list): Chordwise tap positions (% chord), upper then lower surface.
+        """
+        positions = np.asarray(positions, dtype=float) / 100
+        upper_taps, lower_taps = split_surfaces(positions)
+        half = self.panels // 2
+        arc = np.concatenate(([0.0], np.cumsum(self.length)))
+        arc_control = 0.5 * (arc[:-1] + arc[1:])
+        surfaces = (
+            (upper_taps, np.arange(half, self.panels + 1), np.arange(half, self.panels)),
+            (lower_taps, np.arange(half + 1)[::-1], np.arange(half)),  # Nodes from leading to trailing edge
+        )
+
+        matrix = np.zeros((len(positions), self.panels))
+        for taps, nodes, panels in surfaces:
+            arc_taps = np.interp(positions[taps], self.x_nodes[nodes], arc[nodes])
+            matrix[np.ix_(taps, panels)] = interpolation_matrix(arc_taps, arc_control[panels])
+        return matrix
+
+    def tap_cp(self, alpha, positions):
+        """Return the panel C_p at the taps (alphas x taps) and the panel Cl at every alpha."""
+        result = self.solve(alpha)
+        return result["C_p"] @ self.tap_matrix(positions).T, result["cl"]
+
+
+def compare_cp(C_p, alpha, positions, solver=None):
+    """
+    Compare measured C_p with the panel prediction at the same angles of attack.
+
+    Parameters:
+        C_p (numpy.ndarray): Measured pressure coefficients (runs x taps).
+        alpha (numpy.ndarray): Angle of attack of every run (degrees).
+        positions (list): Chordwise tap positions (% chord), upper then lower surface.
+        solver (PanelSolver): Panel solver. Defaults to PANELS panels on the tunnel model.
+
+    Returns:
+        dict: "C_p_panel" and "delta" (measured - panel, runs x taps), per run "alpha",
+            "cl_panel", "dcp_mean", "dcp_rms" and "dcp_max" (largest magnitude), and per tap
+            "tap_mean" and "tap_rms".
+    """
+    solver = PanelSolver() if solver is None else solver
+    C_p = np.atleast_2d(np.asarray(C_p, dtype=float))
+    predicted, cl = solver.tap_cp(alpha, positions)
+    delta = C_p - predicted
+    return {
+        "alpha": np.atleast_1d(np.asarray(alpha, dtype=float)),
+        "C_p_panel": predicted,
+        "delta": delta,
+        "cl_panel": cl,
+        "dcp_mean": delta.mean(axis=1),
+        "dcp_rms": np.sqrt((delta**2).mean(axis=1)),
+        "dcp_max": np.abs(delta).max(axis=1),
+        "tap_mean": delta.mean(axis=0),
+        "tap_rms": np.sqrt((delta**2).mean(axis=0)),
+    }
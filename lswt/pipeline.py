@@ -0,0 +1,291 @@
+"""
+Incremental reduction pipeline with a content-hashed stage cache.
+
+The chain load -> Cp -> geometry -> integration weights -> polar -> wake
+drag -> plots is split into explicit stages. Every stage result is stored
+in a cache directory under a hash of its parameters and of the keys of the
+stages it depends on, so a stage only runs again when one of its inputs
+changed: editing the tap position file re-runs the weights, the polar and
+the plots, but not Cp, the geometry or the wake drag.
+
+The per-run stages (Cp, polar and wake drag) also store how many rows of
+the log they cover and the size and sha1 of the log file at that point.
+When runs were appended to the log only the new rows are reduced and added
+to the stored result. An unchanged log is recognised from the hash kept in
+its binary sidecar, so polling a log does not hash the runs already reduced.
+
+A stage result replaces the earlier result of the same stage and log, so
+the cache holds one entry per stage and log however often the inputs change.
+"""
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from .polar import SCALE_FACTOR, X_DATA
+from .pressure import Vinf
+from .profiling import stage as profile_stage
+
+PIPELINE_VERSION = 1  # Bump to invalidate every cached stage after a change to the reductions
+CACHE_DIR = ".lswt-cache"
+
+
+def _digest(*parts):
+    """Return the sha1 of JSON-serialisable parameters and arrays."""
+    digest = hashlib.sha1(str(PIPELINE_VERSION).encode())
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(np.ascontiguousarray(part, dtype=float).tobytes())
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _file_digest(file_path):
+    with open(file_path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class StageCache:
+    """Stage results stored as .npz files (with a JSON description) in one directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _paths(self, stage, key):
+        base = os.path.join(self.directory, f"{stage}-{key}")
+        return base + ".npz", base + ".json"
+
+    def load(self, stage, key):
+        """Return the (meta, arrays) stored for a stage key, or (None, None)."""
+        array_path, meta_path = self._paths(stage, key)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            with np.load(array_path, allow_pickle=False) as arrays:
+                return meta, dict(arrays)
+        except (OSError, ValueError):
+            return None, None
+
+    def save(self, stage, key, arrays, meta):
+        """
+        Store the arrays of a stage result. Failures to write are ignored.
+
+        If `meta` names the "source" log, the other results of the stage for that
+        log are removed, as they were made from inputs that have since changed.
+        """
+        array_path, meta_path = self._paths(stage, key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write to temporary files first so a concurrent reader never sees a partial result
+            with open(array_path + ".tmp", 'wb') as f:
+                np.savez(f, **arrays)
+            with open(meta_path + ".tmp", 'w') as f:
+                json.dump(meta, f)
+            os.replace(array_path + ".tmp", array_path)
+            os.replace(meta_path + ".tmp", meta_path)
+        except OSError:
+            return
+        if "source" in meta:
+            self.evict(stage, meta["source"], keep=key)
+
+    def evict(self, stage, source, keep=None):
+        """Remove the results of a stage for a source log, except the one under key `keep`."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        prefix = stage + "-"
+        for name in names:
+            if not name.startswith(prefix) or not name.endswith(".json") or name == f"{stage}-{keep}.json":
+                continue
+            key = name[len(prefix):-len(".json")]
+            try:
+                with open(os.path.join(self.directory, name), 'r') as f:
+                    if json.load(f).get("source") != source:
+                        continue
+            except (OSError, ValueError):
+                continue
+            for path in reversed(self._paths(stage, key)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+class Pipeline:
+    """
+    Reduce one tunnel log through cached stages.
+
+    Parameters:
+        file_path (str): Raw tunnel log.
+        positions_file (str): Chordwise tap positions file (% chord).
+        cache_dir (str): Stage cache directory (default: CACHE_DIR next to the log).
+        vinf (float): Freestream velocity used for Cp.
+        scale_factor (float): Chord scale the surface slopes are taken at.
+        x_data (numpy.ndarray): Chordwise integration grid (x/c).
+        rake_positions_file (str): Total pressure probe positions (mm). Defaults to the
+            positions in lswt.wakedrag.
+        plot_dir (str): Write the Cp, wake profile and polar plots to this directory.
+    """
+
+    def __init__(self, file_path, positions_file="positions p.txt", cache_dir=None, vinf=Vinf,
+                 scale_factor=SCALE_FACTOR, x_data=X_DATA, rake_positions_file=None, plot_dir=None):
+        self.file_path = file_path
+        self._source = os.path.abspath(file_path)
+        self.positions_file = positions_file
+        self.cache = StageCache(cache_dir or os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR))
+        self.vinf = vinf
+        self.scale_factor = scale_factor
+        self.x_data = np.asarray(x_data, dtype=float)
+        self.rake_positions_file = rake_positions_file
+        self.plot_dir = plot_dir
+        self.report = []
+        self.data = None
+        self._signature = None
+        self._prefixes = {}
+
+    def _log(self, stage, status, rows, start):
+        self.report.append((stage, status, rows, time.perf_counter() - start))
+
+    def _covers(self, signature):
+        """Return True if the log starts with the bytes a cached result was reduced from."""
+        from .data import has_prefix
+
+        if signature is None:
+            return False
+        if signature == self._signature:
+            return True
+        key = (signature["size"], signature["sha1"])
+        if key not in self._prefixes:
+            self._prefixes[key] = has_prefix(self.file_path, signature)
+        return self._prefixes[key]
+
+    def _stage(self, stage, key, compute):
+        """Run a stage that does not depend on the log rows, unless its result is cached."""
+        start = time.perf_counter()
+        with profile_stage("pipeline." + stage):
+            meta, arrays = self.cache.load(stage, key)
+            if meta is not None:
+                self._log(stage, "cached", 0, start)
+                return arrays
+            arrays = compute()
+            self.cache.save(stage, key, arrays, {"stage": stage, "source": self._source})
+        self._log(stage, "computed", 0, start)
+        return arrays
+
+    def _row_stage(self, stage, key, compute):
+        """
+        Run a per-run stage, reducing only the rows not covered by its cached result.
+
+        `compute(rows)` returns the arrays of the stage for a slice of log rows.
+        """
+        start = time.perf_counter()
+        n = len(self.data)
+        with profile_stage("pipeline." + stage) as profiled:
+            meta, arrays = self.cache.load(stage, key)
+            done = 0
+            if meta is not None and meta["rows"] <= n and self._covers(meta.get("log")):
+                done = meta["rows"]
+            if done == n:
+                self._log(stage, "cached", 0, start)
+                return arrays
+
+            profiled.rows = n - done
+            new = compute(slice(done, n))
+            arrays = new if not done else {name: np.concatenate((arrays[name], new[name])) for name in new}
+            self.cache.save(stage, key, arrays, {"stage": stage, "source": self._source, "rows": n,
+                                                 "log": self._signature})
+        self._log(stage, "extended" if done else "computed", n - done, start)
+        return arrays
+
+    def run(self):
+        """
+        Run every stage, reusing cached results where the inputs did not change.
+
+        Returns:
+            dict: Arrays of campaign.RESULT_COLUMNS, "C_p" (runs x taps) and the wake "velocity"
+                (runs x probes). The stages run are listed in `report` as
+                (stage, status, rows reduced, seconds).
+        """
+        from .data import load_log, log_signature
+        from .geometry import AirfoilGeometry
+        from .polar import calculate_polar, polar_weights
+        from .pressure import REFERENCE_COLUMN, SURFACE_TAPS, calculate_cp_rows, load_chordwise_positions
+        from .wakedrag import pt_positions, ps_positions, wake_drag_rows
+
+        self.report = []
+        self._prefixes = {}
+
+        start = time.perf_counter()
+        self.data = load_log(self.file_path)
+        # Taken after loading: lines appended in between are reduced again next time
+        self._signature = log_signature(self.file_path)
+        self._log("load", "loaded", len(self.data), start)
+        source = self._source
+
+        # Inputs read from small files are identified by their content
+        start = time.perf_counter()
+        positions_key = _file_digest(self.positions_file)
+        positions = load_chordwise_positions(self.positions_file)
+        rake_positions = pt_positions
+        if self.rake_positions_file is not None:
+            rake_positions = np.array(load_chordwise_positions(self.rake_positions_file)) / 1000
+        self._log("positions", "loaded", 0, start)
+
+        cp_key = _digest("cp", source, self.vinf, REFERENCE_COLUMN, SURFACE_TAPS)
+        cp = self._row_stage("cp", cp_key, lambda rows: dict(zip(
+            ("C_p", "alpha"), calculate_cp_rows(self.data, rows, vinf=self.vinf)[:2])))
+
+        geometry = AirfoilGeometry()
+        geometry_key = _digest("geometry", geometry.data, self.scale_factor, self.x_data)
+        slopes = self._stage("geometry", geometry_key, lambda: dict(zip(
+            ("upper_slopes", "lower_slopes"),
+            geometry.slopes(self.x_data * (100 * self.scale_factor), self.scale_factor))))
+
+        weights_key = _digest("weights", positions_key, geometry_key)
+        weights = self._stage("weights", weights_key, lambda: {"weights": polar_weights(
+            positions, self.x_data, slopes["upper_slopes"], slopes["lower_slopes"])})["weights"]
+
+        polar_key = _digest("polar", cp_key, weights_key)
+        polar = self._row_stage("polar", polar_key, lambda rows: calculate_polar(
+            cp["C_p"][rows], cp["alpha"][rows], weights))
+
+        wake_key = _digest("wake", source, rake_positions, ps_positions)
+        wake = self._row_stage("wake", wake_key, lambda rows: {
+            name: value for name, value in wake_drag_rows(self.data, rows, pt_pos=rake_positions).items()
+            if name != "alpha"})
+
+        result = {
+            "run": self.data.run,
+            "alpha": polar["alpha"],
+            "cl": polar["cl"],
+            "cd": polar["cd"],
+            "cm": polar["cm"],
+            "x_cop": polar["x_cop"],
+            "cd_wake": wake["cd"],
+            "cd_wake_momentum": wake["cd_momentum"],
+            "cd_wake_pressure": wake["cd_pressure"],
+            "C_p": cp["C_p"],
+            "velocity": wake["velocity"],
+        }
+
+        if self.plot_dir is not None:
+            self._plots(result, positions, rake_positions)
+        return result
+
+    def _plots(self, result, positions, rake_positions):
+        """Render the plots; unchanged plots are skipped by the render manifest."""
+        from .render import cp_profile_jobs, polar_jobs, render, wake_profile_jobs
+
+        start = time.perf_counter()
+        jobs = (cp_profile_jobs(result["C_p"], result["alpha"], result["run"], positions)
+                + wake_profile_jobs(result["velocity"], result["alpha"], result["run"], rake_positions * 1000)
+                + polar_jobs(result, result["cd_wake"]))
+        with profile_stage("pipeline.plots", rows=len(jobs)):
+            rendered = render(jobs, self.plot_dir)
+        if rendered["failed"]:
+            raise ValueError(f"{len(rendered['failed'])} plots failed: {sorted(rendered['failed'])}")
+        self._log("plots", f"{len(rendered['skipped'])} unchanged", len(rendered["rendered"]), start)
@@ -0,0 +1,145 @@
+# matplotlib is only imported when a plot is actually made, so the reduction
+# code stays fast to import and usable on machines without a display.
+from .profiling import instrumented
+
+
+def _figure(interactive, figsize=None):
+    """
+    Return a new figure and its axes.
+
+    Figures that are only saved are drawn on an Agg canvas of their own, so
+    the pyplot backend of the calling process is left as it is.
+    """
+    if interactive:
+        import matplotlib.pyplot as plt
+
+        fig = plt.figure(figsize=figsize)
+    else:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+    return fig, fig.subplots()
+
+
+def plot_cp_profile(positions, C_p, alpha, file_name=None, mask=None):
+    """
+    Plot the pressure coefficient profile, saving it to `file_name` or showing it.
+
+    Taps outside `mask` (bool per tap, e.g. from `health.screen_log`) are left out
+    of the surface lines and marked with grey crosses.
+    """
+    import numpy as np
+
+    from .pressure import split_cp_profile
+
+    positions = np.asarray(positions, dtype=float)
+    C_p = np.asarray(C_p, dtype=float)
+    mask = np.ones(len(C_p), dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+    C_p_upper, positions_upper, C_p_lower, positions_lower = split_cp_profile(positions, C_p)
+    mask_upper, _, mask_lower, _ = split_cp_profile(positions, mask)
+
+    fig, ax = _figure(file_name is None, figsize=(10, 6))
+    ax.plot(positions_upper[mask_upper], C_p_upper[mask_upper], marker='o', linestyle='-', color='blue',
+             label='Upper Surface')
+    ax.plot(positions_lower[mask_lower], C_p_lower[mask_lower], marker='o', linestyle='-', color='red',
+             label='Lower Surface')
+    if not mask.all():
+        ax.plot(positions[~mask], C_p[~mask], marker='x', linestyle='none', color='grey', label='Flagged taps')
+
+    # Ensure the y-axis is inverted for aerodynamic convention
+    ax.invert_yaxis()
+
+    ax.set_xlabel('Chordwise Position (%)')
+    ax.set_ylabel('Pressure Coefficient (Cp)')
+    ax.set_title(f'Pressure Coefficient Profile for α = {alpha}°')
+    ax.grid(True)
+    ax.legend()
+    _finish(fig, file_name)
+
+
+def plot_wake_profile(positions, C_pt_wake, alpha, file_name=None):
+    """Plot the wake total pressure coefficient profile."""
+    fig, ax = _figure(file_name is None, figsize=(10, 6))
+    ax.plot(positions, C_pt_wake, marker='o', linestyle='-', color='black')
+    ax.set_xlabel('Chordwise Position (mm)')
+    ax.set_ylabel('Pressure Coefficient (Cp)')
+    ax.set_title(f'Pressure Coefficient Profile for α = {alpha}°')
+    ax.grid(True)
+    _finish(fig, file_name)
+
+
+def plot_polar(polar, directory=".", show=False):
+    """
+    Save the Cl-alpha, drag bucket, Cm-alpha and x_cop-alpha plots of a polar.
+
+    Parameters:
+        polar (dict): Result of `calculate_polar`.
+        directory (str): Directory the PDF files are written to.
+        show (bool): Also show the drag bucket interactively.
+    """
+    import os
+
+    alpha = polar["alpha"]
+
+    # Plot 1: Cl vs Alpha
+    fig, ax = _figure(False)
+    ax.plot(alpha, polar["cl"], marker='o', color='b', label='Cl')
+    ax.set_xlabel("Angle of Attack ($\\alpha$)")
+    ax.set_ylabel("Lift Coefficient ($C_l$)")
+    ax.set_title("Airfoil Lift Coefficient vs Angle of Attack")
+    ax.grid(True)
+    ax.legend()
+    _finish(fig, os.path.join(directory, "Cl_vs_Alpha.pdf"))
+
+    # Plot 2: Cd vs Cl (Drag Bucket)
+    fig, ax = _figure(show)
+    ax.plot(polar["cl"], polar["cd"], marker='o', color='purple', label='Drag Bucket')
+    ax.set_xlabel("Drag Coefficient ($C_d$)")
+    ax.set_ylabel("Lift Coefficient ($C_l$)")
+    ax.set_title("Lift Coefficient vs Drag Coefficient (Drag Bucket)")
+    ax.grid(True)
+    ax.legend()
+    _finish(fig, os.path.join(directory, "Cl_vs_Cd.pdf"), show=show)
+
+    # Plot 3: Cm vs Cl
+    fig, ax = _figure(False)
+    ax.plot(alpha, polar["cm"], marker='o', color='r', label='Moment Coefficient')
+    ax.set_xlabel("Angle of Attack ($\\alpha$)")
+    ax.set_ylabel("Moment Coefficient ($C_m$)")
+    ax.set_title("Moment Coefficient vs Angle of Attack")
+    ax.grid(True)
+    ax.legend()
+    _finish(fig, os.path.join(directory, "Cm_vs_AoA.pdf"))
+
+    # Plot 4: xcop vs Alpha
+    fig, ax = _figure(False)
+    ax.plot(alpha, polar["x_cop"], marker='o', color='g', label='$x_{cop}$ values')
+    ax.set_xlabel("Angle of Attack ($\\alpha$)")
+    ax.set_ylabel("XCoP values ($x$)")
+    ax.set_title("$x_{cop}$ values (m)")
+    ax.grid(True)
+    _finish(fig, os.path.join(directory, "XCoP_vs_Alpha.pdf"))
+
+
+def plot_wake_drag(alpha, cd, file_name=None):
+    """Plot the wake rake drag coefficient against the angle of attack."""
+    fig, ax = _figure(file_name is None, figsize=(10, 6))
+    ax.plot(alpha, cd, marker='o', linestyle='-', color='blue', label='Drag Coefficient vs. AoA')
+    ax.set_xlabel('Angle of Attack ($\\alpha$, in °)')
+    ax.set_ylabel('Drag Coefficient ($C_d$)')
+    ax.set_title('Drag Coefficient vs. Angle of Attack')
+    ax.grid(True)
+    _finish(fig, file_name)
+
+
+@instrumented("plotting.savefig")
+def _finish(fig, file_name, show=False):
+    """Save a figure to `file_name` (if given), then show it if it was made interactive."""
+    if file_name is not None:
+        fig.savefig(file_name)
+    if file_name is None or show:
+        import matplotlib.pyplot as plt
+
+        plt.show()
@@ -0,0 +1,188 @@
+import numpy as np
+
+from .profiling import instrumented
+
+CHORD = 0.16  # Chord length (m)
+SCALE_FACTOR = 1.6  # Chord scale of the coordinate table (mm per % chord)
+X_DATA = np.linspace(0, 1, 100)  # Chordwise integration grid (x/c)
+
+
+def split_surfaces(positions):
+    """
+    Return the tap indices of the upper and lower surfaces, both ordered from
+    leading to trailing edge, using the same split as `plot_cp_profile`.
+    """
+    midpoint = len(positions) // 2
+    upper = np.arange(0, midpoint + 1)
+    lower = np.arange(midpoint + 1, len(positions))
+    return upper, lower
+
+
+def interpolation_matrix(x, xp):
+    """
+    Return the matrix W such that W @ fp == np.interp(x, xp, fp) for any fp.
+
+    Parameters:
+        x (numpy.ndarray): Points to interpolate to.
+        xp (numpy.ndarray): Increasing sample positions.
+
+    Returns:
+        numpy.ndarray: Interpolation weights (len(x) x len(xp)).
+    """
+    identity = np.eye(len(xp))
+    return np.column_stack([np.interp(x, xp, column) for column in identity])
+
+
+def trapezoid_weights(x):
+    """Return the weights w such that w @ y equals the trapezoidal integral of y over x."""
+    dx = np.diff(x)
+    weights = np.zeros(len(x))
+    weights[:-1] += 0.5 * dx
+    weights[1:] += 0.5 * dx
+    return weights
+
+
+def row_dot(a, weights):
+    """
+    Return a @ weights, with every row summed in the same order whatever the number of rows.
+
+    BLAS picks its kernel (and so its summation order) from the matrix shape,
+    so a row of `a @ weights` can differ in the last bit depending on how many
+    rows are multiplied with it. Accumulating one column at a time makes the
+    result of every run independent of the other runs it is reduced with, so
+    a log reduced in blocks gives exactly the in-memory result.
+
+    Parameters:
+        a (numpy.ndarray): Values (rows x n).
+        weights (numpy.ndarray): Weights (n) or (n x k).
+
+    Returns:
+        numpy.ndarray: Weighted sums (rows) or (rows x k).
+    """
+    a = np.atleast_2d(a)
+    weights = np.asarray(weights, dtype=float)
+    if a.shape[1] != weights.shape[0]:
+        raise ValueError(f"Shape mismatch: {a.shape[1]} values per row but {weights.shape[0]} weights")
+    columns = weights[:, None] if weights.ndim == 1 else weights
+    result = a[:, :1] * columns[0]
+    for j in range(1, a.shape[1]):
+        result += a[:, j:j + 1] * columns[j]
+    return result[:, 0] if weights.ndim == 1 else result
+
+
+@instrumented("polar.polar_weights")
+def polar_weights(positions, x_data, upper_slopes, lower_slopes, mask=None):
+    """
+    Precompute the linear maps from tap C_p to the cn, ca and cm integrals.
+
+    The surface C_p is interpolated onto `x_data` and integrated with the
+    trapezoidal rule, exactly as the per-alpha loop in aerodynamic.py does;
+    both steps are linear in C_p so they collapse into one weight per tap.
+
+    Parameters:
+        positions (list): Chordwise tap positions (% chord), upper then lower surface.
+        x_data (numpy.ndarray): Chordwise integration grid (x/c).
+        upper_slopes (numpy.ndarray): Upper surface slope at `x_data`.
+        lower_slopes (numpy.ndarray): Lower surface slope at `x_data`.
+        mask (numpy.ndarray): Taps to use (bool per tap, default all). Masked taps get a
+            weight of 0 and the surface is interpolated between the remaining taps.
+
+    Returns:
+        numpy.ndarray: Weights (taps x 3) for cn, ca and cm.
+    """
+    positions = np.asarray(positions, dtype=float) / 100
+    x_data = np.asarray(x_data, dtype=float)
+    upper, lower = split_surfaces(positions)
+    if mask is not None:
+        mask = np.asarray(mask, dtype=bool)
+        upper, lower = upper[mask[upper]], lower[mask[lower]]
+        if not len(upper) or not len(lower):
+            return np.full((len(positions), 3), np.nan)
+
+    W_upper = interpolation_matrix(x_data, positions[upper])
+    W_lower = interpolation_matrix(x_data, positions[lower])
+    t = trapezoid_weights(x_data)
+
+    weights = np.zeros((len(positions), 3))
+    # cn = integral of (Cp_lower - Cp_upper)
+    weights[upper, 0] = -(t @ W_upper)
+    weights[lower, 0] = t @ W_lower
+    # ca = integral of (Cp_upper * dy_upper/dx - Cp_lower * dy_lower/dx)
+    weights[upper, 1] = (t * upper_slopes) @ W_upper
+    weights[lower, 1] = -((t * lower_slopes) @ W_lower)
+    # cm = integral of (Cp_upper - Cp_lower) * x
+    weights[upper, 2] = (t * x_data) @ W_upper
+    weights[lower, 2] = -((t * x_data) @ W_lower)
+    return weights
+
+
+@instrumented("polar.calculate_polar", rows=lambda polar: len(polar["alpha"]))
+def calculate_polar(C_p, alpha, weights):
+    """
+    Reduce the C_p of many runs to their aerodynamic coefficients in one weighted sum.
+
+    Parameters:
+        C_p (numpy.ndarray): Pressure coefficients (runs x taps).
+        alpha (numpy.ndarray): Angle of attack of every run (degrees).
+        weights (numpy.ndarray): Weights from `polar_weights`.
+
+    Returns:
+        dict: Arrays "alpha", "cn", "ca", "cm", "cl", "cd" and "x_cop" (one value per run).
+    """
+    alpha = np.asarray(alpha, dtype=float)
+    cn, ca, cm = row_dot(C_p, weights).T
+
+    alpha_rad = np.radians(alpha)
+    cos_a = np.cos(alpha_rad)
+    sin_a = np.sin(alpha_rad)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_cop = cm / cn * CHORD
+
+    return {
+        "alpha": alpha,
+        "cn": cn,
+        "ca": ca,
+        "cm": cm,
+        "cl": cn * cos_a - ca * sin_a,
+        "cd": ca * cos_a + cn * sin_a,
+        "x_cop": x_cop,
+    }
+
+
+def default_weights(positions, x_data=None, geometry=None, scale_factor=SCALE_FACTOR, mask=None):
+    """
+    Build the polar weights for a tap layout from the airfoil geometry, as aerodynamic.py does.
+
+    Parameters:
+        positions (list): Chordwise tap positions (% chord), upper then lower surface.
+        x_data (numpy.ndarray): Chordwise integration grid (x/c). Defaults to X_DATA.
+        geometry (AirfoilGeometry): Airfoil geometry. Defaults to the tunnel model.
+        scale_factor (float): Chord scale the surface slopes are taken at.
+        mask (numpy.ndarray): Taps to use (bool per tap, default all), see `polar_weights`.
+
+    Returns:
+        numpy.ndarray: Weights (taps x 3) for cn, ca and cm.
+    """
+    from .geometry import AirfoilGeometry
+
+    x_data = X_DATA if x_data is None else np.asarray(x_data, dtype=float)
+    geometry = AirfoilGeometry() if geometry is None else geometry
+    upper_slopes, lower_slopes = geometry.slopes(x_data * (100 * scale_factor), scale_factor)
+    return polar_weights(positions, x_data, upper_slopes, lower_slopes, mask)
+
+
+def reduce_polar(data, weights, runs=None):
+    """
+    Calculate the polar of runs of a TunnelLog (all runs by default).
+
+    Returns:
+        dict: The result of `calculate_polar` plus the "run" numbers.
+    """
+    from .pressure import calculate_cp_many
+
+    runs = data.run if runs is None else np.asarray(runs, dtype=int)
+    C_p, alpha, _ = calculate_cp_many(data, runs)
+    polar = calculate_polar(C_p, alpha, weights)
+    polar["run"] = runs
+    return polar
@@ -0,0 +1,310 @@
+"""
+Polar lookup tables over the full circle of angles of attack.
+
+The reduced Cl, Cd and Cm of a sweep are averaged per alpha set point and
+resampled onto a uniform alpha grid from -180 to 180 degrees. The runs
+taken while alpha was increasing and those taken while it was decreasing
+are also kept as separate branches, so that hysteresis loops survive.
+Within the measured range the resampling uses a monotone (PCHIP) spline,
+so no overshoots appear between the points. Beyond the range Cl and Cd
+follow the Viterna-Corrigan flat plate model up to 90 degrees. Past 90
+degrees they are reflected as the airfoil flying trailing edge first,
+with Cl scaled by 0.7. Cm comes from a centre of pressure moving from the
+quarter chord at the last measured point to mid chord at 90 degrees and
+to 3/4 chord at 180 degrees.
+
+A lookup is a linear interpolation on the uniform grid. The grid index is
+computed, not searched for, so every query costs the same whatever the
+table size. Tables are saved as a small JSON header followed by raw
+float32 arrays.
+"""
+import json
+import os
+
+import numpy as np
+
+from .data import ALPHA_DECIMALS, TunnelLog
+from .profiling import instrumented
+
+TABLE_COLUMNS = ["cl", "cd", "cm"]
+STEP = 0.1  # Grid spacing of the uniform tables (degrees)
+CD_MAX = 2.0  # Drag at 90 degrees for the Viterna model (2D flat plate)
+REVERSE_LIFT = 0.7  # Lift of the airfoil flying trailing edge first, relative to forward flight
+
+# Branches built from the sweep direction of every run: all runs, then the
+# increasing and decreasing alpha runs on their own
+BRANCHES = {"all": 0, "up": 1, "down": -1}
+
+TABLE_MAGIC = b"LSWTPOL1"
+TABLE_VERSION = 1
+TABLE_DTYPE = np.dtype("<f4")
+
+
+def average_duplicates(alpha, values, decimals=ALPHA_DECIMALS):
+    """
+    Average the values measured at the same alpha set point.
+
+    Parameters:
+        alpha (numpy.ndarray): Angle of attack of every run (degrees).
+        values (numpy.ndarray): Values of every run (runs x columns).
+        decimals (int): Alphas rounded to this many decimals are the same set point.
+
+    Returns:
+        tuple: Increasing unique alphas, averaged values (alphas x columns) and the
+            number of runs averaged at every alpha.
+    """
+    alpha = np.round(np.asarray(alpha, dtype=float), decimals)
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    unique, inverse, counts = np.unique(alpha, return_inverse=True, return_counts=True)
+    sums = np.zeros((len(unique), values.shape[1]))
+    np.add.at(sums, inverse, values)
+    return unique, sums / counts[:, None], counts
+
+
+def sweep_directions(result):
+    """
+    Recover the sweep direction (+1 up, -1 down) of every run of a per-run result.
+
+    Runs are put back in acquisition (run number) order, separately for every
+    source file, as TunnelLog.sweep_direction needs.
+
+    Parameters:
+        result (dict): Arrays "run", "alpha" (and optionally "source"), in any order.
+    """
+    run = np.asarray(result["run"])
+    alpha = np.asarray(result["alpha"], dtype=float)
+    sources = np.asarray(result["source"]) if "source" in result else np.zeros(len(run))
+    direction = np.empty(len(run), dtype=int)
+    for source in np.unique(sources):
+        rows = np.flatnonzero(sources == source)
+        rows = rows[np.argsort(run[rows], kind='stable')]
+        log = TunnelLog(np.column_stack((run[rows], alpha[rows])), ["Run_nr", "Alpha"])
+        direction[rows] = log.sweep_direction
+    return direction
+
+
+def _viterna(alpha, alpha_edge, cl_edge, cd_edge, cd_max):
+    """Viterna-Corrigan Cl and Cd for alpha (radians) between a positive edge alpha and 90 degrees."""
+    sin_edge, cos_edge = np.sin(alpha_edge), np.cos(alpha_edge)
+    a2 = (cl_edge - cd_max * sin_edge * cos_edge) * sin_edge / cos_edge**2
+    b2 = (cd_edge - cd_max * sin_edge**2) / cos_edge
+    sin, cos = np.sin(alpha), np.cos(alpha)
+    return 0.5 * cd_max * np.sin(2 * alpha) + a2 * cos**2 / sin, cd_max * sin**2 + b2 * cos
+
+
+def _extended(alpha, points, values, cd_max, method):
+    """
+    Cl, Cd and Cm over -180 to 180 degrees from the averaged measured points of one branch.
+
+    Parameters:
+        alpha (numpy.ndarray): Grid alphas (degrees).
+        points (numpy.ndarray): Increasing measured alphas (degrees), spanning 0.
+        values (numpy.ndarray): Measured Cl, Cd and Cm (points x 3).
+    """
+    from scipy.interpolate import PchipInterpolator
+
+    low, high = points[0], points[-1]
+    if method == "pchip":
+        measured = PchipInterpolator(points, values, axis=0)
+    elif method == "linear":
+        def measured(x):
+            return np.column_stack([np.interp(x, points, column) for column in values.T])
+    else:
+        raise ValueError(f"Unknown resampling method {method!r}, expected 'pchip' or 'linear'")
+
+    def base(x):
+        """Cl and Cd between -90 and 90 degrees: measured, then Viterna on both sides."""
+        x = np.asarray(x, dtype=float)
+        cl = np.empty(x.shape)
+        cd = np.empty(x.shape)
+        inside = (x >= low) & (x <= high)
+        above = x > high
+        below = x < low
+        if inside.any():
+            cl[inside], cd[inside] = measured(x[inside])[:, :2].T
+        if above.any():
+            cl[above], cd[above] = _viterna(np.radians(x[above]), np.radians(high), values[-1, 0], values[-1, 1],
+                                            cd_max)
+        if below.any():
+            # Negative stall: the same model for the airfoil mirrored about the chord line
+            cl_below, cd[below] = _viterna(np.radians(-x[below]), np.radians(-low), -values[0, 0], values[0, 1],
+                                           cd_max)
+            cl[below] = -cl_below
+        return cl, cd
+
+    cl = np.empty(alpha.shape)
+    cd = np.empty(alpha.shape)
+    forward = np.abs(alpha) <= 90
+    cl[forward], cd[forward] = base(alpha[forward])
+    # Past 90 degrees the trailing edge leads: reflect about +-180 degrees
+    reflected = np.where(alpha > 0, 180 - alpha, -180 - alpha)[~forward]
+    cl_reflected, cd[~forward] = base(reflected)
+    cl[~forward] = REVERSE_LIFT * -cl_reflected
+
+    # Cm from a centre of pressure moving aft from the quarter chord outside the measured range
+    cm = np.empty(alpha.shape)
+    inside = (alpha >= low) & (alpha <= high)
+    cm[inside] = measured(alpha[inside])[:, 2]
+    for side, edge, cm_edge in ((alpha > high, high, values[-1, 2]), (alpha < low, low, values[0, 2])):
+        a = np.abs(alpha[side])
+        edge = abs(edge)
+        x_cp = np.where(a <= 90, 0.25 + 0.25 * (a - edge) / (90 - edge), 0.5 + 0.25 * (a - 90) / 90)
+        radians = np.radians(alpha[side])
+        cn = cl[side] * np.cos(radians) + cd[side] * np.sin(radians)
+        # The measured Cm fades out towards +-180 degrees, where both sides meet
+        cm[side] = cm_edge * (180 - a) / (180 - edge) - cn * (x_cp - 0.25)
+    return np.vstack((cl, cd, cm))
+
+
+class PolarTable:
+    """
+    Uniform-grid Cl, Cd and Cm tables from -180 to 180 degrees, one per sweep branch.
+
+    Build one with `from_polar` or `from_result`, or read one with `load`.
+
+    Parameters:
+        tables (dict): Branch name -> array (3 x points) of Cl, Cd and Cm on the grid.
+        step (float): Grid spacing (degrees); the grid starts at -180 degrees.
+        measured (dict): Branch name -> [lowest, highest] measured alpha.
+    """
+
+    def __init__(self, tables, step=STEP, measured=None):
+        self.step = float(step)
+        self.points = int(round(360 / self.step)) + 1
+        if abs((self.points - 1) * self.step - 360) > 1e-9:
+            raise ValueError(f"The grid step must divide 360 degrees, got {step}")
+        self.tables = {}
+        self._slopes = {}
+        for branch, table in tables.items():
+            table = np.asarray(table, dtype=float)
+            if table.shape != (len(TABLE_COLUMNS), self.points):
+                raise ValueError(f"Branch {branch!r} must have shape {(len(TABLE_COLUMNS), self.points)}")
+            self.tables[branch] = table
+            # Slopes to the next grid point, so a lookup gathers two arrays instead of three
+            self._slopes[branch] = np.diff(table, axis=1)
+        self.measured = dict(measured or {})
+
+    @property
+    def alpha(self):
+        """The grid alphas (degrees)."""
+        return np.linspace(-180, 180, self.points)
+
+    @property
+    def branches(self):
+        return list(self.tables)
+
+    @classmethod
+    def from_polar(cls, alpha, cl, cd, cm, direction=None, step=STEP, method="pchip", cd_max=CD_MAX):
+        """
+        Build the tables from the per-run coefficients of a sweep.
+
+        Parameters:
+            alpha (numpy.ndarray): Angle of attack of every run (degrees).
+            cl, cd, cm (numpy.ndarray): Coefficients of every run.
+            direction (numpy.ndarray): Sweep direction of every run (+1 increasing, -1 decreasing),
+                e.g. TunnelLog.sweep_direction. Without it only the "all" branch is built.
+            step (float): Grid spacing (degrees); must divide 360.
+            method (str): "pchip" (monotone cubic) or "linear" resampling of the measured range.
+            cd_max (float): Drag at 90 degrees of the Viterna extrapolation.
+
+        Returns:
+            PolarTable: Branch "all" plus "up" and "down" where they hold at least two set points.
+        """
+        alpha = np.asarray(alpha, dtype=float)
+        values = np.column_stack((cl, cd, cm)).astype(float)
+        finite = np.isfinite(alpha) & np.isfinite(values).all(axis=1)
+        direction = np.zeros(len(alpha), dtype=int) if direction is None else np.asarray(direction, dtype=int)
+
+        grid = np.linspace(-180, 180, int(round(360 / step)) + 1)
+        tables = {}
+        measured = {}
+        for branch, sign in BRANCHES.items():
+            selected = finite if sign == 0 else finite & (direction == sign)
+            points, averaged, _ = average_duplicates(alpha[selected], values[selected])
+            if len(points) < 2:
+                if sign == 0:
+                    raise ValueError(f"A polar table needs at least two alphas, got {len(points)}")
+                continue
+            if points[0] >= 0 or points[-1] <= 0:
+                raise ValueError(f"The measured alphas must span 0 degrees, got {points[0]} to {points[-1]}")
+            tables[branch] = _extended(grid, points, averaged, cd_max, method)
+            measured[branch] = [float(points[0]), float(points[-1])]
+        return cls(tables, step, measured)
+
+    @classmethod
+    def from_result(cls, result, drag="cd", **kwargs):
+        """
+        Build the tables from a per-run result (Pipeline, campaign or PolarStore).
+
+        The sweep direction is recovered from the run order, separately for every
+        source file of a campaign.
+
+        Parameters:
+            result (dict): Arrays "run", "alpha", "cl", "cd", "cm" (and optionally "source").
+            drag (str): Column used for Cd, e.g. "cd_wake" for the wake rake drag.
+        """
+        direction = sweep_directions(result)
+        return cls.from_polar(result["alpha"], result["cl"], result[drag], result["cm"], direction, **kwargs)
+
+    @instrumented("polartable.lookup", rows=lambda result: np.size(result["cl"]))
+    def lookup(self, alpha, branch="all"):
+        """
+        Return Cl, Cd and Cm at any angles of attack (degrees, wrapped to -180..180).
+
+        Parameters:
+            alpha (float or numpy.ndarray): Angles of attack (degrees).
+            branch (str): "all", or "up"/"down" for one side of a hysteresis loop.
+
+        Returns:
+            dict: "cl", "cd" and "cm", shaped like alpha.
+        """
+        try:
+            table = self.tables[branch]
+        except KeyError:
+            raise KeyError(f"No branch {branch!r} in the polar table, it has {self.branches}") from None
+        alpha = np.asarray(alpha, dtype=float)
+        finite = np.isfinite(alpha)
+        # Non-finite alphas are looked up at index 0 and come out as NaN
+        position = np.where(finite, np.mod(np.where(finite, alpha, 0.0) + 180, 360) / self.step, 0.0)
+        index = np.minimum(position.astype(np.intp), self.points - 2)
+        fraction = position - index
+        values = table[:, index] + fraction * self._slopes[branch][:, index]
+        values[:, ~finite] = np.nan
+        return dict(zip(TABLE_COLUMNS, values))
+
+    def save(self, file_path):
+        """Write the tables as a JSON header followed by float32 arrays (branches x 3 x points)."""
+        header = json.dumps({
+            "version": TABLE_VERSION,
+            "step": self.step,
+            "points": self.points,
+            "columns": TABLE_COLUMNS,
+            "branches": self.branches,
+            "measured": self.measured,
+            "dtype": TABLE_DTYPE.str,
+        }).encode()
+        # Pad the header so the arrays start 8-byte aligned (for memory mapping)
+        header += b" " * (-(len(TABLE_MAGIC) + 4 + len(header)) % 8)
+        arrays = np.stack([self.tables[branch] for branch in self.branches]).astype(TABLE_DTYPE)
+        with open(file_path + ".tmp", 'wb') as f:
+            f.write(TABLE_MAGIC)
+            f.write(np.uint32(len(header)).tobytes())
+            f.write(header)
+            f.write(arrays.tobytes())
+        os.replace(file_path + ".tmp", file_path)
+
+    @classmethod
+    def load(cls, file_path):
+        """Read tables written by `save`."""
+        with open(file_path, 'rb') as f:
+            if f.read(len(TABLE_MAGIC)) != TABLE_MAGIC:
+                raise ValueError(f"{file_path} is not a polar table")
+            length = int(np.frombuffer(f.read(4), dtype=np.uint32)[0])
+            header = json.loads(f.read(length))
+            if header.get("version") != TABLE_VERSION:
+                raise ValueError(f"{file_path} was written by an incompatible version")
+            shape = (len(header["branches"]), len(header["columns"]), header["points"])
+            arrays = np.fromfile(f, dtype=np.dtype(header["dtype"]), count=int(np.prod(shape))).reshape(shape)
+        return cls(dict(zip(header["branches"], arrays)), header["step"], header["measured"])
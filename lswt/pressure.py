@@ -0,0 +1,104 @@
+from .data import COLUMN_MAP
+from .profiling import instrumented
+
+# pbar-p097 = pref
+
+Vinf = 19.515
+Pinf = 906.11
+
+# Column layout of the raw log
+SURFACE_TAPS = COLUMN_MAP["surface_taps"]
+WAKE_TAPS = COLUMN_MAP["rake_total"]
+REFERENCE_COLUMN = COLUMN_MAP["reference"]
+
+
+def load_chordwise_positions(file_path):
+    """Load chordwise x positions from the text file."""
+    with open(file_path, 'r') as f:
+        lines = f.readlines()
+
+    # Convert each line to a float representing percentage of the chord
+    positions = [float(line.strip()) for line in lines if line.strip()]
+
+    return positions
+
+
+def load_wake_positions(wake_path):
+    """Load wake rake probe positions from the text file."""
+    return load_chordwise_positions(wake_path)
+
+
+def calculate_cp(data, selected_run_nr):
+    """Calculate the pressure coefficient for a specific run number."""
+    if data.row(selected_run_nr) is None:
+        return None, None, None
+
+    C_p, alpha, C_pt_wake = calculate_cp_many(data, [selected_run_nr])
+    return C_p[0], alpha[0], C_pt_wake[0]
+
+
+def calculate_cp_many(data, runs):
+    """
+    Calculate the pressure coefficients for several run numbers at once.
+
+    Parameters:
+        data (TunnelLog): Loaded tunnel log.
+        runs (array_like): Run numbers to evaluate.
+
+    Returns:
+        tuple: Surface C_p (runs x taps), alpha (runs) and wake C_pt (runs x rake probes).
+    """
+    return calculate_cp_rows(data, data.rows(runs))
+
+
+def pressure_coefficient(pressure, reference, rho, vinf=Vinf):
+    """
+    Calculate the pressure coefficients of port pressures.
+
+    Parameters:
+        pressure (numpy.ndarray): Port pressures (... x ports).
+        reference (numpy.ndarray): Reference pressure of every row (...).
+        rho (numpy.ndarray): Air density of every row (...).
+        vinf (float or numpy.ndarray): Freestream velocity, per row or for all rows.
+
+    Returns:
+        numpy.ndarray: C_p (... x ports).
+    """
+    q = 0.5 * rho * vinf**2
+    return (pressure - reference[..., None]) / q[..., None]
+
+
+@instrumented("pressure.calculate_cp_rows", rows=lambda result: len(result[1]))
+def calculate_cp_rows(data, rows, vinf=Vinf):
+    """Calculate the pressure coefficients of rows (positions, not run numbers) of a TunnelLog."""
+    p_ref = data[REFERENCE_COLUMN][rows]
+    rho = data.rho[rows]
+
+    C_p = pressure_coefficient(data.block(*SURFACE_TAPS)[rows], p_ref, rho, vinf)
+    C_pt_wake = pressure_coefficient(data.block(*WAKE_TAPS)[rows], p_ref, rho, vinf)
+    return C_p, data.alpha[rows], C_pt_wake
+
+
+def split_cp_profile(positions, C_p):
+    """
+    Split the tap positions and C_p into the upper and lower surfaces.
+
+    Returns:
+        tuple: C_p_upper, positions_upper, C_p_lower, positions_lower. The lower
+            surface is reversed (trailing to leading edge) for plotting.
+    """
+    # Determine the midpoint to split upper and lower surfaces
+    midpoint = len(positions) // 2
+
+    # Split the positions and Cp data into upper and lower surfaces
+    positions_upper = positions[:midpoint+1]
+    C_p_upper = C_p[:midpoint+1]
+
+    positions_lower = positions[midpoint+1:]
+    C_p_lower = C_p[midpoint+1:]
+
+    # Reverse lower surface data to plot leading to trailing edge
+    positions_lower = positions_lower[::-1]
+    C_p_lower = C_p_lower[::-1]
+
+    return C_p_upper, positions_upper, C_p_lower, positions_lower
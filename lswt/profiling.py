@@ -0,0 +1,260 @@
+"""
+Stage instrumentation: wall and CPU time, calls, rows and peak allocation.
+
+The reduction steps are wrapped with `stage` (a context manager) or
+`instrumented` (a decorator). While profiling is disabled both cost one
+global lookup. Once enabled, every stage records its calls, wall time, CPU
+time, rows processed and, optionally, the peak memory allocated above
+what was in use when it started (tracemalloc). Stages nest; the nesting is
+kept for the flamegraph trace, which lists the self time of every stack in
+the collapsed format of flamegraph.pl and speedscope.
+
+Setting the LSWT_PROFILE environment variable to a file name enables
+profiling for a whole invocation (scripts included). The profile is
+written to that file as JSON, next to it as CSV, and as a collapsed-stack
+trace unless LSWT_PROFILE_TRACE=0. LSWT_PROFILE_MEMORY=0 skips tracemalloc.
+"""
+import atexit
+import csv
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+PROFILE_ENV = "LSWT_PROFILE"
+TRACE_ENV = "LSWT_PROFILE_TRACE"
+MEMORY_ENV = "LSWT_PROFILE_MEMORY"
+OWNER_ENV = "LSWT_PROFILE_PID"
+
+PROFILE_COLUMNS = ["stage", "calls", "wall_s", "cpu_s", "rows", "peak_bytes"]
+
+_profiler = None
+
+
+class Profiler:
+    """
+    Accumulates the measurements of the stages run while it is enabled.
+
+    Parameters:
+        memory (bool): Trace allocations with tracemalloc (slows allocation-heavy code).
+    """
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.stats = {}
+        self.stacks = {}
+        self._stack = []
+        self._started_tracing = False
+        self.started = time.time()
+
+    def start(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def enter(self, name):
+        frame = {"name": name, "wall": time.perf_counter(), "cpu": time.process_time(), "children": 0.0,
+                 "rows": None, "current": 0, "peak": 0}
+        if self.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                parent = self._stack[-1]
+                parent["peak"] = max(parent["peak"], peak)
+            # Measure the peak of this stage alone from here on
+            tracemalloc.reset_peak()
+            frame["current"] = frame["peak"] = current
+        self._stack.append(frame)
+        return frame
+
+    def exit(self, frame):
+        wall = time.perf_counter() - frame["wall"]
+        cpu = time.process_time() - frame["cpu"]
+        if self.memory and tracemalloc.is_tracing():
+            frame["peak"] = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+        self._stack.pop()
+
+        stats = self.stats.setdefault(frame["name"], {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "rows": 0,
+                                                      "peak_bytes": 0})
+        stats["calls"] += 1
+        stats["wall_s"] += wall
+        stats["cpu_s"] += cpu
+        stats["rows"] += frame["rows"] or 0
+        stats["peak_bytes"] = max(stats["peak_bytes"], frame["peak"] - frame["current"])
+
+        path = ";".join([f["name"] for f in self._stack] + [frame["name"]])
+        self.stacks[path] = self.stacks.get(path, 0.0) + wall - frame["children"]
+        if self._stack:
+            parent = self._stack[-1]
+            parent["children"] += wall
+            parent["peak"] = max(parent["peak"], frame["peak"])
+
+    def profile(self):
+        """Return the profile as a dict: invocation details and one entry per stage."""
+        stages = [{"stage": name, **stats} for name, stats in self.stats.items()]
+        stages.sort(key=lambda entry: -entry["wall_s"])
+        return {
+            "argv": sys.argv,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "wall_s": time.time() - self.started,
+            "memory": self.memory,
+            "stages": stages,
+        }
+
+    def write_json(self, file_path):
+        with open(file_path, 'w') as f:
+            json.dump(self.profile(), f, indent=1)
+
+    def write_csv(self, file_path):
+        with open(file_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, PROFILE_COLUMNS)
+            writer.writeheader()
+            for entry in self.profile()["stages"]:
+                writer.writerow({name: entry[name] for name in PROFILE_COLUMNS})
+
+    def write_collapsed(self, file_path):
+        """Write the self time of every stage stack (microseconds) in collapsed-stack format."""
+        with open(file_path, 'w') as f:
+            for path, seconds in sorted(self.stacks.items()):
+                f.write(f"{path} {max(int(round(seconds * 1e6)), 0)}\n")
+
+    def write(self, file_path, trace=True):
+        """Write the profile as JSON (file_path), CSV and optionally the collapsed-stack trace."""
+        base = file_path[:-5] if file_path.endswith(".json") else file_path
+        self.write_json(file_path)
+        self.write_csv(base + ".csv")
+        if trace:
+            self.write_collapsed(base + ".folded")
+
+
+def enable(memory=True):
+    """Start profiling (replacing an active profiler) and return the Profiler."""
+    global _profiler
+    disable()
+    _profiler = Profiler(memory)
+    _profiler.start()
+    return _profiler
+
+
+def disable():
+    """Stop profiling and return the Profiler that was active, if any."""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+def active():
+    """Return the active Profiler, or None."""
+    return _profiler
+
+
+class _NullStage:
+    """Stage returned while profiling is disabled: does nothing, accepts rows."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @property
+    def rows(self):
+        return None
+
+    @rows.setter
+    def rows(self, rows):
+        pass
+
+
+_DISABLED = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "initial_rows", "frame")
+
+    def __init__(self, profiler, name, rows):
+        self.profiler = profiler
+        self.name = name
+        self.initial_rows = rows
+        self.frame = None
+
+    def __enter__(self):
+        self.frame = self.profiler.enter(self.name)
+        self.frame["rows"] = self.initial_rows
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.exit(self.frame)
+        return False
+
+    @property
+    def rows(self):
+        return self.frame["rows"]
+
+    @rows.setter
+    def rows(self, rows):
+        self.frame["rows"] = rows
+
+
+def stage(name, rows=None):
+    """
+    Measure a block of code as a named stage.
+
+        with stage("cp", rows=len(runs)) as s:
+            ...
+
+    `s.rows` can also be set inside the block. Does nothing while profiling is disabled.
+    """
+    if _profiler is None:
+        return _DISABLED
+    return _Stage(_profiler, name, rows)
+
+
+def instrumented(name, rows=None):
+    """
+    Decorator measuring every call of a function as a stage.
+
+    Parameters:
+        name (str): Stage name.
+        rows (callable): Returns the rows processed, given the function's result.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler
+            if profiler is None:
+                return func(*args, **kwargs)
+            frame = profiler.enter(name)
+            try:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    frame["rows"] = rows(result)
+                return result
+            finally:
+                profiler.exit(frame)
+        return wrapper
+    return decorator
+
+
+def _write_at_exit(file_path, trace):
+    profiler = disable()
+    if profiler is not None:
+        try:
+            profiler.write(file_path, trace)
+        except OSError as error:
+            print(f"lswt: could not write the profile to {file_path}: {error}", file=sys.stderr)
+
+
+# Worker processes inherit the environment; only the process that enabled profiling writes the profile
+if os.environ.get(PROFILE_ENV) and os.environ.setdefault(OWNER_ENV, str(os.getpid())) == str(os.getpid()):
+    enable(memory=os.environ.get(MEMORY_ENV, "1") != "0")
+    atexit.register(_write_at_exit, os.environ[PROFILE_ENV], os.environ.get(TRACE_ENV, "1") != "0")
@@ -0,0 +1,299 @@
+"""
+Headless, parallel rendering of the per-alpha Cp, wake profile and polar plots.
+
+Every output file is described by a job: the kind of figure, its data and its
+style. Workers draw on Agg canvases of their own, without going through
+pyplot, so rendering never switches the backend of the calling process.
+They keep one figure per kind, only swapping the line data between jobs. A
+manifest in the output directory stores the hash of every job, so unchanged
+plots are skipped.
+"""
+import hashlib
+import json
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .profiling import instrumented
+
+MANIFEST_FILE = ".render-manifest.json"
+RENDER_VERSION = 1  # Bump to re-render everything after a change to the renderers
+
+CP_STYLE = {"figsize": (10, 6), "upper_color": "blue", "lower_color": "red", "marker": "o"}
+WAKE_STYLE = {"figsize": (10, 6), "color": "blue", "marker": "o"}
+LINE_STYLE = {"figsize": (6.4, 4.8), "marker": "o"}
+
+# Per-process figure cache: kind -> (figure, axes, artists)
+_figures = {}
+
+
+def _subplots(figsize):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots()
+
+
+def _cp_figure(style):
+    fig, ax = _subplots(style["figsize"])
+    upper, = ax.plot([], [], marker=style["marker"], linestyle='-', color=style["upper_color"], label='Upper Surface')
+    lower, = ax.plot([], [], marker=style["marker"], linestyle='-', color=style["lower_color"], label='Lower Surface')
+    ax.invert_yaxis()
+    ax.set_xlabel('Chordwise Position (%)')
+    ax.set_ylabel('Pressure Coefficient (Cp)')
+    ax.grid(True)
+    ax.legend()
+    return fig, ax, (upper, lower)
+
+
+def _wake_figure(style):
+    fig, ax = _subplots(style["figsize"])
+    line, = ax.plot([], [], marker=style["marker"], linestyle='-', color=style["color"], label='Velocity Distribution')
+    ax.set_xlabel('Total wake rake probe locations (mm)')
+    ax.set_ylabel('Velocity (m/s)')
+    ax.grid(True)
+    ax.legend()
+    return fig, ax, (line,)
+
+
+def _line_figure(style):
+    fig, ax = _subplots(style["figsize"])
+    line, = ax.plot([], [], marker=style["marker"])
+    ax.grid(True)
+    return fig, ax, (line,)
+
+
+_FIGURE_FACTORIES = {"cp": _cp_figure, "wake": _wake_figure, "line": _line_figure}
+
+
+def _figure(kind, style):
+    key = (kind, json.dumps(style, sort_keys=True))
+    if key not in _figures:
+        _figures[key] = _FIGURE_FACTORIES[kind](style)
+    return _figures[key]
+
+
+@instrumented("render.draw")
+def _draw(job, out_dir):
+    fig, ax, artists = _figure(job["kind"], job["style"])
+    data = job["data"]
+    if job["kind"] == "cp":
+        artists[0].set_data(data["positions_upper"], data["C_p_upper"])
+        artists[1].set_data(data["positions_lower"], data["C_p_lower"])
+        ax.set_title(f'Pressure Coefficient Profile for α = {job["alpha"]}°')
+    elif job["kind"] == "wake":
+        artists[0].set_data(data["positions"], data["velocity"])
+        ax.set_title(f'Velocity Distribution for α = {job["alpha"]}°')
+    else:
+        line = artists[0]
+        line.set_data(data["x"], data["y"])
+        line.set_color(job["color"])
+        line.set_label(job["label"])
+        ax.set_xlabel(job["xlabel"])
+        ax.set_ylabel(job["ylabel"])
+        ax.set_title(job["title"])
+        if ax.get_legend() is not None:
+            ax.get_legend().remove()
+        if job["label"]:
+            ax.legend()
+    ax.relim()
+    ax.autoscale_view()
+    fig.savefig(os.path.join(out_dir, job["file_name"]))
+
+
+def _render_batch(jobs, out_dir):
+    failures = {}
+    for job in jobs:
+        try:
+            _draw(job, out_dir)
+        except Exception:
+            failures[job["file_name"]] = traceback.format_exc()
+    return failures
+
+
+def job_hash(job):
+    """Return the hash of everything that determines the content of a job's output."""
+    digest = hashlib.sha1()
+    meta = {key: value for key, value in job.items() if key != "data"}
+    digest.update(json.dumps([RENDER_VERSION, meta], sort_keys=True, default=str).encode())
+    for name in sorted(job["data"]):
+        array = np.ascontiguousarray(job["data"][name], dtype=float)
+        digest.update(name.encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def _alpha_file_names(prefix, alphas, runs):
+    """Name files after alpha like the existing cp_<alpha>.pdf; repeated alphas get the run number added."""
+    names = []
+    seen = set()
+    for alpha, run in zip(alphas, runs):
+        name = f"{prefix}_{alpha}.pdf"
+        if name in seen:
+            name = f"{prefix}_{alpha}_run{run}.pdf"
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def cp_jobs(data, positions, runs=None):
+    """Return one Cp profile job per run."""
+    from .pressure import calculate_cp_many
+
+    runs = data.run if runs is None else np.asarray(runs, dtype=int)
+    C_p, alpha, _ = calculate_cp_many(data, runs)
+    return cp_profile_jobs(C_p, alpha, runs, positions)
+
+
+def cp_profile_jobs(C_p, alpha, runs, positions):
+    """Return one Cp profile job per row of already reduced C_p (runs x taps)."""
+    from .pressure import split_cp_profile
+
+    positions = np.asarray(positions, dtype=float)
+    alpha = np.asarray(alpha, dtype=float).tolist()
+    jobs = []
+    for file_name, run, a, cp in zip(_alpha_file_names("cp", alpha, runs), runs, alpha, C_p):
+        C_p_upper, positions_upper, C_p_lower, positions_lower = split_cp_profile(positions, cp)
+        jobs.append({
+            "kind": "cp", "file_name": file_name, "alpha": a, "run": int(run), "style": CP_STYLE,
+            "data": {"positions_upper": positions_upper, "C_p_upper": C_p_upper,
+                     "positions_lower": positions_lower, "C_p_lower": C_p_lower},
+        })
+    return jobs
+
+
+def wake_jobs(data, runs=None):
+    """Return one wake velocity profile job per run."""
+    from .wakedrag import wake_drag_runs
+
+    runs = data.run if runs is None else np.asarray(runs, dtype=int)
+    wake = wake_drag_runs(data, runs)
+    return wake_profile_jobs(wake["velocity"], wake["alpha"], runs)
+
+
+def wake_profile_jobs(velocity, alpha, runs, rake_positions=None):
+    """Return one wake velocity profile job per row of already reduced velocities (runs x probes)."""
+    from .wakedrag import pt_positions
+
+    rake_positions = pt_positions * 1000 if rake_positions is None else np.asarray(rake_positions, dtype=float)
+    alpha = np.asarray(alpha, dtype=float).tolist()
+    return [{
+        "kind": "wake", "file_name": file_name, "alpha": a, "run": int(run), "style": WAKE_STYLE,
+        "data": {"positions": rake_positions, "velocity": v},
+    } for file_name, run, a, v in zip(_alpha_file_names("wake", alpha, runs), runs, alpha, velocity)]
+
+
+def polar_jobs(polar, cd_wake=None):
+    """Return the Cl-alpha, drag bucket, Cm-alpha and x_cop-alpha jobs (and wake Cd-alpha if given)."""
+    alpha = polar["alpha"]
+    specs = [
+        ("Cl_vs_Alpha.pdf", alpha, polar["cl"], 'b', 'Cl', "Angle of Attack ($\\alpha$)",
+         "Lift Coefficient ($C_l$)", "Airfoil Lift Coefficient vs Angle of Attack"),
+        ("Cl_vs_Cd.pdf", polar["cl"], polar["cd"], 'purple', 'Drag Bucket', "Drag Coefficient ($C_d$)",
+         "Lift Coefficient ($C_l$)", "Lift Coefficient vs Drag Coefficient (Drag Bucket)"),
+        ("Cm_vs_AoA.pdf", alpha, polar["cm"], 'r', 'Moment Coefficient', "Angle of Attack ($\\alpha$)",
+         "Moment Coefficient ($C_m$)", "Moment Coefficient vs Angle of Attack"),
+        ("XCoP_vs_Alpha.pdf", alpha, polar["x_cop"], 'g', '', "Angle of Attack ($\\alpha$)",
+         "XCoP values ($x$)", "$x_{cop}$ values (m)"),
+    ]
+    if cd_wake is not None:
+        specs.append(("wake_rake.pdf", alpha, cd_wake, 'blue', '', 'Angle of Attack ($\\alpha$, in °)',
+                      'Drag Coefficient ($C_d$)', 'Drag Coefficient vs. Angle of Attack'))
+
+    return [{
+        "kind": "line", "file_name": file_name, "color": color, "label": label, "xlabel": xlabel,
+        "ylabel": ylabel, "title": title, "style": LINE_STYLE, "data": {"x": x, "y": y},
+    } for file_name, x, y, color, label, xlabel, ylabel, title in specs]
+
+
+def _read_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILE), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    with open(path + ".tmp", 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def render(jobs, out_dir, workers=None, force=False, batch_size=8):
+    """
+    Render jobs into `out_dir`, skipping outputs whose job hash has not changed.
+
+    Parameters:
+        jobs (list): Jobs from `cp_jobs`, `wake_jobs` and `polar_jobs`.
+        out_dir (str): Output directory (created if needed).
+        workers (int): Worker processes (default: one per CPU). 1 renders in-process.
+        force (bool): Re-render every job.
+        batch_size (int): Jobs sent to a worker at once; jobs of a batch share figures.
+
+    Returns:
+        dict: "rendered" and "skipped" file names, and "failed" file names mapped to their traceback.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = _read_manifest(out_dir)
+
+    hashes = {job["file_name"]: job_hash(job) for job in jobs}
+    todo = [job for job in jobs if force or manifest.get(job["file_name"]) != hashes[job["file_name"]]
+            or not os.path.exists(os.path.join(out_dir, job["file_name"]))]
+    todo_names = {job["file_name"] for job in todo}
+    skipped = [job["file_name"] for job in jobs if job["file_name"] not in todo_names]
+
+    # Keep figures of one kind together so a worker reuses the same figure
+    todo.sort(key=lambda job: job["kind"])
+    batches = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+
+    failures = {}
+    if workers == 1 or len(batches) <= 1:
+        for batch in batches:
+            failures.update(_render_batch(batch, out_dir))
+    elif batches:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(batch, pool.submit(_render_batch, batch, out_dir)) for batch in batches]
+            for batch, future in futures:
+                try:
+                    failures.update(future.result())
+                except Exception:
+                    failures.update({job["file_name"]: traceback.format_exc() for job in batch})
+
+    rendered = [job["file_name"] for job in todo if job["file_name"] not in failures]
+    for file_name in rendered:
+        manifest[file_name] = hashes[file_name]
+    for file_name in failures:
+        manifest.pop(file_name, None)
+    _write_manifest(out_dir, manifest)
+
+    return {"rendered": rendered, "skipped": skipped, "failed": failures}
+
+
+def render_log(data, positions, out_dir, workers=None, force=False, weights=None):
+    """
+    Render the Cp and wake profile of every run and the polar plots of a TunnelLog.
+
+    Parameters:
+        data (TunnelLog): Loaded tunnel log.
+        positions (list): Chordwise tap positions (% chord).
+        out_dir (str): Output directory.
+        workers (int): Worker processes (default: one per CPU).
+        force (bool): Re-render every plot.
+        weights (numpy.ndarray): Polar weights (built from `positions` if not given).
+
+    Returns:
+        dict: See `render`.
+    """
+    from .polar import default_weights, reduce_polar
+    from .wakedrag import wake_drag_runs
+
+    weights = default_weights(positions) if weights is None else weights
+    polar = reduce_polar(data, weights)
+    jobs = cp_jobs(data, positions) + wake_jobs(data) + polar_jobs(polar, wake_drag_runs(data)["cd"])
+    return render(jobs, out_dir, workers=workers, force=force)
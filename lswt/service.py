@@ -0,0 +1,182 @@
+"""
+Local HTTP query service on top of a PolarStore.
+
+    GET /campaigns
+    GET /polar?campaign=X&alpha_min=-5&alpha_max=15
+    GET /cp?campaign=X&run=30
+
+Campaigns are read from the store once and kept in memory, least recently
+used first out. Encoded answers are cached as well, so a repeated query is
+a dictionary lookup. A campaign that is rewritten in the store is reloaded
+on its next query. Raw logs are never read. Connections are kept alive, so
+a client sending many queries pays the connection setup once.
+"""
+import asyncio
+import json
+import math
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from .cache import LRUCache
+from .store import PolarStore
+
+MAX_CAMPAIGNS = 8  # Campaigns kept in memory
+MAX_RESPONSES = 4096  # Encoded answers kept in memory
+DEFAULT_PORT = 8765
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+class QueryError(Exception):
+    """A query that cannot be answered, with the HTTP status to answer it with."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_value(value):
+    """Convert arrays to (nested) lists for JSON, with non-finite floats as null."""
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, list):
+        return [_json_value(item) for item in value]
+    return value
+
+
+def _float_param(params, name):
+    if name not in params:
+        return None
+    try:
+        return float(params[name][0])
+    except ValueError:
+        raise QueryError(400, f"{name} must be a number") from None
+
+
+def _campaign_param(params):
+    if "campaign" not in params:
+        raise QueryError(400, "campaign is required")
+    return params["campaign"][0]
+
+
+class QueryService:
+    """
+    Answer polar and Cp queries from a PolarStore through in-memory caches.
+
+    Parameters:
+        store (PolarStore or str): Store (or its directory).
+        max_campaigns (int): Campaigns kept in memory.
+        max_responses (int): Encoded answers kept in memory.
+    """
+
+    def __init__(self, store, max_campaigns=MAX_CAMPAIGNS, max_responses=MAX_RESPONSES):
+        self.store = store if isinstance(store, PolarStore) else PolarStore(store)
+        self.campaigns = LRUCache(max_campaigns)
+        self.responses = LRUCache(max_responses)
+
+    def campaign(self, name):
+        """Return a campaign and its version token, loading it into memory if needed."""
+        try:
+            token = self.store.token(name)
+        except (OSError, ValueError):
+            raise QueryError(404, f"No campaign named {name!r}") from None
+        cached = self.campaigns.get(name)
+        if cached is not None and cached[1] == token:
+            return cached
+        try:
+            campaign = self.store.load(name, mmap=False)
+        except (KeyError, OSError, ValueError) as error:
+            raise QueryError(404, str(error)) from None
+        self.campaigns.put(name, (campaign, token))
+        return campaign, token
+
+    def query(self, target):
+        """
+        Answer a request target such as "/polar?campaign=X&alpha_min=-5".
+
+        Returns:
+            tuple: HTTP status and the JSON body (bytes).
+        """
+        url = urlsplit(target)
+        params = parse_qs(url.query)
+        try:
+            if url.path == "/campaigns":
+                return 200, json.dumps({"campaigns": self.store.campaigns()}).encode()
+
+            campaign, token = self.campaign(_campaign_param(params))
+            key = (url.path, token, tuple(sorted((name, tuple(values)) for name, values in params.items())))
+            body = self.responses.get(key)
+            if body is None:
+                body = json.dumps(self._answer(url.path, campaign, params)).encode()
+                self.responses.put(key, body)
+            return 200, body
+        except QueryError as error:
+            return error.status, json.dumps({"error": str(error)}).encode()
+
+    def _answer(self, path, campaign, params):
+        if path == "/polar":
+            polar = campaign.polar(_float_param(params, "alpha_min"), _float_param(params, "alpha_max"))
+            return {"campaign": campaign.name, **{name: _json_value(values) for name, values in polar.items()}}
+        if path == "/cp":
+            run = _float_param(params, "run")
+            if run is None or not math.isfinite(run) or run != int(run):
+                raise QueryError(400, "run must be an integer")
+            try:
+                cp = campaign.cp(int(run))
+            except KeyError as error:
+                raise QueryError(404, error.args[0]) from None
+            answer = {"campaign": campaign.name, "positions": campaign.positions}
+            answer.update({name: _json_value(values) for name, values in cp.items()})
+            return answer
+        raise QueryError(404, f"Unknown query {path!r}, expected /campaigns, /polar or /cp")
+
+    async def handle(self, reader, writer):
+        """Serve the HTTP/1.1 requests of one connection."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                request = lines[0].split()
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip().lower()
+
+                if len(request) != 3:
+                    status, body = 400, json.dumps({"error": "malformed request"}).encode()
+                elif request[0] != "GET":
+                    status, body = 405, json.dumps({"error": "only GET is supported"}).encode()
+                else:
+                    status, body = self.query(request[1])
+
+                close = headers.get("connection") == "close" or (len(request) == 3 and request[2] == "HTTP/1.0")
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\nConnection: {'close' if close else 'keep-alive'}\r\n\r\n"
+                    .encode() + body)
+                await writer.drain()
+                if close:
+                    return
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT):
+        """Serve until cancelled."""
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def run_service(store_dir, host="127.0.0.1", port=DEFAULT_PORT, **kwargs):
+    """Serve queries on a PolarStore directory until interrupted."""
+    service = QueryService(store_dir, **kwargs)
+    try:
+        asyncio.run(service.serve(host, port))
+    except KeyboardInterrupt:
+        pass
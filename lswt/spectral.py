@@ -0,0 +1,201 @@
+"""
+Spectral (buffet and shedding) analysis of time-resolved pressure runs.
+
+Welch power spectra of every port, and cross-spectra and coherence against
+a reference port, are computed together: a block of overlapping segments
+of all ports is windowed and transformed in one batched FFT, and the
+blocks are read from the memory-mapped run a fixed number at a time. The
+window and its scaling are built once per segment length and reused for
+every run.
+
+The dominant frequency of every run and its Strouhal number are added to
+the per-run polar table, next to Cl and Cd.
+"""
+import functools
+
+import numpy as np
+
+from .polar import CHORD
+from .pressure import SURFACE_TAPS, Vinf
+
+NPERSEG = 1024  # Samples per Welch segment
+OVERLAP = 0.5  # Fraction of a segment shared with the next one
+MIN_FREQUENCY = 1.0  # Hz; slower content (drift) is ignored when picking the dominant frequency
+CHUNK_BYTES = 32 * 2**20  # Memory budget of the segments transformed at once
+
+# Columns added to the polar table by `spectral_table`
+SPECTRAL_COLUMNS = ["f_dominant", "strouhal", "psd_peak"]
+
+
+class WelchPlan:
+    """
+    Window, scaling and frequencies of a Welch estimate, shared by all runs
+    with the same segment length, overlap and sample rate.
+    """
+
+    def __init__(self, nperseg, overlap, rate):
+        self.nperseg = nperseg
+        self.step = max(1, int(round(nperseg * (1 - overlap))))
+        self.rate = rate
+        self.window = np.hanning(nperseg + 1)[:-1]  # Periodic Hann window
+        self.frequency = np.fft.rfftfreq(nperseg, 1 / rate)
+        # One-sided density scaling: double every bin except DC and Nyquist
+        self.scale = np.full(len(self.frequency), 2 / (rate * (self.window**2).sum()))
+        self.scale[0] /= 2
+        if nperseg % 2 == 0:
+            self.scale[-1] /= 2
+
+    def segments(self, samples):
+        """Return the number of segments in `samples` samples."""
+        return 0 if samples < self.nperseg else 1 + (samples - self.nperseg) // self.step
+
+
+@functools.lru_cache(maxsize=16)
+def welch_plan(nperseg, overlap, rate):
+    """Return the (cached) WelchPlan for a segment length, overlap and sample rate."""
+    return WelchPlan(nperseg, overlap, rate)
+
+
+def _port_index(series, ports):
+    if ports is None:
+        return np.arange(len(series.ports))
+    if isinstance(ports, tuple) and len(ports) == 2:
+        # An inclusive (first, last) range like SURFACE_TAPS
+        first, last = (series.ports.index(name) for name in ports)
+        return np.arange(first, last + 1)
+    return np.array([series.ports.index(name) for name in ports])
+
+
+def welch(series, run, nperseg=NPERSEG, overlap=OVERLAP, ports=None, reference=None, chunk_bytes=CHUNK_BYTES):
+    """
+    Welch power spectral density of many ports of a run at once.
+
+    Every segment is detrended by its mean and Hann windowed; the result
+    equals scipy.signal.welch with the same segment length and overlap.
+
+    Parameters:
+        series (TimeSeries): Time-resolved runs.
+        run (int): Run number.
+        nperseg (int): Samples per segment.
+        overlap (float): Fraction of a segment shared with the next one.
+        ports (list or tuple): Port names, or an inclusive (first, last) range (default: all).
+        reference (str): Port to compute the cross-spectra and coherence against.
+        chunk_bytes (int): Memory budget of the segments transformed at once.
+
+    Returns:
+        dict: "frequency", "psd" (frequencies x ports), "ports", and with a reference
+            also "csd" (complex cross-spectral density) and "coherence".
+    """
+    samples = series.samples(run)
+    plan = welch_plan(nperseg, overlap, series.rate)
+    count = plan.segments(len(samples))
+    if not count:
+        raise ValueError(f"Run {run} has {len(samples)} samples, fewer than one segment of {nperseg}")
+
+    columns = _port_index(series, ports)
+    ref = None if reference is None else series.ports.index(reference)
+    psd = np.zeros((len(plan.frequency), len(columns)))
+    csd = None if ref is None else np.zeros((len(plan.frequency), len(columns)), dtype=complex)
+    psd_ref = 0.0
+
+    # Segments per block, so that the complex spectra of a block fit the budget
+    block = max(1, int(chunk_bytes // (16 * nperseg * (len(columns) + 1))))
+    for first in range(0, count, block):
+        n = min(block, count - first)
+        start = first * plan.step
+        stop = start + (n - 1) * plan.step + nperseg
+        data = np.asarray(samples[start:stop], dtype=float)
+        selected = data[:, columns] if ref is None else data[:, np.append(columns, ref)]
+
+        # (segments x nperseg x ports) view of the overlapping segments
+        segments = np.lib.stride_tricks.sliding_window_view(selected, nperseg, axis=0)[::plan.step]
+        segments = np.swapaxes(segments, 1, 2)
+        segments = (segments - segments.mean(axis=1, keepdims=True)) * plan.window[:, None]
+        spectra = np.fft.rfft(segments, axis=1)
+
+        power = spectra.real**2 + spectra.imag**2
+        psd += power[..., :len(columns)].sum(axis=0)
+        if ref is not None:
+            psd_ref = psd_ref + power[..., -1].sum(axis=0)
+            csd += (np.conj(spectra[..., -1:]) * spectra[..., :len(columns)]).sum(axis=0)
+
+    result = {
+        "frequency": plan.frequency,
+        "psd": psd * plan.scale[:, None] / count,
+        "ports": [series.ports[i] for i in columns],
+    }
+    if ref is not None:
+        psd_ref = psd_ref * plan.scale / count
+        result["csd"] = csd * plan.scale[:, None] / count
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result["coherence"] = np.abs(result["csd"])**2 / (result["psd"] * psd_ref[:, None])
+    return result
+
+
+def dominant_frequency(frequency, psd, min_frequency=MIN_FREQUENCY):
+    """
+    Return the frequency and height of the highest peak of the port-averaged spectrum.
+
+    Parameters:
+        frequency (numpy.ndarray): Frequencies of the spectrum.
+        psd (numpy.ndarray): Power spectral density (frequencies x ports).
+        min_frequency (float): Ignore content below this frequency.
+    """
+    spectrum = np.atleast_2d(psd.T).mean(axis=0)
+    spectrum = np.where(frequency >= min_frequency, spectrum, -np.inf)
+    peak = int(np.argmax(spectrum))
+    return float(frequency[peak]), float(spectrum[peak])
+
+
+def strouhal(frequency, length=CHORD, velocity=Vinf):
+    """Return the Strouhal number f * length / velocity (chord based by default)."""
+    return np.asarray(frequency) * length / velocity
+
+
+def spectral_table(series, weights, runs=None, ports=SURFACE_TAPS, nperseg=NPERSEG, overlap=OVERLAP,
+                   min_frequency=MIN_FREQUENCY, statistics=None):
+    """
+    Reduce time-resolved runs to the polar table with the dominant frequency of every run.
+
+    Parameters:
+        series (TimeSeries): Time-resolved runs.
+        weights (numpy.ndarray): Polar weights from `default_weights`.
+        runs (list): Run numbers (default: all).
+        ports (list or tuple): Ports whose averaged spectrum gives the dominant frequency
+            (default: the surface taps).
+        nperseg (int): Samples per Welch segment.
+        overlap (float): Fraction of a segment shared with the next one.
+        min_frequency (float): Ignore content below this frequency.
+        statistics (dict): Result of `TimeSeries.statistics` to reuse for the averages.
+
+    Returns:
+        dict: Arrays of campaign.RESULT_COLUMNS and SPECTRAL_COLUMNS, one value per run.
+    """
+    from .polar import reduce_polar
+    from .wakedrag import wake_drag_runs
+
+    runs = series.runs if runs is None else [int(run) for run in runs]
+    averaged = series.averaged_log(runs, statistics)
+    polar = reduce_polar(averaged, weights, runs)
+    wake = wake_drag_runs(averaged, runs)
+
+    f_dominant = np.empty(len(runs))
+    psd_peak = np.empty(len(runs))
+    for i, run in enumerate(runs):
+        spectra = welch(series, run, nperseg, overlap, ports)
+        f_dominant[i], psd_peak[i] = dominant_frequency(spectra["frequency"], spectra["psd"], min_frequency)
+
+    return {
+        "run": polar["run"],
+        "alpha": polar["alpha"],
+        "cl": polar["cl"],
+        "cd": polar["cd"],
+        "cm": polar["cm"],
+        "x_cop": polar["x_cop"],
+        "cd_wake": wake["cd"],
+        "cd_wake_momentum": wake["cd_momentum"],
+        "cd_wake_pressure": wake["cd_pressure"],
+        "f_dominant": f_dominant,
+        "strouhal": strouhal(f_dominant),
+        "psd_peak": psd_peak,
+    }
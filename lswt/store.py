@@ -0,0 +1,245 @@
+"""
+On-disk store of reduced per-run results, one directory per campaign.
+
+Every column of a campaign is a .npy file, so a campaign is loaded with
+memory maps instead of re-parsing raw logs. Rows are stored sorted by
+alpha, so an alpha range is found with a binary search, and a run number
+index maps runs to rows.
+
+Every write goes to a new version directory inside the campaign directory,
+and a pointer file naming the current version is then replaced in one
+atomic rename, so a reader always finds a complete campaign. The previous
+version is kept until the next write, for readers still loading it.
+"""
+import json
+import os
+import re
+import shutil
+import time
+
+import numpy as np
+
+from .campaign import RESULT_COLUMNS
+
+STORE_VERSION = 1
+
+# Per-run profiles (runs x taps or probes) and the optional source file of every run
+PROFILE_COLUMNS = ["C_p", "velocity"]
+SOURCE_COLUMN = "source"
+
+META_FILE = "meta.json"
+RUN_INDEX_FILE = "run_order.npy"
+CURRENT_FILE = "current"  # Pointer to the version directory of a campaign
+LOAD_ATTEMPTS = 3  # Loads of a campaign that is rewritten meanwhile, before giving up
+
+_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def _valid_name(campaign):
+    # Names ending in .tmp and .old were used by the earlier in-place replacement of a campaign
+    return bool(_NAME.match(campaign)) and campaign not in (".", "..") and not campaign.endswith((".tmp", ".old"))
+
+
+def _check_name(campaign):
+    if not _valid_name(campaign):
+        raise ValueError(f"Invalid campaign name {campaign!r}: use letters, digits, '_', '-' and '.'")
+
+
+class Campaign:
+    """
+    Results of one campaign, loaded from a PolarStore.
+
+    Attributes:
+        name (str): Campaign name.
+        meta (dict): Description written with the campaign (columns, positions, runs).
+        columns (dict): Column arrays, sorted by alpha.
+    """
+
+    def __init__(self, name, meta, columns, run_order):
+        self.name = name
+        self.meta = meta
+        self.columns = columns
+        self._run_order = run_order
+        self._sorted_runs = columns["run"][run_order]
+
+    def __len__(self):
+        return len(self.columns["alpha"])
+
+    @property
+    def positions(self):
+        """Chordwise tap positions (% chord) of the C_p columns, or None."""
+        return self.meta.get("positions")
+
+    def alpha_range(self, alpha_min=None, alpha_max=None):
+        """Return the slice of rows with alpha_min <= alpha <= alpha_max."""
+        alpha = self.columns["alpha"]
+        start = 0 if alpha_min is None else int(np.searchsorted(alpha, alpha_min, side='left'))
+        stop = len(alpha) if alpha_max is None else int(np.searchsorted(alpha, alpha_max, side='right'))
+        return slice(start, max(start, stop))
+
+    def polar(self, alpha_min=None, alpha_max=None):
+        """Return the RESULT_COLUMNS (and source) of the runs between two alphas, sorted by alpha."""
+        rows = self.alpha_range(alpha_min, alpha_max)
+        names = [name for name in RESULT_COLUMNS + [SOURCE_COLUMN] if name in self.columns]
+        return {name: self.columns[name][rows] for name in names}
+
+    def rows(self, run):
+        """Return the rows (alpha order) holding a run number; several if logs were merged."""
+        start = np.searchsorted(self._sorted_runs, run, side='left')
+        stop = np.searchsorted(self._sorted_runs, run, side='right')
+        return np.sort(self._run_order[start:stop])
+
+    def cp(self, run):
+        """
+        Return the C_p distribution of a run number.
+
+        Returns:
+            dict: "run", "alpha", "C_p" (one row per match) and "source" if stored.
+
+        Raises:
+            KeyError: If the run is not in the campaign.
+        """
+        rows = self.rows(run)
+        if not len(rows):
+            raise KeyError(f"No data found for Run_nr {run} in campaign {self.name!r}")
+        if "C_p" not in self.columns:
+            raise KeyError(f"Campaign {self.name!r} has no C_p")
+        result = {name: self.columns[name][rows] for name in ("run", "alpha", "C_p")}
+        if SOURCE_COLUMN in self.columns:
+            result[SOURCE_COLUMN] = self.columns[SOURCE_COLUMN][rows]
+        return result
+
+
+class PolarStore:
+    """
+    Directory of campaigns written by `write` and read by `load`.
+
+    Parameters:
+        directory (str): Store directory (created on the first write).
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, campaign):
+        _check_name(campaign)
+        return os.path.join(self.directory, campaign)
+
+    def _current(self, campaign):
+        """Return the directory holding the current version of a campaign."""
+        path = self.path(campaign)
+        try:
+            with open(os.path.join(path, CURRENT_FILE), 'r') as f:
+                return os.path.join(path, f.read().strip())
+        except FileNotFoundError:
+            return path  # Written before versioning, or not at all
+
+    def campaigns(self):
+        """Return the names of the stored campaigns."""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name for name in names if _valid_name(name)
+                      and os.path.exists(os.path.join(self._current(name), META_FILE)))
+
+    def token(self, campaign):
+        """Return a value that changes whenever the campaign is rewritten."""
+        current = self._current(campaign)
+        stat = os.stat(os.path.join(current, META_FILE))
+        return current, stat.st_ino, stat.st_mtime_ns
+
+    def write(self, campaign, result, positions=None):
+        """
+        Store the per-run results of a campaign, replacing any earlier version.
+
+        Parameters:
+            campaign (str): Campaign name.
+            result (dict): Arrays of RESULT_COLUMNS and optionally PROFILE_COLUMNS and
+                "source", as returned by Pipeline.run, reduce_file or run_campaign.
+            positions (list): Chordwise tap positions (% chord) of the C_p columns.
+        """
+        path = self.path(campaign)
+        if "alpha" not in result or "run" not in result:
+            raise ValueError("result needs at least the 'run' and 'alpha' columns")
+
+        order = np.argsort(np.asarray(result["alpha"], dtype=float), kind='stable')
+        version = f"v{time.time_ns():x}-{os.getpid()}"
+        directory = os.path.join(path, version)
+        os.makedirs(directory)
+
+        names = [name for name in RESULT_COLUMNS + PROFILE_COLUMNS + [SOURCE_COLUMN] if name in result]
+        for name in names:
+            values = np.asarray(result[name])[order]
+            if name == "run":
+                values = values.astype(np.int64)
+            elif name == SOURCE_COLUMN:
+                values = values.astype(str)
+            np.save(os.path.join(directory, name + ".npy"), values)
+        run_order = np.argsort(np.asarray(result["run"])[order], kind='stable')
+        np.save(os.path.join(directory, RUN_INDEX_FILE), run_order)
+
+        meta = {
+            "version": STORE_VERSION,
+            "campaign": campaign,
+            "runs": int(len(order)),
+            "columns": names,
+            "positions": None if positions is None else [float(x) for x in positions],
+        }
+        with open(os.path.join(directory, META_FILE), 'w') as f:
+            json.dump(meta, f, indent=1)
+
+        # Point to the new version in one rename; a reader sees either the old or the new campaign
+        previous = os.path.basename(self._current(campaign))
+        pointer = os.path.join(path, CURRENT_FILE)
+        with open(pointer + "." + version, 'w') as f:
+            f.write(version)
+        os.replace(pointer + "." + version, pointer)
+
+        # Drop the versions before the previous one, and the files of an unversioned campaign
+        for name in os.listdir(path):
+            if name in (version, previous, CURRENT_FILE) or name.startswith(CURRENT_FILE + "."):
+                continue
+            entry = os.path.join(path, name)
+            if os.path.isdir(entry):
+                shutil.rmtree(entry, ignore_errors=True)
+            else:
+                os.remove(entry)
+
+    def load(self, campaign, mmap=True):
+        """
+        Load a campaign.
+
+        Parameters:
+            campaign (str): Campaign name.
+            mmap (bool): Memory-map the columns instead of reading them into memory.
+
+        Returns:
+            Campaign: The stored results.
+
+        Raises:
+            KeyError: If there is no such campaign.
+        """
+        for attempt in range(LOAD_ATTEMPTS):
+            path = self._current(campaign)
+            try:
+                with open(os.path.join(path, META_FILE), 'r') as f:
+                    meta = json.load(f)
+            except FileNotFoundError:
+                if attempt < LOAD_ATTEMPTS - 1 and self._current(campaign) != path:
+                    continue
+                raise KeyError(f"No campaign named {campaign!r} in {self.directory}") from None
+            if meta.get("version") != STORE_VERSION:
+                raise ValueError(f"Campaign {campaign!r} was written by an incompatible version of the store")
+
+            mode = 'r' if mmap else None
+            try:
+                columns = {name: np.load(os.path.join(path, name + ".npy"), mmap_mode=mode, allow_pickle=False)
+                           for name in meta["columns"]}
+                run_order = np.load(os.path.join(path, RUN_INDEX_FILE), allow_pickle=False)
+            except FileNotFoundError:
+                # Removed by two rewrites while loading; read the version that is current now
+                if attempt == LOAD_ATTEMPTS - 1:
+                    raise
+                continue
+            return Campaign(campaign, meta, columns, run_order)
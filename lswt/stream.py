@@ -0,0 +1,123 @@
+"""
+Out-of-core reduction of logs larger than memory.
+
+`iter_log` reads a raw log a fixed number of lines at a time and yields
+every block as a TunnelLog. The streaming reductions consume such blocks
+and yield per-run results block by block, so the memory held at any time
+is one block of raw rows plus the small result of that block, whatever the
+length of the log. Every run is reduced by the same functions as in
+memory (calculate_cp_rows, calculate_polar, wake_drag), so the streamed
+results equal the in-memory ones.
+"""
+import itertools
+
+import numpy as np
+
+from .data import TunnelLog, parse_rows, read_header
+from .pressure import Vinf, calculate_cp_rows
+
+CHUNK_RUNS = 10000  # Runs parsed and reduced at once
+
+
+def iter_log(file_path, chunk_runs=CHUNK_RUNS):
+    """
+    Yield a raw tunnel log as TunnelLog blocks of at most `chunk_runs` runs.
+
+    Parameters:
+        file_path (str): Raw tunnel log.
+        chunk_runs (int): Lines parsed at once.
+    """
+    if chunk_runs < 1:
+        raise ValueError(f"chunk_runs must be at least 1, got {chunk_runs}")
+    with open(file_path, 'r') as f:
+        columns = read_header(f)
+        while True:
+            lines = list(itertools.islice(f, chunk_runs))
+            if not lines:
+                return
+            values = parse_rows("".join(lines), columns, source=file_path)
+            if len(values):
+                yield TunnelLog(values, columns, source=file_path)
+
+
+def stream_cp(blocks, vinf=Vinf):
+    """
+    Yield the pressure coefficients of every block of runs.
+
+    Yields:
+        dict: "run", "alpha", "C_p" (runs x taps) and "C_pt_wake" (runs x rake probes) of a block.
+    """
+    for block in blocks:
+        C_p, alpha, C_pt_wake = calculate_cp_rows(block, slice(None), vinf=vinf)
+        yield {"run": block.run, "alpha": alpha, "C_p": C_p, "C_pt_wake": C_pt_wake}
+
+
+def stream_polar(blocks, weights, vinf=Vinf):
+    """Yield the result of `calculate_polar` plus the "run" numbers for every block of runs."""
+    from .polar import calculate_polar
+
+    for cp in stream_cp(blocks, vinf):
+        polar = calculate_polar(cp["C_p"], cp["alpha"], weights)
+        polar["run"] = cp["run"]
+        yield polar
+
+
+def stream_wake(blocks, **kwargs):
+    """Yield the result of `wake_drag_runs` plus the "run" numbers for every block of runs."""
+    from .wakedrag import wake_drag_rows
+
+    for block in blocks:
+        wake = wake_drag_rows(block, slice(None), **kwargs)
+        wake["run"] = block.run
+        yield wake
+
+
+def stream_reduce(blocks, weights, vinf=Vinf, **kwargs):
+    """
+    Yield the polar and wake rake drag of every block of runs, as `campaign.reduce_file` does in memory.
+
+    Parameters:
+        blocks (iterable): TunnelLog blocks, e.g. from `iter_log`.
+        weights (numpy.ndarray): Polar weights from `default_weights`.
+        vinf (float): Freestream velocity of the Cp.
+        **kwargs: Passed on to `wake_drag` (e.g. the probe positions pt_pos).
+
+    Yields:
+        dict: Arrays of campaign.RESULT_COLUMNS for the runs of one block.
+    """
+    from .polar import calculate_polar
+    from .wakedrag import wake_drag_rows
+
+    for block in blocks:
+        C_p, alpha, _ = calculate_cp_rows(block, slice(None), vinf=vinf)
+        polar = calculate_polar(C_p, alpha, weights)
+        wake = wake_drag_rows(block, slice(None), **kwargs)
+        yield {
+            "run": block.run,
+            "alpha": polar["alpha"],
+            "cl": polar["cl"],
+            "cd": polar["cd"],
+            "cm": polar["cm"],
+            "x_cop": polar["x_cop"],
+            "cd_wake": wake["cd"],
+            "cd_wake_momentum": wake["cd_momentum"],
+            "cd_wake_pressure": wake["cd_pressure"],
+        }
+
+
+def reduce_log_chunked(file_path, weights, chunk_runs=CHUNK_RUNS, **kwargs):
+    """
+    Reduce a raw log of any size to its per-run polar and wake drag.
+
+    Only the per-run results are kept (9 values per run); the raw rows are
+    read one block at a time.
+
+    Returns:
+        dict: Arrays of campaign.RESULT_COLUMNS, one value per run.
+    """
+    results = list(stream_reduce(iter_log(file_path, chunk_runs), weights, **kwargs))
+    if not results:
+        from .campaign import RESULT_COLUMNS
+
+        return {name: np.empty(0, dtype=int if name == "run" else float) for name in RESULT_COLUMNS}
+    return {name: np.concatenate([result[name] for result in results]) for name in results[0]}
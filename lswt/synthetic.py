@@ -0,0 +1,73 @@
+"""
+Synthetic tunnel logs for scaling tests.
+
+A synthetic log has the header and column layout of a real log. Its runs
+cycle through the alpha sweep of that log, with noise added to every
+pressure, so logs of 10^3 to 10^6 runs reduce like real data. The text is
+formatted a chunk at a time, so writing a large log needs little memory.
+"""
+import numpy as np
+
+from .data import HEADER_LINES, format_rows, parse_log
+
+# Seconds between the time stamps of consecutive synthetic runs
+RUN_INTERVAL = 20
+
+# Noise added to the template values
+PRESSURE_NOISE = 0.5  # Pa
+RHO_NOISE = 0.002  # kg/m^3
+
+
+def synthetic_rows(template, start, stop, seed=0):
+    """
+    Return the rows `start` to `stop` of a synthetic log based on a template log.
+
+    Rows depend only on the seed and their position, so a log can be generated
+    in chunks and any chunk reproduced on its own.
+
+    Parameters:
+        template (TunnelLog): Real log whose runs are cycled through.
+        start (int): First row (0 based).
+        stop (int): Row after the last one.
+        seed (int): Seed of the noise.
+
+    Returns:
+        numpy.ndarray: Rows (stop - start x columns), with Run_nr counting from 1.
+    """
+    rng = np.random.default_rng([seed, start])
+    index = np.arange(start, stop)
+    rows = template.values[index % len(template)].copy()
+    columns = template.columns
+
+    pressures = np.array([name.startswith("P") and name != "P_bar" for name in columns])
+    rows[:, pressures] += rng.normal(0, PRESSURE_NOISE, (len(index), pressures.sum()))
+    if "rho" in columns:
+        rows[:, columns.index("rho")] += rng.normal(0, RHO_NOISE, len(index))
+    if "Run_nr" in columns:
+        rows[:, columns.index("Run_nr")] = index + 1
+    if "Time" in columns:
+        first = template["Time"][0] if len(template) else 0
+        rows[:, columns.index("Time")] = (first + RUN_INTERVAL * index) % 86400
+    return rows
+
+
+def write_synthetic_log(file_path, runs, template_path, seed=0, chunk_runs=20000):
+    """
+    Write a synthetic tunnel log with the layout of a real one.
+
+    Parameters:
+        file_path (str): Log to write (overwritten).
+        runs (int): Number of runs.
+        template_path (str): Real tunnel log providing the header and the runs to cycle through.
+        seed (int): Seed of the noise.
+        chunk_runs (int): Runs formatted at once.
+    """
+    with open(template_path, 'r') as f:
+        header = [f.readline() for _ in range(HEADER_LINES)]
+    template = parse_log(template_path)
+
+    with open(file_path, 'w') as f:
+        f.writelines(header)
+        for start in range(0, runs, chunk_runs):
+            rows = synthetic_rows(template, start, min(start + chunk_runs, runs), seed)
+            f.write(format_rows(rows, template.columns))
@@ -0,0 +1,243 @@
+"""
+Time-resolved pressure data: one memory-mapped (samples x ports) array per run.
+
+A time-series directory holds a `timeseries.json` index (sample rate, port
+names, the per-run scalar columns such as Alpha and rho) and one raw
+float32 file per run. Statistics are computed a fixed number of samples at
+a time straight from the memory maps, so a run of several gigabytes never
+has to fit in RAM. The per-run means form a TunnelLog with the columns of
+the raw log, so Cp, the polar and the wake drag run on them unchanged.
+"""
+import json
+import os
+
+import numpy as np
+
+from .data import HEADER_LINES, TunnelLog, format_rows
+
+INDEX_FILE = "timeseries.json"
+TIMESERIES_VERSION = 1
+SAMPLE_DTYPE = np.dtype("<f4")
+
+CHUNK_SAMPLES = 16384  # Samples per port processed at once
+PERCENTILES = (1, 5, 50, 95, 99)
+HISTOGRAM_BINS = 4096  # Resolution of the percentiles: (max - min) / HISTOGRAM_BINS
+
+
+def is_port(name):
+    """Return True for the pressure port columns of a tunnel log (P001, P002, ...)."""
+    return name.startswith("P") and name[1:].isdigit()
+
+
+class TimeSeries:
+    """
+    Time-resolved runs in a directory, written with `write_run` and read as memory maps.
+
+    Parameters:
+        directory (str): Time-series directory.
+        columns (list): Column names of the matching raw log (only needed to create a new directory).
+        rate (float): Sample rate in Hz (only needed to create a new directory).
+    """
+
+    def __init__(self, directory, columns=None, rate=None):
+        self.directory = directory
+        index_path = os.path.join(directory, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, 'r') as f:
+                self.index = json.load(f)
+            if self.index.get("version") != TIMESERIES_VERSION:
+                raise ValueError(f"{directory} was written by an incompatible version")
+        elif columns is None or rate is None:
+            raise FileNotFoundError(f"No time series in {directory} (give columns and rate to create one)")
+        else:
+            self.index = {"version": TIMESERIES_VERSION, "rate": float(rate), "columns": list(columns), "runs": {}}
+
+        self.columns = self.index["columns"]
+        self.ports = [name for name in self.columns if is_port(name)]
+        self.scalar_columns = [name for name in self.columns if not is_port(name)]
+
+    @property
+    def rate(self):
+        return self.index["rate"]
+
+    @property
+    def runs(self):
+        """Run numbers in the order they were written."""
+        return [int(run) for run in self.index["runs"]]
+
+    def _path(self, run):
+        return os.path.join(self.directory, f"run_{int(run):06d}.bin")
+
+    def _save_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, INDEX_FILE)
+        with open(path + ".tmp", 'w') as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(path + ".tmp", path)
+
+    def write_run(self, run, samples, scalars):
+        """
+        Store the samples of a run, replacing an earlier run with the same number.
+
+        Parameters:
+            run (int): Run number.
+            samples (numpy.ndarray or iterable): A (samples x ports) array, or an iterable of
+                such chunks (e.g. blocks arriving from the acquisition system).
+            scalars (dict): Values of the scalar columns (Alpha, rho, ...) of the run.
+        """
+        missing = set(self.scalar_columns) - set(scalars) - {"Run_nr"}
+        if missing:
+            raise ValueError(f"Run {run} is missing the scalar columns {sorted(missing)}")
+        if isinstance(samples, np.ndarray):
+            samples = [samples]
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(run)
+        count = 0
+        with open(path + ".tmp", 'wb') as f:
+            for chunk in samples:
+                chunk = np.atleast_2d(np.asarray(chunk))
+                if chunk.shape[1] != len(self.ports):
+                    raise ValueError(f"Run {run}: samples must have {len(self.ports)} ports, got {chunk.shape[1]}")
+                f.write(np.ascontiguousarray(chunk, dtype=SAMPLE_DTYPE).tobytes())
+                count += len(chunk)
+        os.replace(path + ".tmp", path)
+
+        values = {name: float(scalars[name]) for name in self.scalar_columns if name != "Run_nr"}
+        self.index["runs"][str(int(run))] = {"samples": count, "scalars": values}
+        self._save_index()
+
+    def samples(self, run):
+        """Return the (samples x ports) memory map of a run."""
+        try:
+            count = self.index["runs"][str(int(run))]["samples"]
+        except KeyError:
+            raise KeyError(f"No data found for Run_nr {run}") from None
+        if not count:
+            return np.empty((0, len(self.ports)), dtype=SAMPLE_DTYPE)
+        return np.memmap(self._path(run), dtype=SAMPLE_DTYPE, mode='r', shape=(count, len(self.ports)))
+
+    def chunks(self, run, chunk_samples=CHUNK_SAMPLES):
+        """Yield the samples of a run as float64 blocks of at most `chunk_samples` rows."""
+        samples = self.samples(run)
+        for start in range(0, len(samples), chunk_samples):
+            yield np.asarray(samples[start:start + chunk_samples], dtype=float)
+
+    def run_statistics(self, run, percentiles=PERCENTILES, chunk_samples=CHUNK_SAMPLES, bins=HISTOGRAM_BINS):
+        """
+        Compute the statistics of every port of one run in fixed-size chunks.
+
+        The first pass accumulates the sums, sums of squares, minimum and
+        maximum; the second fills a histogram of every port between its
+        minimum and maximum, from which the percentiles are interpolated.
+        They match the inverted-CDF definition to within one bin width.
+
+        Returns:
+            dict: "mean", "std", "rms", "min" and "max" (ports), and "percentiles"
+                (len(percentiles) x ports).
+        """
+        ports = len(self.ports)
+        count = 0
+        shift = None
+        total = np.zeros(ports)
+        total_sq = np.zeros(ports)
+        low = np.full(ports, np.inf)
+        high = np.full(ports, -np.inf)
+        for chunk in self.chunks(run, chunk_samples):
+            if shift is None:
+                # Summing deviations from a first estimate keeps the variance accurate
+                shift = chunk.mean(axis=0)
+            deviation = chunk - shift
+            total += deviation.sum(axis=0)
+            total_sq += np.einsum('ij,ij->j', deviation, deviation)
+            np.minimum(low, chunk.min(axis=0), out=low)
+            np.maximum(high, chunk.max(axis=0), out=high)
+            count += len(chunk)
+        if not count:
+            raise ValueError(f"Run {run} has no samples")
+
+        mean_deviation = total / count
+        mean = shift + mean_deviation
+        variance = np.maximum(total_sq / count - mean_deviation**2, 0)
+        mean_sq = variance + mean**2
+
+        # Histogram every port between its own minimum and maximum in one bincount
+        width = np.where(high > low, (high - low) / bins, 1.0)
+        histogram = np.zeros(ports * bins, dtype=np.int64)
+        offsets = np.arange(ports) * bins
+        for chunk in self.chunks(run, chunk_samples):
+            index = np.minimum(((chunk - low) / width).astype(np.int64), bins - 1)
+            histogram += np.bincount((index + offsets).ravel(), minlength=ports * bins)
+        cumulative = np.cumsum(histogram.reshape(ports, bins), axis=1)
+
+        quantiles = np.empty((len(percentiles), ports))
+        for i, q in enumerate(percentiles):
+            target = q / 100 * count
+            # First bin whose cumulative count reaches the target, interpolated within the bin
+            bin_index = np.minimum((cumulative < target).sum(axis=1), bins - 1)
+            below = np.where(bin_index > 0, cumulative[np.arange(ports), bin_index - 1], 0)
+            in_bin = cumulative[np.arange(ports), bin_index] - below
+            fraction = np.where(in_bin > 0, (target - below) / np.maximum(in_bin, 1), 0)
+            quantiles[i] = np.clip(low + (bin_index + fraction) * width, low, high)
+
+        return {"mean": mean, "std": np.sqrt(variance), "rms": np.sqrt(mean_sq), "min": low, "max": high,
+                "percentiles": quantiles}
+
+    def statistics(self, runs=None, percentiles=PERCENTILES, chunk_samples=CHUNK_SAMPLES, bins=HISTOGRAM_BINS):
+        """
+        Compute the statistics of every port of several runs (all by default).
+
+        Returns:
+            dict: "run" and "samples", "mean", "std", "rms", "min" and "max" (runs x ports),
+                "percentiles" (runs x len(percentiles) x ports) and the percentile levels "q".
+        """
+        runs = self.runs if runs is None else [int(run) for run in runs]
+        stats = [self.run_statistics(run, percentiles, chunk_samples, bins) for run in runs]
+        result = {name: np.array([s[name] for s in stats]).reshape((len(runs),) + (len(self.ports),))
+                  for name in ("mean", "std", "rms", "min", "max")}
+        result["percentiles"] = np.array([s["percentiles"] for s in stats]).reshape(
+            (len(runs), len(percentiles), len(self.ports)))
+        result["run"] = np.array(runs, dtype=int)
+        result["samples"] = np.array([self.index["runs"][str(run)]["samples"] for run in runs], dtype=int)
+        result["q"] = np.asarray(percentiles, dtype=float)
+        return result
+
+    def averaged_log(self, runs=None, statistics=None, **kwargs):
+        """
+        Return the time-averaged runs as a TunnelLog with the columns of the raw log.
+
+        The result goes through calculate_cp, reduce_polar and wake_drag_runs like a
+        log written by the acquisition system.
+
+        Parameters:
+            runs (list): Run numbers (default: all).
+            statistics (dict): Result of `statistics` to reuse, instead of computing it.
+        """
+        stats = self.statistics(runs, **kwargs) if statistics is None else statistics
+        values = np.empty((len(stats["run"]), len(self.columns)), order='F')
+        port_columns = [self.columns.index(name) for name in self.ports]
+        values[:, port_columns] = stats["mean"]
+        for name in self.scalar_columns:
+            j = self.columns.index(name)
+            if name == "Run_nr":
+                values[:, j] = stats["run"]
+            else:
+                values[:, j] = [self.index["runs"][str(run)]["scalars"][name] for run in stats["run"]]
+        return TunnelLog(values, self.columns, source=self.directory)
+
+    def write_averaged_log(self, file_path, runs=None, statistics=None, units=None, **kwargs):
+        """
+        Write the time-averaged runs as a raw tunnel log.
+
+        Parameters:
+            file_path (str): Log to write.
+            runs (list): Run numbers (default: all).
+            statistics (dict): Result of `statistics` to reuse.
+            units (str): Units header line (default: '/' for every column).
+        """
+        log = self.averaged_log(runs, statistics, **kwargs)
+        header = ["\t".join(f"{name:>8s}" for name in self.columns)]
+        header.append(units.rstrip("\n") if units is not None else "\t".join(f"{'/':>8s}" for _ in self.columns))
+        with open(file_path, 'w') as f:
+            f.write("\n".join(header[:HEADER_LINES]) + "\n")
+            f.write(format_rows(log.values, self.columns))
@@ -0,0 +1,167 @@
+"""
+Monte Carlo uncertainty of the pressure polar and the wake rake drag.
+
+Every run is reduced many times with perturbed inputs: noise on the surface
+taps, the rake probes and the reference pressure, and errors in rho, the
+freestream velocity and the tap positions. All samples of a chunk of runs
+go through Cp, the polar integration and the wake drag as one batched
+array, so thousands of samples per run take seconds. The tap positions
+only enter the polar weights, so a limited set of perturbed weights is
+built once and shared by all runs.
+"""
+import numpy as np
+
+# Standard deviation of every input, in the units of the raw log
+DEFAULT_SIGMA = {
+    "taps": 1.0,        # Surface tap pressures (Pa)
+    "rake": 1.0,        # Wake rake total and static pressures (Pa)
+    "reference": 1.0,   # Reference pressure p097 (Pa)
+    "rho": 0.005,       # Air density (kg/m^3)
+    "vinf": 0.1,        # Freestream velocity used for Cp (m/s)
+    "positions": 0.05,  # Chordwise tap positions (% chord)
+}
+
+# Coefficients that get a confidence interval
+UNCERTAINTY_COLUMNS = ["cl", "cd", "cm", "cd_wake"]
+
+# Upper bound on the memory of the sample arrays of one chunk of runs
+CHUNK_BYTES = 64 * 2**20
+
+
+def perturbed_weights(positions, count, sigma, rng, x_data=None, geometry=None):
+    """
+    Build polar weights for `count` random perturbations of the tap positions.
+
+    Parameters:
+        positions (list): Chordwise tap positions (% chord), upper then lower surface.
+        count (int): Number of perturbed tap layouts.
+        sigma (float): Standard deviation of every tap position (% chord).
+        rng (numpy.random.Generator): Random number generator.
+        x_data (numpy.ndarray): Chordwise integration grid (x/c). Defaults to X_DATA.
+        geometry (AirfoilGeometry): Airfoil geometry. Defaults to the tunnel model.
+
+    Returns:
+        numpy.ndarray: Weights (count x taps x 3).
+    """
+    from .geometry import AirfoilGeometry
+    from .polar import SCALE_FACTOR, X_DATA, polar_weights, split_surfaces
+
+    positions = np.asarray(positions, dtype=float)
+    x_data = X_DATA if x_data is None else np.asarray(x_data, dtype=float)
+    geometry = AirfoilGeometry() if geometry is None else geometry
+    # The surface slopes do not depend on the tap positions
+    upper_slopes, lower_slopes = geometry.slopes(x_data * (100 * SCALE_FACTOR), SCALE_FACTOR)
+
+    upper, lower = split_surfaces(positions)
+    weights = np.empty((count, len(positions), 3))
+    for i in range(count):
+        layout = positions + rng.normal(0, sigma, positions.shape)
+        if (np.diff(layout[upper]) <= 0).any() or (np.diff(layout[lower]) <= 0).any():
+            raise ValueError(f"positions sigma {sigma} reorders the taps, it must be small compared to the tap spacing")
+        weights[i] = polar_weights(layout, x_data, upper_slopes, lower_slopes)
+    return weights
+
+
+def _noisy(rng, values, scale, shape):
+    """Return `values` broadcast to `shape` plus normal noise of standard deviation `scale`."""
+    return values + rng.normal(0, scale, shape) if scale > 0 else np.broadcast_to(values, shape)
+
+
+def _chunk_runs(samples, columns, chunk_bytes):
+    # Roughly four float64 arrays of (runs x samples x columns) are alive at once
+    per_run = 4 * 8 * samples * columns
+    return max(1, int(chunk_bytes // per_run))
+
+
+def polar_uncertainty(data, positions, runs=None, samples=2000, sigma=None, confidence=0.95, seed=None,
+                      weight_draws=64, chunk_bytes=CHUNK_BYTES):
+    """
+    Propagate the measurement uncertainty of runs of a TunnelLog to Cl, Cd, Cm and wake Cd.
+
+    Parameters:
+        data (TunnelLog): Loaded tunnel log.
+        positions (list): Chordwise tap positions (% chord).
+        runs (array_like): Run numbers to evaluate (default: all).
+        samples (int): Monte Carlo samples per run.
+        sigma (dict): Standard deviations overriding DEFAULT_SIGMA (0 disables an input).
+        confidence (float): Coverage of the reported intervals.
+        seed (int): Seed of the random number generator, for reproducible intervals.
+        weight_draws (int): Number of perturbed tap layouts the samples cycle through.
+        chunk_bytes (int): Memory budget of the sample arrays of one chunk of runs.
+
+    Returns:
+        dict: "run" and "alpha", and for every name in UNCERTAINTY_COLUMNS the nominal
+            value and its "<name>_std", "<name>_low" and "<name>_high" (one value per run).
+    """
+    from .polar import calculate_polar, default_weights
+    from .pressure import REFERENCE_COLUMN, SURFACE_TAPS, Vinf, calculate_cp_rows, pressure_coefficient
+    from .wakedrag import STATIC_PROBES, TOTAL_PROBES, wake_drag, wake_drag_rows
+
+    sigma = dict(DEFAULT_SIGMA, **(sigma or {}))
+    unknown = set(sigma) - set(DEFAULT_SIGMA)
+    if unknown:
+        raise ValueError(f"Unknown uncertainty inputs {sorted(unknown)}, expected {sorted(DEFAULT_SIGMA)}")
+    rng = np.random.default_rng(seed)
+
+    runs = data.run if runs is None else np.asarray(runs, dtype=int)
+    rows = data.rows(runs)
+    taps = data.block(*SURFACE_TAPS)
+    pt = data.block(*TOTAL_PROBES)
+    ps = data.block(*STATIC_PROBES)
+    p_ref = data[REFERENCE_COLUMN]
+    rho = data.rho
+    alpha = data.alpha[rows]
+
+    if sigma["positions"] > 0:
+        weights = perturbed_weights(positions, weight_draws, sigma["positions"], rng)
+        # Sample s uses tap layout s % weight_draws, the same one for every run
+        sample_weights = weights[np.arange(samples) % weight_draws]
+    else:
+        sample_weights = default_weights(positions)
+
+    result = {"run": runs, "alpha": alpha}
+    nominal_polar = calculate_polar(calculate_cp_rows(data, rows)[0], alpha, default_weights(positions))
+    nominal_wake = wake_drag_rows(data, rows)
+    nominal = {"cl": nominal_polar["cl"], "cd": nominal_polar["cd"], "cm": nominal_polar["cm"],
+               "cd_wake": nominal_wake["cd"]}
+    for name in UNCERTAINTY_COLUMNS:
+        result[name] = nominal[name]
+        for suffix in ("_std", "_low", "_high"):
+            result[name + suffix] = np.empty(len(rows))
+
+    tail = (1 - confidence) / 2
+    step = _chunk_runs(samples, taps.shape[1] + pt.shape[1] + ps.shape[1], chunk_bytes)
+    for start in range(0, len(rows), step):
+        chunk = rows[start:start + step]
+        n = len(chunk)
+
+        # Every input gets an independent draw per run and sample; the reference
+        # pressure, rho and Vinf errors are shared by all taps of a sample
+        rho_s = _noisy(rng, rho[chunk][:, None], sigma["rho"], (n, samples))
+        vinf_s = _noisy(rng, Vinf, sigma["vinf"], (n, samples))
+        p_ref_s = _noisy(rng, p_ref[chunk][:, None], sigma["reference"], (n, samples))
+        taps_s = _noisy(rng, taps[chunk][:, None, :], sigma["taps"], (n, samples, taps.shape[1]))
+
+        C_p = pressure_coefficient(taps_s, p_ref_s, rho_s, vinf_s)
+        if sample_weights.ndim == 3:
+            cn, ca, cm = np.moveaxis((C_p[:, :, None, :] @ sample_weights)[:, :, 0, :], -1, 0)
+        else:
+            cn, ca, cm = np.moveaxis(C_p @ sample_weights, -1, 0)
+        alpha_rad = np.radians(alpha[start:start + n])[:, None]
+        cos_a, sin_a = np.cos(alpha_rad), np.sin(alpha_rad)
+        values = {"cl": cn * cos_a - ca * sin_a, "cd": ca * cos_a + cn * sin_a, "cm": cm}
+        del taps_s, C_p
+
+        pt_s = _noisy(rng, pt[chunk][:, None, :], sigma["rake"], (n, samples, pt.shape[1]))
+        ps_s = _noisy(rng, ps[chunk][:, None, :], sigma["rake"], (n, samples, ps.shape[1]))
+        wake = wake_drag(pt_s.reshape(n * samples, -1), ps_s.reshape(n * samples, -1), rho_s.reshape(-1))
+        values["cd_wake"] = wake["cd"].reshape(n, samples)
+        del pt_s, ps_s, wake
+
+        for name in UNCERTAINTY_COLUMNS:
+            low, high = np.nanquantile(values[name], [tail, 1 - tail], axis=1)
+            result[name + "_std"][start:start + n] = np.nanstd(values[name], axis=1)
+            result[name + "_low"][start:start + n] = low
+            result[name + "_high"][start:start + n] = high
+
+    return result
@@ -0,0 +1,111 @@
+import numpy as np
+
+from .data import COLUMN_MAP
+from .polar import CHORD, interpolation_matrix, row_dot, trapezoid_weights
+from .profiling import instrumented
+
+# Rake layout in the raw log
+TOTAL_PROBES = COLUMN_MAP["rake_total"]
+STATIC_PROBES = COLUMN_MAP["rake_static"]
+
+# Probe positions along the rake (m)
+pt_positions = np.array([0, 12, 21, 27, 33, 39, 45, 51, 57, 63, 69, 72, 75, 78, 81, 84, 87, 90, 93, 96, 99,
+                         102, 105, 108, 111, 114, 117, 120, 123, 126, 129, 132, 135, 138, 141, 144, 147,
+                         150, 156, 162, 168, 174, 180, 186, 195, 207, 219]) / 1000
+ps_positions = np.array([43.5, 55.5, 67.5, 79.5, 91.5, 103.5, 115.5, 127.5, 139.5, 151.5, 163.5, 175.5]) / 1000
+
+
+def interpolate_static(ps, pt_pos=pt_positions, ps_pos=ps_positions):
+    """
+    Interpolate the static pressures of every run onto the total pressure probes.
+
+    Parameters:
+        ps (numpy.ndarray): Static pressures (runs x static probes).
+        pt_pos (numpy.ndarray): Total pressure probe positions.
+        ps_pos (numpy.ndarray): Static pressure probe positions.
+
+    Returns:
+        numpy.ndarray: Static pressure at every total pressure probe (runs x total probes).
+    """
+    return row_dot(ps, interpolation_matrix(pt_pos, ps_pos).T)
+
+
+def wake_velocity(pt, ps_rake, rho):
+    """
+    Calculate the wake velocities with Bernoulli's equation.
+
+    Probes where the total pressure is below the local static pressure get a
+    velocity of 0 instead of a NaN.
+    """
+    rho = np.asarray(rho, dtype=float).reshape(-1, 1)
+    dynamic = np.maximum(2 * (np.atleast_2d(pt) - ps_rake) / rho, 0)
+    return np.sqrt(dynamic)
+
+
+@instrumented("wakedrag.wake_drag", rows=lambda result: len(result["cd"]))
+def wake_drag(pt, ps, rho, u_inf=None, p_inf=None, chord=CHORD, pt_pos=pt_positions, ps_pos=ps_positions):
+    """
+    Calculate the wake rake drag coefficient of every run at once.
+
+    The drag per unit span is the momentum deficit rho * int((u_inf - u) * u dy)
+    plus the static pressure deficit int((p_inf - p) dy), both integrated over
+    the total pressure probes.
+
+    Parameters:
+        pt (numpy.ndarray): Total pressures (runs x total probes).
+        ps (numpy.ndarray): Static pressures (runs x static probes).
+        rho (numpy.ndarray): Air density of every run.
+        u_inf (float or numpy.ndarray): Freestream velocity. Defaults to the mean
+            velocity at the two outer total pressure probes of each run.
+        p_inf (float or numpy.ndarray): Freestream static pressure. Defaults to the
+            mean of the two outer static probes of each run.
+        chord (float): Chord length used to normalise the drag.
+
+    Returns:
+        dict: Arrays "cd", "cd_momentum" and "cd_pressure" plus the "u_inf" and
+            "p_inf" used (one value per run), and the wake "velocity" (runs x probes).
+    """
+    pt = np.atleast_2d(np.asarray(pt, dtype=float))
+    ps = np.atleast_2d(np.asarray(ps, dtype=float))
+    rho = np.broadcast_to(np.asarray(rho, dtype=float), (pt.shape[0],))
+
+    ps_rake = interpolate_static(ps, pt_pos, ps_pos)
+    velocity = wake_velocity(pt, ps_rake, rho)
+
+    if u_inf is None:
+        u_inf = 0.5 * (velocity[:, 0] + velocity[:, -1])
+    if p_inf is None:
+        p_inf = 0.5 * (ps[:, 0] + ps[:, -1])
+    u_inf = np.broadcast_to(np.asarray(u_inf, dtype=float), rho.shape)
+    p_inf = np.broadcast_to(np.asarray(p_inf, dtype=float), rho.shape)
+
+    t = trapezoid_weights(pt_pos)
+    momentum = rho * row_dot((u_inf[:, None] - velocity) * velocity, t)
+    pressure = row_dot(p_inf[:, None] - ps_rake, t)
+
+    q_c = 0.5 * rho * u_inf**2 * chord
+    return {
+        "cd": (momentum + pressure) / q_c,
+        "cd_momentum": momentum / q_c,
+        "cd_pressure": pressure / q_c,
+        "u_inf": u_inf,
+        "p_inf": p_inf,
+        "velocity": velocity,
+    }
+
+
+def wake_drag_runs(data, runs=None, **kwargs):
+    """
+    Calculate the wake rake drag for runs of a TunnelLog (all runs by default).
+
+    Extra keyword arguments are passed on to `wake_drag`.
+    """
+    return wake_drag_rows(data, slice(None) if runs is None else data.rows(runs), **kwargs)
+
+
+def wake_drag_rows(data, rows, **kwargs):
+    """Calculate the wake rake drag for rows (positions, not run numbers) of a TunnelLog."""
+    result = wake_drag(data.block(*TOTAL_PROBES)[rows], data.block(*STATIC_PROBES)[rows],
+                       data.rho[rows], **kwargs)
+    result["alpha"] = data.alpha[rows]
+    return result
@@ -0,0 +1,74 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from lswt.data import HEADER_LINES, load_log
+from lswt.polar import default_weights
+from lswt.pressure import load_chordwise_positions
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOG_FILE = os.path.join(ROOT, "raw_raw_2D_retest2.txt")
+POSITIONS_FILE = os.path.join(ROOT, "positions p.txt")
+
+
+def assert_same(a, b):
+    """Assert that two dicts of arrays hold exactly the same values under the same names."""
+    assert sorted(a) == sorted(b)
+    for name in a:
+        np.testing.assert_array_equal(a[name], b[name], err_msg=name)
+
+
+def reference_rows(file_path):
+    """The line by line parser of the original pressurecoefficient.load_data."""
+    rows = []
+    with open(file_path) as f:
+        for line in f.readlines()[HEADER_LINES:]:
+            parts = line.split()
+            rows.append((int(parts[0]), float(parts[2]), float(parts[7]), [float(p) for p in parts[8:57]],
+                         float(parts[104 + 13]), [float(p) for p in parts[57:104]]))
+    return rows
+
+
+def write_series(directory, data, runs, samples=5000, rate=1000.0, frequency=40.0, seed=0):
+    """
+    Write time-resolved runs around the ports of the given runs of a log: noise and a
+    sine of `frequency` Hz (amplitude 5 Pa) on every port.
+    """
+    from lswt.timeseries import TimeSeries, is_port
+
+    rng = np.random.default_rng(seed)
+    series = TimeSeries(directory, data.columns, rate)
+    ports = [i for i, name in enumerate(data.columns) if is_port(name)]
+    t = np.arange(samples) / rate
+    for row in data.rows(runs):
+        values = data.values[row]
+        noise = rng.normal(0, 2, (samples, len(ports)))
+        signal = values[ports] + 5 * np.sin(2 * np.pi * frequency * t)[:, None] + noise
+        scalars = {name: values[i] for i, name in enumerate(data.columns) if not is_port(name)}
+        series.write_run(int(data.run[row]), signal, scalars)
+    return series
+
+
+@pytest.fixture(scope="session")
+def data():
+    return load_log(LOG_FILE, cache=False)
+
+
+@pytest.fixture(scope="session")
+def positions():
+    return load_chordwise_positions(POSITIONS_FILE)
+
+
+@pytest.fixture(scope="session")
+def weights(positions):
+    return default_weights(positions)
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """A copy of the sample log, so caches written next to it stay out of the tree."""
+    path = tmp_path / "log.txt"
+    shutil.copy(LOG_FILE, path)
+    return str(path)
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from lswt.bem import Blade, _induction, load_blade, rotor_performance
+from lswt.campaign import reduce_file
+from lswt.polartable import PolarTable
+
+from conftest import LOG_FILE
+
+TSR = [3.0, 5.0, 7.0, 9.0]
+PITCH = [0.0, 2.0]
+
+
+@pytest.fixture(scope="module")
+def table(weights):
+    return PolarTable.from_result(reduce_file(LOG_FILE, weights, cache=False))
+
+
+@pytest.fixture(scope="module")
+def blade():
+    radius = np.linspace(0.3, 2.0, 15)
+    return Blade(radius, 0.125 * np.sqrt(2.0 / radius), 20 * (0.3 / radius)**1.2 - 2, hub_radius=0.25)
+
+
+def test_batch_matches_single_operating_points(table, blade):
+    batch = rotor_performance(table, blade, TSR, PITCH)
+    for i, tsr in enumerate(TSR):
+        for j, pitch in enumerate(PITCH):
+            single = rotor_performance(table, blade, tsr, pitch)
+            for name in ("cp", "ct", "cq"):
+                np.testing.assert_allclose(batch[name][i, j], single[name][0, 0], rtol=1e-12, err_msg=name)
+            np.testing.assert_array_equal(batch["a"][i, j], single["a"][0, 0])
+
+
+def test_converged_elements_satisfy_the_momentum_equations(table, blade):
+    result = rotor_performance(table, blade, TSR, PITCH, tolerance=1e-9, max_iterations=1000)
+    assert np.all(result["element_converged"])
+    local_tsr = np.asarray(TSR)[:, None, None] * blade.radius / blade.tip_radius + np.zeros(result["a"].shape)
+    theta = blade.twist + np.asarray(PITCH)[None, :, None] + np.zeros(result["a"].shape)
+    r = np.broadcast_to(blade.radius, result["a"].shape)
+    a_new, a_prime_new, *_ = _induction(blade, r, np.broadcast_to(blade.solidity, r.shape), local_tsr, theta,
+                                        result["a"], result["a_prime"], table, "all")
+    np.testing.assert_allclose(a_new, result["a"], atol=1e-6)
+    np.testing.assert_allclose(a_prime_new, result["a_prime"], atol=1e-6)
+
+
+def test_power_stays_below_the_betz_limit(table, blade):
+    result = rotor_performance(table, blade, np.linspace(1, 12, 12), PITCH)
+    assert np.all(result["cp"] < 16 / 27)
+    assert result["cp"].max() > 0.2
+
+
+def test_non_finite_pitch_is_not_converged(table, blade):
+    result = rotor_performance(table, blade, TSR, [0.0, np.nan])
+    assert np.all(np.isnan(result["cp"][:, 1])) and np.all(result["converged"][:, 1] == 0)
+    np.testing.assert_allclose(result["cp"][:, 0], rotor_performance(table, blade, TSR, 0.0)["cp"][:, 0], rtol=1e-12)
+    assert np.all(result["converged"][:, 0] == 1)
+
+
+def test_load_blade(tmp_path):
+    path = tmp_path / "blade.txt"
+    path.write_text("# r chord twist\n0.5 0.2 10\n1.0 0.15 5\n1.5 0.1 2\n")
+    blade = load_blade(str(path), blades=2)
+    np.testing.assert_array_equal(blade.radius, [0.5, 1.0, 1.5])
+    np.testing.assert_allclose(blade.solidity, 2 * blade.chord / (2 * np.pi * blade.radius))
+    with pytest.raises(ValueError, match="increasing"):
+        Blade([1.0, 0.5], 0.1, 0.0)
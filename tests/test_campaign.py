@@ -0,0 +1,53 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from lswt.campaign import RESULT_COLUMNS, find_logs, reduce_file, run_campaign
+
+from conftest import LOG_FILE, assert_same
+
+
+@pytest.fixture
+def campaign(tmp_path):
+    """Two copies of the sample log, a broken log and a file that is not a log."""
+    for name in ("a.txt", "b.txt"):
+        shutil.copy(LOG_FILE, tmp_path / name)
+    with open(LOG_FILE) as f:
+        header = f.readline() + f.readline()
+    (tmp_path / "broken.txt").write_text(header + "1 2 3\n")
+    (tmp_path / "notes.txt").write_text("not a tunnel log\n")
+    return tmp_path
+
+
+def test_find_logs_skips_other_files(campaign):
+    assert [os.path.basename(path) for path in find_logs(str(campaign))] == ["a.txt", "b.txt", "broken.txt"]
+    assert find_logs(str(campaign / "a.*")) == [str(campaign / "a.txt")]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_failed_log_does_not_stop_the_campaign(campaign, positions, weights, workers):
+    merged, failures = run_campaign(str(campaign), positions, workers=workers, cache=False)
+    assert list(failures) == [str(campaign / "broken.txt")]
+    assert "ValueError" in failures[str(campaign / "broken.txt")]
+
+    single = reduce_file(LOG_FILE, weights, cache=False)
+    runs = len(single["run"])
+    assert len(merged["run"]) == 2 * runs
+    assert merged["source"][0] == str(campaign / "a.txt") and merged["source"][-1] == str(campaign / "b.txt")
+    for name in RESULT_COLUMNS + ["C_p"]:
+        np.testing.assert_array_equal(merged[name][:runs], single[name], err_msg=name)
+        np.testing.assert_array_equal(merged[name][runs:], single[name], err_msg=name)
+
+
+def test_parallel_matches_serial(campaign, positions):
+    serial, _ = run_campaign(str(campaign), positions, workers=1, cache=False)
+    parallel, _ = run_campaign(str(campaign), positions, workers=2, cache=False)
+    assert_same(serial, parallel)
+
+
+def test_nothing_reduced(tmp_path, positions):
+    merged, failures = run_campaign(str(tmp_path / "missing.txt"), positions, workers=1, cache=False)
+    assert list(failures) == [str(tmp_path / "missing.txt")]
+    assert all(len(merged[name]) == 0 for name in RESULT_COLUMNS)
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from lswt.cli import main
+
+from conftest import LOG_FILE, POSITIONS_FILE
+
+
+def test_polar(capsys):
+    assert main(["polar", LOG_FILE, "--no-cache", "--runs", "1", "2"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split() == ["run", "alpha", "cl", "cd", "cm", "x_cop"]
+    assert len(lines) == 3
+
+
+@pytest.mark.parametrize("extra", [1, -1])
+def test_polar_with_wrong_positions_is_an_error(tmp_path, capsys, extra):
+    positions = np.loadtxt(POSITIONS_FILE)
+    positions = np.append(positions, 99.0) if extra > 0 else positions[:-1]
+    path = tmp_path / "positions.txt"
+    np.savetxt(path, positions)
+    assert main(["polar", LOG_FILE, "--no-cache", "--positions", str(path)]) == 1
+    assert "lswt: error: Shape mismatch" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("sources", [[LOG_FILE], [LOG_FILE, LOG_FILE]])
+def test_compare_needs_two_campaigns(capsys, sources):
+    assert main(["compare", *sources, "--no-cache", "--positions", POSITIONS_FILE]) == 1
+    assert capsys.readouterr().err.startswith("lswt: error:")
+
+
+def test_missing_file_is_an_error(tmp_path, capsys):
+    assert main(["polar", str(tmp_path / "missing.txt"), "--no-cache"]) == 1
+    assert "lswt: error:" in capsys.readouterr().err
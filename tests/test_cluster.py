@@ -0,0 +1,105 @@
+import shutil
+import socket
+import threading
+
+import pytest
+
+from lswt import cluster
+from lswt.campaign import run_campaign
+from lswt.cluster import LocalWorkers, parse_address, plan_shards, run_cluster
+
+from conftest import LOG_FILE, assert_same
+
+
+@pytest.fixture
+def campaign(tmp_path):
+    for name in ("a.txt", "b.txt"):
+        shutil.copy(LOG_FILE, tmp_path / name)
+    return tmp_path
+
+
+@pytest.fixture(scope="module")
+def worker():
+    with LocalWorkers(1) as workers:
+        yield workers.addresses[0]
+
+
+@pytest.fixture(autouse=True)
+def fast_reconnect(monkeypatch):
+    monkeypatch.setattr(cluster, "RECONNECT_DELAY", 0.01)
+
+
+def fake_worker(reply):
+    """
+    Listen on a free port with a worker that fails every shard it is sent: "drop" closes
+    the connection, "silent" never answers. Returns the address.
+    """
+    server = socket.create_server(("127.0.0.1", 0))
+    connections = []
+
+    def serve():
+        while True:
+            connection, _ = server.accept()
+            connection.recv(1)
+            if reply == "drop":
+                connection.close()
+            else:
+                connections.append(connection)
+
+    threading.Thread(target=serve, daemon=True).start()
+    return server.getsockname()
+
+
+def unused_address():
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        return server.getsockname()
+
+
+def test_parse_address():
+    assert parse_address("node1:9000") == ("node1", 9000)
+    assert parse_address("node1") == ("node1", cluster.DEFAULT_PORT)
+    with pytest.raises(ValueError, match="host:port"):
+        parse_address("node1:x")
+
+
+def test_shards_cover_the_log(data):
+    shards = plan_shards([LOG_FILE], shard_runs=10)
+    assert shards[0]["start"] == 0 and all(shard["stop"] - shard["start"] == 10 for shard in shards)
+    assert shards[-1]["stop"] >= len(data)
+    with pytest.raises(ValueError):
+        plan_shards([LOG_FILE], shard_runs=0)
+
+
+def test_cluster_matches_the_campaign(campaign, positions, worker):
+    merged, failures = run_cluster(str(campaign), positions, [worker], shard_runs=10, cache=False)
+    expected, _ = run_campaign(str(campaign), positions, workers=1, cache=False)
+    assert failures == {}
+    assert_same(merged, expected)
+
+
+@pytest.mark.parametrize("reply", ["drop", "silent", "unreachable"])
+def test_shards_of_a_failed_worker_are_retried(campaign, positions, worker, reply):
+    failed = unused_address() if reply == "unreachable" else fake_worker(reply)
+    merged, failures = run_cluster(str(campaign), positions, [failed, worker], shard_runs=10, timeout=1.0,
+                                   cache=False)
+    expected, _ = run_campaign(str(campaign), positions, workers=1, cache=False)
+    assert failures == {}
+    assert_same(merged, expected)
+
+
+def test_shards_are_given_up_without_workers(campaign, positions):
+    merged, failures = run_cluster(str(campaign), positions, [fake_worker("drop")], retries=1, cache=False)
+    assert sorted(failures) == [str(campaign / "a.txt"), str(campaign / "b.txt")]
+    assert len(merged["run"]) == 0
+
+    _, failures = run_cluster(str(campaign), positions, [unused_address()], retries=0, cache=False)
+    assert set(failures.values()) == {"No worker left to reduce this shard"}
+
+
+def test_failed_reduction_fails_only_its_file(campaign, positions, worker):
+    with open(LOG_FILE) as f:
+        header = f.readline() + f.readline()
+    (campaign / "broken.txt").write_text(header + "1 2 3\n")
+    merged, failures = run_cluster(str(campaign), positions, [worker], cache=False)
+    assert list(failures) == [str(campaign / "broken.txt")] and "ValueError" in failures[str(campaign / "broken.txt")]
+    assert set(merged["source"]) == {str(campaign / "a.txt"), str(campaign / "b.txt")}
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from lswt.campaign import reduce_file
+from lswt.compare import align_campaigns, compare_campaigns, load_campaigns
+
+from conftest import LOG_FILE
+
+
+@pytest.fixture(scope="module")
+def result(weights):
+    return reduce_file(LOG_FILE, weights, cache=False)
+
+
+def test_identical_campaigns_do_not_differ(result):
+    aligned = align_campaigns({"a": result, "b": dict(result)})
+    comparison = compare_campaigns(aligned)
+    assert comparison["pairs"]["points"][0] == len(aligned["alpha"])
+    for quantity in aligned["quantities"]:
+        assert comparison["pairs"][f"d{quantity}_max"][0] == 0
+    assert comparison["pairs"]["dcp_max"][0] == 0
+
+
+def test_offset_campaign(result):
+    shifted = dict(result, cl=result["cl"] + 0.1)
+    comparison = compare_campaigns(align_campaigns({"a": result, "b": shifted}))
+    np.testing.assert_allclose(comparison["pairs"]["dcl_mean"], 0.1)
+    np.testing.assert_allclose(comparison["repeatability"]["cl_reproduce_std"], 0.1 / np.sqrt(2))
+
+
+def test_one_campaign_is_rejected(result):
+    with pytest.raises(ValueError, match="At least two campaigns"):
+        align_campaigns({"a": result})
+
+
+def test_repeated_sources_are_rejected(positions):
+    with pytest.raises(ValueError, match="more than once"):
+        load_campaigns([LOG_FILE, LOG_FILE], positions, cache=False)
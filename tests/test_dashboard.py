@@ -0,0 +1,50 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from lswt.data import HEADER_LINES
+from lswt.live import LiveReduction
+
+from conftest import LOG_FILE
+
+pytest.importorskip("matplotlib")
+
+from lswt.dashboard import Dashboard, run_dashboard  # noqa: E402
+
+
+def write_runs(path, runs):
+    with open(LOG_FILE, 'r') as f:
+        lines = f.readlines()
+    with open(path, 'w') as f:
+        f.writelines(lines[:HEADER_LINES + runs])
+
+
+def test_add_and_reset(tmp_path, positions, weights):
+    path = str(tmp_path / "live.txt")
+    write_runs(path, 12)
+    dashboard = Dashboard(positions, headless=True)
+    dashboard.add(LiveReduction(path, weights).update())
+    assert dashboard._length == 12
+    assert dashboard.frame().shape[2] == 4
+
+    dashboard.reset()
+    assert dashboard._length == 0 and not dashboard._fitted
+    assert dashboard.axes["cl"].get_xlim() == (0, 1)
+
+
+def test_truncated_log_starts_a_new_session(tmp_path, data, positions, weights):
+    path = str(tmp_path / "live.txt")
+    write_runs(path, 20)
+
+    def rewrite():
+        time.sleep(0.3)
+        write_runs(path, 5)
+
+    writer = threading.Thread(target=rewrite)
+    writer.start()
+    dashboard = run_dashboard(path, positions, weights, interval=0.02, timeout=0.8, headless=True)
+    writer.join()
+    assert dashboard._length == 5
+    np.testing.assert_array_equal(dashboard._columns["alpha"][:5], data.alpha[:5])
@@ -0,0 +1,129 @@
+import os
+
+import numpy as np
+import pytest
+
+from lswt.data import CACHE_SUFFIX, HEADER_LINES, META_SUFFIX, TunnelLog, load_log, parse_log
+
+from conftest import LOG_FILE, reference_rows
+
+
+def test_parse_matches_the_line_parser(data):
+    rows = reference_rows(LOG_FILE)
+    assert len(data) == len(rows)
+    np.testing.assert_array_equal(data.run, [row[0] for row in rows])
+    np.testing.assert_array_equal(data.alpha, [row[1] for row in rows])
+    np.testing.assert_array_equal(data.rho, [row[2] for row in rows])
+    np.testing.assert_array_equal(data.block("P001", "P049"), [row[3] for row in rows])
+    np.testing.assert_array_equal(data["P110"], [row[4] for row in rows])
+    np.testing.assert_array_equal(data.block("P050", "P096"), [row[5] for row in rows])
+    # 09:30:20 is stored as seconds since midnight
+    assert data["Time"][0] == 9 * 3600 + 30 * 60 + 20
+
+
+def test_sidecar_is_reused(log_file):
+    first = load_log(log_file)
+    assert os.path.exists(log_file + CACHE_SUFFIX) and os.path.exists(log_file + META_SUFFIX)
+    second = load_log(log_file)
+    assert isinstance(second.values.base, np.memmap) or isinstance(second.values, np.memmap)
+    np.testing.assert_array_equal(second.values, first.values)
+    assert second.columns == first.columns
+
+
+def test_touched_log_keeps_its_sidecar(log_file):
+    load_log(log_file)
+    stat = os.stat(log_file)
+    os.utime(log_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    log = load_log(log_file)
+    assert isinstance(log.values.base, np.memmap) or isinstance(log.values, np.memmap)
+
+
+def test_edited_log_is_parsed_again(log_file):
+    load_log(log_file)
+    with open(log_file) as f:
+        lines = f.readlines()
+    # Same size, same modification time: only the content differs
+    stat = os.stat(log_file)
+    lines[HEADER_LINES] = lines[HEADER_LINES].replace("-10.000", "-11.000", 1)
+    with open(log_file, 'w') as f:
+        f.writelines(lines)
+    os.utime(log_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    log = load_log(log_file)
+    assert log.alpha[0] == -11.0
+    np.testing.assert_array_equal(log.values, parse_log(log_file).values)
+
+
+def test_appended_lines_extend_the_sidecar(log_file):
+    with open(log_file) as f:
+        lines = f.readlines()
+    with open(log_file, 'w') as f:
+        f.writelines(lines[:HEADER_LINES + 10])
+    assert len(load_log(log_file)) == 10
+
+    with open(log_file, 'a') as f:
+        f.writelines(lines[HEADER_LINES + 10:])
+    log = load_log(log_file)
+    np.testing.assert_array_equal(log.values, parse_log(log_file).values)
+    assert len(load_log(log_file)) == len(lines) - HEADER_LINES
+
+
+def test_rows_must_match_the_header(tmp_path):
+    path = tmp_path / "short.txt"
+    with open(LOG_FILE) as f:
+        lines = f.readlines()
+    path.write_text("".join(lines[:HEADER_LINES]) + "1 2 3\n")
+    with pytest.raises(ValueError, match="columns"):
+        parse_log(str(path))
+
+
+def shuffled(data, order):
+    return TunnelLog(np.asfortranarray(data.values[order]), data.columns)
+
+
+def test_rows_of_out_of_order_runs(data):
+    order = np.random.default_rng(0).permutation(len(data))
+    log = shuffled(data, order)
+    runs = data.run[[5, 0, 17, 3]]
+    np.testing.assert_array_equal(log.run[log.rows(runs)], runs)
+    np.testing.assert_array_equal(log.values[log.rows(runs)], data.values[data.rows(runs)])
+    assert log.row(data.run[7]) == int(np.flatnonzero(order == 7)[0])
+
+
+def test_appending_out_of_order_runs(data):
+    log = TunnelLog(np.asfortranarray(data.values[10:20]), data.columns)
+    log.append(data.values[:10][::-1])
+    log.append(data.values[20:])
+    assert len(log) == len(data)
+    np.testing.assert_array_equal(log.values[log.rows(data.run)], data.values)
+
+
+def test_repeated_run_numbers_find_the_first_row(data):
+    log = TunnelLog(np.asfortranarray(data.values[:5]), data.columns)
+    log.append(data.values[2:3])
+    assert log.row(data.run[2]) == 2
+
+
+def test_missing_runs(data):
+    with pytest.raises(KeyError, match=r"\[99999\]"):
+        data.rows([data.run[0], 99999])
+    assert data.row(99999) is None
+    with pytest.raises(KeyError):
+        TunnelLog(np.empty((0, len(data.columns)), order='F'), data.columns).rows([1])
+
+
+def test_alpha_groups(data):
+    for alpha, rows in data.alpha_groups.items():
+        np.testing.assert_array_equal(rows, np.flatnonzero(np.round(data.alpha, 2) == alpha))
+    alpha = data.alpha[0]
+    np.testing.assert_array_equal(data.runs_at(alpha), data.run[np.round(data.alpha, 2) == round(alpha, 2)])
+
+
+def test_appended_rows_are_grouped_like_a_whole_log(data):
+    log = TunnelLog(np.asfortranarray(data.values[:7]), data.columns)
+    for start in range(7, len(data), 5):
+        log.append(data.values[start:start + 5])
+    assert sorted(log.alpha_groups) == sorted(data.alpha_groups)
+    for alpha, rows in data.alpha_groups.items():
+        np.testing.assert_array_equal(log.alpha_groups[alpha], rows)
+    np.testing.assert_array_equal(log.sweep_direction, data.sweep_direction)
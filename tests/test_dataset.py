@@ -0,0 +1,60 @@
+import json
+
+import numpy as np
+import pytest
+
+from lswt.campaign import reduce_file
+from lswt.data import TunnelLog
+from lswt.dataset import RECONCILIATION_COLUMNS, Dataset, load_column_map, reconcile_drag
+from lswt.polar import calculate_polar
+from lswt.pressure import calculate_cp_rows
+
+from conftest import LOG_FILE
+
+
+def test_channels_are_views_of_the_log(data):
+    dataset = Dataset(data)
+    np.testing.assert_array_equal(dataset["surface_taps"], data.block("P001", "P049"))
+    np.testing.assert_array_equal(dataset["reference"], data["P110"])
+    assert dataset.columns("rake_static")[0] == "P098" and len(dataset.columns("rake_static")) == 12
+    assert np.shares_memory(dataset["surface_taps"], data.values)
+
+
+def test_reconcile_matches_the_polar_and_wake_paths(data, weights):
+    table = reconcile_drag(Dataset(data), weights)
+    expected = reduce_file(LOG_FILE, weights, cache=False)
+    assert list(table) == RECONCILIATION_COLUMNS
+    np.testing.assert_array_equal(table["cl"], expected["cl"])
+    np.testing.assert_array_equal(table["cd_surface"], expected["cd"])
+    np.testing.assert_array_equal(table["cd_wake"], expected["cd_wake"])
+    np.testing.assert_array_equal(table["cd_difference"], expected["cd_wake"] - expected["cd"])
+
+
+def test_reconcile_uses_the_same_cp_as_the_polar(data, weights):
+    vinf = 21.0
+    rows = data.rows([3, 4, 5])
+    C_p, alpha, _ = calculate_cp_rows(data, rows, vinf=vinf)
+    table = reconcile_drag(Dataset(data), weights, runs=[3, 4, 5], vinf=vinf)
+    np.testing.assert_array_equal(table["cd_surface"], calculate_polar(C_p, alpha, weights)["cd"])
+
+
+def test_column_map_moves_channels(data, weights, tmp_path):
+    # The same log with the reference pressure in a renamed column
+    columns = [name if name != "P110" else "P_ref" for name in data.columns]
+    renamed = TunnelLog(np.array(data.values), columns)
+    path = tmp_path / "map.json"
+    path.write_text(json.dumps({"reference": "P_ref", "rake_static": ["P098", "P109"]}))
+    column_map = load_column_map(str(path))
+    assert column_map["rake_static"] == ("P098", "P109")
+
+    moved = reconcile_drag(Dataset(renamed, column_map), weights)
+    original = reconcile_drag(Dataset(data), weights)
+    for name in RECONCILIATION_COLUMNS:
+        np.testing.assert_array_equal(moved[name], original[name], err_msg=name)
+
+
+def test_unknown_channel_column(data):
+    with pytest.raises(KeyError, match="reference"):
+        Dataset(data, {"reference": "P999"})
+    with pytest.raises(ValueError, match="range"):
+        Dataset(data, {"reference": ("P001", "P002", "P003")})
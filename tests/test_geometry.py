@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from lswt.cache import LRUCache
+from lswt.geometry import AIRFOIL_DATA, AirfoilGeometry, get_slope, process_airfoil
+
+
+def test_tables_match_the_splines():
+    x = np.linspace(0, 160, 50)
+    splines = process_airfoil(AIRFOIL_DATA)
+    geometry = AirfoilGeometry()
+    upper, lower = geometry.surfaces(x)
+    np.testing.assert_array_equal(upper, splines["upper"](x))
+    np.testing.assert_array_equal(lower, splines["lower"](x))
+    upper_slopes, lower_slopes = geometry.slopes(x)
+    np.testing.assert_array_equal(upper_slopes, get_slope(splines, x, "upper"))
+    np.testing.assert_array_equal(lower_slopes, get_slope(splines, x, "lower"))
+
+
+def test_tables_are_shared_and_read_only():
+    geometry = AirfoilGeometry()
+    first = geometry.surfaces(np.linspace(0, 160, 10))
+    assert geometry.surfaces(np.linspace(0, 160, 10))[0] is first[0]
+    with pytest.raises(ValueError):
+        first[0][0] = 1.0
+    with pytest.raises(ValueError):
+        geometry.data[0, 0] = 1.0
+
+
+def test_memos_are_bounded():
+    geometry = AirfoilGeometry(max_tables=4, max_splines=2)
+    for points in range(10, 30):
+        geometry.surfaces(np.linspace(0, 160, points))
+    for scale_factor in (1.0, 1.6, 2.0, 3.0):
+        geometry.slopes(np.linspace(0, 100 * scale_factor, 10), scale_factor)
+    assert len(geometry._tables) == 4
+    assert len(geometry._splines) == 2
+
+
+def test_lru_cache_drops_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert len(cache) == 2 and cache.get("b") is None and cache.get("a") == 1
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from lswt.data import TunnelLog
+from lswt.geometry import AirfoilGeometry
+from lswt.health import (BIASED, CP_LIMIT, DEAD, OUTLIER, SATURATED, flag_summary, masked_polar, masked_wake_drag,
+                         screen_log, screen_taps, screened_reduction)
+from lswt.polar import SCALE_FACTOR, X_DATA, calculate_polar, polar_weights
+from lswt.pressure import calculate_cp_many
+from lswt.wakedrag import STATIC_PROBES, TOTAL_PROBES, ps_positions, pt_positions, wake_drag, wake_drag_runs
+
+TAPS = [f"P{i:03d}" for i in range(1, 50)]
+
+
+@pytest.fixture(scope="module")
+def faulty(data):
+    """The sample log with a blocked, a missing, a clipped, a leaking and a spiking tap."""
+    values = np.array(data.values)
+    column = data.column_index
+    values[:, column("P011")] = 12.3
+    values[4, column("P021")] = np.nan
+    clipped = np.argsort(values[:, column("P031")])[-6:]
+    values[clipped, column("P031")] = values[:, column("P031")].max()
+    values[:, column("P041")] += 300
+    values[7, column("P006")] += 400
+    return TunnelLog(np.asfortranarray(values), data.columns)
+
+
+def test_clean_log_is_not_flagged(data, positions):
+    flags = screen_log(data, positions)
+    assert all(not flags[name].any() for name in ("surface", "rake_total", "rake_static"))
+
+
+def test_faults_set_their_flag_bits(faulty, positions):
+    flags = screen_log(faulty, positions)["surface"]
+    tap = {name: flags[:, i] for i, name in enumerate(TAPS)}
+    assert np.all(tap["P011"] & DEAD)
+    assert np.flatnonzero(tap["P021"] & DEAD).tolist() == [4]
+    assert (tap["P031"] & SATURATED).astype(bool).sum() == 6
+    assert np.all(tap["P041"] & BIASED) and (tap["P041"] & CP_LIMIT).any()
+    assert tap["P006"][7] & OUTLIER and not np.delete(tap["P006"] & OUTLIER, 7).any()
+
+    summary = flag_summary(flags, TAPS)
+    assert summary["P021"] == {"dead": 1}
+    assert set(summary) == {"P006", "P011", "P021", "P031", "P041"}
+
+
+def test_transducer_limits():
+    pressure = np.array([[0.0, 50.0, 100.0], [10.0, 60.0, 99.0], [20.0, 70.0, 50.0]])
+    flags = screen_taps(pressure, pressure / 1000, [0, 1, 2], [0, 1, 2], cp_max=None, limits=(0.0, 100.0))
+    assert (flags & SATURATED).astype(bool).tolist() == [[True, False, True], [False] * 3, [False] * 3]
+
+
+def test_masked_polar_uses_the_weights_of_its_pattern(data, positions, weights):
+    C_p, alpha, _ = calculate_cp_many(data, data.run)
+    full = masked_polar(C_p, alpha, True, positions)
+    plain = calculate_polar(C_p, alpha, weights)
+    for name in ("cl", "cd", "cm", "x_cop"):
+        np.testing.assert_allclose(full[name], plain[name], rtol=1e-12, atol=1e-15, err_msg=name)
+
+    # Tap 10 dropped in every other run, and NaN there
+    mask = np.ones(C_p.shape, dtype=bool)
+    mask[::2, 10] = False
+    C_p = C_p.copy()
+    C_p[::2, 10] = np.nan
+    result = masked_polar(C_p, alpha, mask, positions)
+    slopes = AirfoilGeometry().slopes(X_DATA * (100 * SCALE_FACTOR), SCALE_FACTOR)
+    dropped = calculate_polar(np.nan_to_num(C_p[::2]), alpha[::2], polar_weights(positions, X_DATA, *slopes,
+                                                                                  mask=mask[0]))
+    np.testing.assert_allclose(result["cl"][::2], dropped["cl"], rtol=1e-12)
+    np.testing.assert_allclose(result["cl"][1::2], plain["cl"][1::2], rtol=1e-12)
+    assert result["taps_used"].tolist() == [48, 49] * (len(C_p) // 2) + [48] * (len(C_p) % 2)
+
+
+def test_masked_wake_drag(data):
+    pt, ps, rho = data.block(*TOTAL_PROBES), data.block(*STATIC_PROBES), data.rho
+    full = masked_wake_drag(pt, ps, rho)
+    np.testing.assert_allclose(full["cd"], wake_drag_runs(data)["cd"], rtol=1e-12)
+
+    total_mask = np.ones(pt.shape, dtype=bool)
+    total_mask[:3, 20] = False
+    static_mask = np.ones(ps.shape, dtype=bool)
+    static_mask[1, 4] = False
+    static_mask[5, 1:] = False
+    u_inf = np.linspace(19, 20, len(data))
+    result = masked_wake_drag(pt, ps, rho, total_mask, static_mask, u_inf=u_inf)
+
+    keep = np.arange(pt.shape[1]) != 20
+    expected = wake_drag(pt[:3][:, keep], ps[:3], rho[:3], u_inf=u_inf[:3], pt_pos=pt_positions[keep])
+    np.testing.assert_allclose(result["cd"][[0, 2]], expected["cd"][[0, 2]], rtol=1e-12)
+    assert np.isnan(result["velocity"][:3, 20]).all()
+    keep = np.arange(ps.shape[1]) != 4
+    expected = wake_drag(pt[1:2][:, total_mask[1]], ps[1:2, keep], rho[1:2], u_inf=u_inf[1:2],
+                         pt_pos=pt_positions[total_mask[1]], ps_pos=ps_positions[keep])
+    np.testing.assert_allclose(result["cd"][1], expected["cd"][0], rtol=1e-12)
+    # One static probe left is not enough
+    assert np.isnan(result["cd"][5])
+    np.testing.assert_allclose(result["cd"][6:], wake_drag(pt[6:], ps[6:], rho[6:], u_inf=u_inf[6:])["cd"],
+                               rtol=1e-12)
+
+
+def test_screened_reduction_drops_the_faulty_taps(faulty, data, positions):
+    table, flags = screened_reduction(faulty, positions)
+    assert table["taps_flagged"].min() >= 2
+    clean, _ = screened_reduction(data, positions)
+    assert np.all(clean["taps_flagged"] == 0) and np.all(np.isfinite(table["cl"]))
+    # The faults shift the unscreened lift (the NaN run is lost), the screened lift stays close to the clean one
+    C_p, alpha, _ = calculate_cp_many(faulty, faulty.run)
+    unscreened = masked_polar(C_p, alpha, True, positions)["cl"]
+    assert np.isnan(unscreened[4]) and np.nanmax(np.abs(unscreened - clean["cl"])) > 0.05
+    assert np.abs(table["cl"] - clean["cl"]).max() < 0.01
@@ -0,0 +1,74 @@
+import numpy as np
+
+from lswt.campaign import reduce_file
+from lswt.data import HEADER_LINES
+from lswt.live import LIVE_COLUMNS, LiveReduction, LogFollower
+
+from conftest import LOG_FILE
+
+
+def log_lines():
+    with open(LOG_FILE) as f:
+        return f.readlines()
+
+
+def test_follower_waits_for_the_header_and_complete_lines(tmp_path):
+    lines = log_lines()
+    path = tmp_path / "live.txt"
+    follower = LogFollower(str(path))
+    assert follower.poll() is None
+
+    path.write_text(lines[0])
+    assert follower.poll() is None
+    with open(path, 'a') as f:
+        f.write(lines[1] + lines[2] + lines[3][:20])
+    assert len(follower.poll()) == 1
+    with open(path, 'a') as f:
+        f.write(lines[3][20:])
+    rows = follower.poll()
+    assert len(rows) == 1 and follower.poll().shape == (0, len(follower.columns))
+
+
+def test_follower_starts_over_after_truncation(tmp_path):
+    lines = log_lines()
+    path = tmp_path / "live.txt"
+    path.write_text("".join(lines[:HEADER_LINES + 10]))
+    follower = LogFollower(str(path))
+    assert len(follower.poll()) == 10 and not follower.restarted
+
+    path.write_text("".join(lines[:HEADER_LINES + 3]))
+    rows = follower.poll()
+    assert follower.restarted and len(rows) == 3
+    with open(path, 'a') as f:
+        f.writelines(lines[HEADER_LINES + 3:HEADER_LINES + 5])
+    assert len(follower.poll()) == 2 and not follower.restarted
+
+
+def test_live_reduction_matches_the_whole_log(tmp_path, weights):
+    lines = log_lines()
+    path = tmp_path / "live.txt"
+    path.write_text("".join(lines[:HEADER_LINES]))
+    live = LiveReduction(str(path), weights)
+    assert live.update() is None
+
+    for start in range(HEADER_LINES, len(lines), 7):
+        with open(path, 'a') as f:
+            f.writelines(lines[start:start + 7])
+        assert len(live.update()["run"]) == len(lines[start:start + 7])
+
+    expected = reduce_file(LOG_FILE, weights, cache=False)
+    for name in LIVE_COLUMNS:
+        np.testing.assert_allclose(live.results[name], expected[name], rtol=1e-12, atol=1e-15, err_msg=name)
+
+
+def test_live_reduction_drops_the_old_runs_after_truncation(tmp_path, weights):
+    lines = log_lines()
+    path = tmp_path / "live.txt"
+    path.write_text("".join(lines[:HEADER_LINES + 10]))
+    live = LiveReduction(str(path), weights)
+    live.update()
+
+    path.write_text("".join(lines[:HEADER_LINES + 4]))
+    live.update()
+    assert len(live.data) == 4
+    np.testing.assert_array_equal(live.results["run"], live.data.run)
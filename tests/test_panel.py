@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from lswt.panel import PanelSolver, panel_nodes
+
+
+def test_nodes_close_the_leading_edge():
+    x, y = panel_nodes(panels=200)
+    assert x[0] == x[-1] and y[0] == y[-1]
+    # x falls monotonically to the leading edge and rises again, without a step between the surfaces
+    assert np.all(np.diff(x[:101]) < 0) and np.all(np.diff(x[100:]) > 0)
+    assert np.hypot(np.diff(x), np.diff(y)).max() < 0.05
+
+
+def test_leading_edge_cp_converges():
+    minimum = [PanelSolver(panels=panels).solve([10, 18])["C_p"].min(axis=1) for panels in (400, 800, 1600)]
+    assert np.all(np.abs(minimum[2] / minimum[1] - 1) < 0.01)
+    assert np.all(np.abs(minimum[2] / minimum[1] - 1) < np.abs(minimum[1] / minimum[0] - 1))
+
+
+def test_tap_cp_converges(positions):
+    cp = [PanelSolver(panels=panels).tap_cp([-10, 0, 10], positions)[0] for panels in (800, 1600)]
+    np.testing.assert_allclose(cp[1][:, 1:-1], cp[0][:, 1:-1], atol=0.1)
+
+
+@pytest.mark.parametrize("panels", [2, 401])
+def test_panel_count_must_be_even(panels):
+    with pytest.raises(ValueError, match="even"):
+        panel_nodes(panels=panels)
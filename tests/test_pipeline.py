@@ -0,0 +1,92 @@
+import os
+import shutil
+
+import numpy as np
+
+import lswt.data as data_module
+from lswt.campaign import reduce_file
+from lswt.data import HEADER_LINES
+from lswt.pipeline import CACHE_DIR, Pipeline
+
+from conftest import POSITIONS_FILE
+
+
+def test_pipeline_matches_campaign(log_file, weights):
+    result = Pipeline(log_file, POSITIONS_FILE).run()
+    expected = reduce_file(log_file, weights, cache=False)
+    for name, values in expected.items():
+        np.testing.assert_allclose(result[name], values, rtol=1e-12, atol=1e-15, err_msg=name)
+
+
+def test_unchanged_inputs_are_cached(log_file):
+    Pipeline(log_file, POSITIONS_FILE).run()
+    pipeline = Pipeline(log_file, POSITIONS_FILE)
+    pipeline.run()
+    statuses = {stage: status for stage, status, _, _ in pipeline.report}
+    assert all(statuses[stage] == "cached" for stage in ("cp", "geometry", "weights", "polar", "wake"))
+
+
+def test_cache_keeps_one_result_per_stage(log_file, tmp_path):
+    other = str(tmp_path / "other.txt")
+    shutil.copy(log_file, other)
+    Pipeline(other, POSITIONS_FILE).run()
+    cache = tmp_path / CACHE_DIR
+
+    counts = []
+    for vinf in (19.0, 19.5, 20.0):
+        Pipeline(log_file, POSITIONS_FILE, vinf=vinf).run()
+        counts.append(len(os.listdir(cache)))
+    # cp, polar and wake of both logs, and the shared geometry and weights (.npz + .json each)
+    assert counts == [16, 16, 16]
+    Pipeline(other, POSITIONS_FILE).run()
+    assert len(os.listdir(cache)) == 16
+
+
+def split_log(log_file, rows):
+    """Keep the first `rows` runs in the log and return the lines of the others."""
+    with open(log_file) as f:
+        lines = f.readlines()
+    with open(log_file, 'w') as f:
+        f.writelines(lines[:HEADER_LINES + rows])
+    return lines[HEADER_LINES + rows:]
+
+
+def test_appended_runs_extend_the_cached_results(log_file, weights):
+    rest = split_log(log_file, 20)
+    Pipeline(log_file, POSITIONS_FILE).run()
+    with open(log_file, 'a') as f:
+        f.writelines(rest)
+
+    pipeline = Pipeline(log_file, POSITIONS_FILE)
+    result = pipeline.run()
+    report = {stage: (status, rows) for stage, status, rows, _ in pipeline.report}
+    assert all(report[stage] == ("extended", len(rest)) for stage in ("cp", "polar", "wake"))
+    expected = reduce_file(log_file, weights, cache=False)
+    for name, values in expected.items():
+        np.testing.assert_allclose(result[name], values, rtol=1e-12, atol=1e-15, err_msg=name)
+
+
+def test_edited_runs_are_reduced_again(log_file):
+    Pipeline(log_file, POSITIONS_FILE).run()
+    with open(log_file) as f:
+        lines = f.readlines()
+    # Same length, different pressure: only the content hash can tell
+    lines[HEADER_LINES] = lines[HEADER_LINES].replace("1", "2", 1)
+    with open(log_file, 'w') as f:
+        f.writelines(lines)
+
+    pipeline = Pipeline(log_file, POSITIONS_FILE)
+    pipeline.run()
+    statuses = {stage: status for stage, status, _, _ in pipeline.report}
+    assert all(statuses[stage] == "computed" for stage in ("cp", "polar", "wake"))
+
+
+def test_unchanged_log_is_not_hashed_again(log_file, monkeypatch):
+    Pipeline(log_file, POSITIONS_FILE).run()
+    hashed = []
+    file_hash = data_module._file_hash
+    monkeypatch.setattr(data_module, "_file_hash", lambda *args: hashed.append(args) or file_hash(*args))
+    pipeline = Pipeline(log_file, POSITIONS_FILE)
+    pipeline.run()
+    assert {status for stage, status, _, _ in pipeline.report if stage in ("cp", "polar", "wake")} == {"cached"}
+    assert hashed == []
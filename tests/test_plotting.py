@@ -0,0 +1,28 @@
+import os
+
+import pytest
+
+from lswt.plotting import plot_cp_profile, plot_polar, plot_wake_drag
+from lswt.polar import reduce_polar
+from lswt.pressure import calculate_cp_many
+
+matplotlib = pytest.importorskip("matplotlib")
+
+
+def test_saved_plots_leave_the_backend_alone(data, positions, weights, tmp_path):
+    import matplotlib.pyplot as plt
+
+    C_p, alpha, _ = calculate_cp_many(data, data.run[:1])
+    polar = reduce_polar(data, weights)
+    backend = matplotlib.get_backend()
+    matplotlib.use("svg")
+    try:
+        plot_cp_profile(positions, C_p[0], alpha[0], file_name=str(tmp_path / "cp.pdf"))
+        plot_polar(polar, directory=str(tmp_path))
+        plot_wake_drag(polar["alpha"], polar["cd"], file_name=str(tmp_path / "wake_rake.pdf"))
+        assert matplotlib.get_backend() == "svg"
+        assert plt.get_fignums() == []
+    finally:
+        matplotlib.use(backend)
+    assert sorted(os.listdir(tmp_path)) == ["Cl_vs_Alpha.pdf", "Cl_vs_Cd.pdf", "Cm_vs_AoA.pdf", "XCoP_vs_Alpha.pdf",
+                                            "cp.pdf", "wake_rake.pdf"]
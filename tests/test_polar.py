@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from scipy.integrate import cumulative_trapezoid
+
+from lswt.geometry import AirfoilGeometry
+from lswt.polar import X_DATA, calculate_polar, default_weights, row_dot, split_surfaces
+from lswt.pressure import calculate_cp_many
+
+
+def loop_polar(C_p, alpha, positions):
+    """The per-alpha interpolation and integration loop of the original aerodynamic.py."""
+    upper_slopes, lower_slopes = AirfoilGeometry().slopes(X_DATA * 160)
+    positions = np.asarray(positions) / 100
+    upper, lower = split_surfaces(positions)
+    rows = []
+    for cp, a in zip(C_p, alpha):
+        cpu = np.interp(X_DATA, positions[upper], cp[upper])
+        cpl = np.interp(X_DATA, positions[lower], cp[lower])
+        cn = cumulative_trapezoid(cpl - cpu, X_DATA, initial=0)[-1]
+        cm = cumulative_trapezoid((cpu - cpl) * X_DATA, X_DATA, initial=0)[-1]
+        ca = cumulative_trapezoid(cpu * upper_slopes - cpl * lower_slopes, X_DATA, initial=0)[-1]
+        a = np.radians(a)
+        rows.append((cn * np.cos(a) - ca * np.sin(a), ca * np.cos(a) + cn * np.sin(a), cm, cm / cn * 0.16))
+    return dict(zip(("cl", "cd", "cm", "x_cop"), np.array(rows).T))
+
+
+def test_batched_polar_matches_loop(data, positions, weights):
+    C_p, alpha, _ = calculate_cp_many(data, data.run)
+    polar = calculate_polar(C_p, alpha, weights)
+    expected = loop_polar(C_p, alpha, positions)
+    for name, values in expected.items():
+        np.testing.assert_allclose(polar[name], values, rtol=0, atol=1e-12, err_msg=name)
+
+
+def test_row_dot_matches_matmul():
+    rng = np.random.default_rng(0)
+    a = rng.normal(size=(50, 49))
+    w = rng.normal(size=(49, 3))
+    np.testing.assert_allclose(row_dot(a, w), a @ w, rtol=1e-12)
+    np.testing.assert_allclose(row_dot(a, w[:, 0]), a @ w[:, 0], rtol=1e-12)
+
+
+def test_row_dot_does_not_depend_on_the_other_rows():
+    rng = np.random.default_rng(1)
+    a = rng.normal(size=(1000, 49))
+    w = rng.normal(size=(49, 3))
+    whole = row_dot(a, w)
+    for start, stop in ((0, 1), (3, 10), (500, 1000)):
+        np.testing.assert_array_equal(row_dot(a[start:stop], w), whole[start:stop])
+
+
+def test_row_dot_rejects_mismatched_weights():
+    with pytest.raises(ValueError, match="49 values per row but 50 weights"):
+        row_dot(np.ones((2, 49)), np.ones((50, 3)))
+
+
+@pytest.mark.parametrize("extra", [1, -1])
+def test_polar_rejects_wrong_number_of_positions(data, positions, extra):
+    positions = list(positions) + [99.0] if extra > 0 else list(positions)[:-1]
+    C_p, alpha, _ = calculate_cp_many(data, data.run[:3])
+    with pytest.raises(ValueError, match="Shape mismatch"):
+        calculate_polar(C_p, alpha, default_weights(positions))
+
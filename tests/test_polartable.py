@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from lswt.campaign import reduce_file
+from lswt.polartable import TABLE_DTYPE, PolarTable
+
+from conftest import LOG_FILE
+
+
+@pytest.fixture(scope="module")
+def table(weights):
+    return PolarTable.from_result(reduce_file(LOG_FILE, weights, cache=False))
+
+
+def test_table_round_trip(table, tmp_path):
+    path = str(tmp_path / "polar.tab")
+    table.save(path)
+    loaded = PolarTable.load(path)
+
+    assert loaded.step == table.step
+    assert loaded.branches == table.branches
+    assert loaded.measured == table.measured
+    for branch in table.branches:
+        np.testing.assert_array_equal(loaded.tables[branch], table.tables[branch].astype(TABLE_DTYPE))
+    alpha = np.linspace(-180, 180, 1001)
+    for name, values in table.lookup(alpha).items():
+        np.testing.assert_allclose(loaded.lookup(alpha)[name], values, atol=1e-6, err_msg=name)
+
+
+def test_table_has_sweep_branches(table):
+    assert table.branches[0] == "all"
+    assert set(table.branches) <= {"all", "up", "down"}
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "other.tab"
+    path.write_bytes(b"not a polar table")
+    with pytest.raises(ValueError, match="not a polar table"):
+        PolarTable.load(str(path))
+
+
+def test_step_must_divide_360():
+    with pytest.raises(ValueError, match="divide 360"):
+        PolarTable({}, step=0.7)
+
+
+def test_lookup_interpolates_and_wraps():
+    table = PolarTable.from_polar(np.array([-5.0, 0.0, 5.0]), np.array([-0.5, 0.0, 0.5]), np.full(3, 0.01), np.zeros(3),
+                                  method="linear")
+    np.testing.assert_allclose(table.lookup([-2.5, 2.5])["cl"], [-0.25, 0.25])
+    for name, values in table.lookup(2.5 + 360).items():
+        np.testing.assert_allclose(values, table.lookup(2.5)[name])
+
+
+def test_lookup_of_non_finite_alphas_is_nan(table):
+    result = table.lookup(np.array([0.0, np.nan, np.inf, 5.0]))
+    expected = table.lookup(np.array([0.0, 5.0]))
+    for name, values in result.items():
+        assert np.isnan(values[1:3]).all()
+        np.testing.assert_array_equal(values[[0, 3]], expected[name])
+    assert np.isnan(table.lookup(np.nan)["cl"])
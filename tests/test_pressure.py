@@ -0,0 +1,27 @@
+import numpy as np
+
+from lswt.pressure import Vinf, calculate_cp, calculate_cp_many
+
+from conftest import LOG_FILE, reference_rows
+
+
+def test_batch_cp_matches_the_per_run_formula(data):
+    C_p, alpha, C_pt_wake = calculate_cp_many(data, data.run)
+    for i, (run, a, rho, pressures, p097, wake_pressures) in enumerate(reference_rows(LOG_FILE)):
+        q = 0.5 * rho * (Vinf**2)
+        np.testing.assert_allclose(C_p[i], [(p - p097) / q for p in pressures], rtol=1e-14)
+        np.testing.assert_allclose(C_pt_wake[i], [(p - p097) / q for p in wake_pressures], rtol=1e-14)
+        assert alpha[i] == a
+
+
+def test_runs_are_returned_in_the_order_asked(data):
+    runs = data.run[[4, 1, 9]]
+    C_p, alpha, _ = calculate_cp_many(data, runs)
+    for i, run in enumerate(runs):
+        single = calculate_cp(data, run)
+        np.testing.assert_array_equal(C_p[i], single[0])
+        assert alpha[i] == single[1]
+
+
+def test_missing_run(data):
+    assert calculate_cp(data, 99999) == (None, None, None)
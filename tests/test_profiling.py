@@ -0,0 +1,77 @@
+import csv
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from lswt import profiling
+from lswt.campaign import reduce_file
+from lswt.profiling import PROFILE_COLUMNS, PROFILE_ENV, instrumented, stage
+
+from conftest import LOG_FILE, ROOT
+
+
+@pytest.fixture
+def profiler():
+    yield profiling.enable(memory=True)
+    profiling.disable()
+
+
+def test_disabled_stages_record_nothing():
+    assert profiling.active() is None
+    with stage("nothing", rows=3) as s:
+        s.rows = 5
+        assert s.rows is None
+
+
+def test_reduction_stages(profiler, weights, data):
+    reduce_file(LOG_FILE, weights, cache=False)
+    stats = profiler.stats
+    assert stats["data.parse_log"]["rows"] == len(data)
+    assert stats["pressure.calculate_cp_rows"]["calls"] == 1
+    assert stats["pressure.calculate_cp_rows"]["rows"] == len(data)
+    assert stats["wakedrag.wake_drag"]["rows"] == len(data)
+
+
+def test_nested_stages_and_memory(profiler):
+    @instrumented("outer", rows=len)
+    def outer():
+        with stage("inner") as s:
+            block = np.ones(2**20)
+            s.rows = 7
+        return [block]
+
+    outer()
+    outer()
+    assert profiler.stats["outer"]["calls"] == 2 and profiler.stats["outer"]["rows"] == 2
+    assert profiler.stats["inner"]["rows"] == 14
+    # The inner allocation counts towards both stages
+    assert profiler.stats["inner"]["peak_bytes"] >= 8 * 2**20
+    assert profiler.stats["outer"]["peak_bytes"] >= 8 * 2**20
+    assert set(profiler.stacks) == {"outer", "outer;inner"}
+    assert profiler.stats["outer"]["wall_s"] >= profiler.stacks["outer;inner"]
+
+
+def test_write(profiler, tmp_path):
+    with stage("a", rows=1):
+        pass
+    path = str(tmp_path / "profile.json")
+    profiler.write(path)
+    with open(path) as f:
+        assert [entry["stage"] for entry in json.load(f)["stages"]] == ["a"]
+    with open(tmp_path / "profile.csv") as f:
+        assert next(csv.reader(f)) == PROFILE_COLUMNS
+    assert (tmp_path / "profile.folded").read_text().startswith("a ")
+
+
+def test_environment_profiles_a_script(tmp_path):
+    path = str(tmp_path / "profile.json")
+    script = f"from lswt.data import load_log; load_log({LOG_FILE!r}, cache=False)"
+    env = {key: value for key, value in os.environ.items() if not key.startswith(PROFILE_ENV)}
+    env[PROFILE_ENV] = path
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, check=True)
+    with open(path) as f:
+        assert "data.parse_log" in [entry["stage"] for entry in json.load(f)["stages"]]
@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from lswt.polar import reduce_polar
+from lswt.render import MANIFEST_FILE, cp_jobs, polar_jobs, render
+
+matplotlib = pytest.importorskip("matplotlib")
+
+
+@pytest.fixture
+def jobs(data, positions, weights):
+    return cp_jobs(data, positions, runs=data.run[:3]) + polar_jobs(reduce_polar(data, weights))
+
+
+def test_render_leaves_the_backend_alone(jobs, tmp_path):
+    import matplotlib.pyplot as plt
+
+    backend = matplotlib.get_backend()
+    matplotlib.use("svg")
+    try:
+        result = render(jobs, str(tmp_path), workers=1)
+        assert matplotlib.get_backend() == "svg"
+        assert plt.get_fignums() == []
+    finally:
+        matplotlib.use(backend)
+    assert result["failed"] == {}
+    assert sorted(result["rendered"]) == sorted(job["file_name"] for job in jobs)
+
+
+def test_unchanged_plots_are_skipped(jobs, tmp_path):
+    out_dir = str(tmp_path)
+    render(jobs, out_dir, workers=1)
+    assert os.path.exists(os.path.join(out_dir, MANIFEST_FILE))
+
+    result = render(jobs, out_dir, workers=1)
+    assert result["rendered"] == [] and len(result["skipped"]) == len(jobs)
+
+    # A changed job and a deleted output are rendered again
+    jobs[0]["data"]["C_p_upper"] = jobs[0]["data"]["C_p_upper"] + 0.1
+    os.remove(os.path.join(out_dir, jobs[-1]["file_name"]))
+    result = render(jobs, out_dir, workers=1)
+    assert sorted(result["rendered"]) == sorted([jobs[0]["file_name"], jobs[-1]["file_name"]])
+
+    assert len(render(jobs, out_dir, workers=1, force=True)["rendered"]) == len(jobs)
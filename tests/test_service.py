@@ -0,0 +1,55 @@
+import json
+
+import numpy as np
+import pytest
+
+from lswt.service import QueryService
+from lswt.store import PolarStore
+
+
+@pytest.fixture
+def service(tmp_path):
+    store = PolarStore(str(tmp_path))
+    alpha = np.array([-2.0, 0.0, 2.0, 4.0])
+    store.write("entry", {"run": np.arange(1, 5), "alpha": alpha, "cl": 0.1 * alpha,
+                          "C_p": np.outer(alpha, [1.0, -1.0])}, positions=[0.0, 100.0])
+    return QueryService(store)
+
+
+def answer(service, target):
+    status, body = service.query(target)
+    return status, json.loads(body)
+
+
+def test_campaigns_and_polar(service):
+    assert answer(service, "/campaigns") == (200, {"campaigns": ["entry"]})
+    status, polar = answer(service, "/polar?campaign=entry&alpha_min=0&alpha_max=2")
+    assert status == 200 and polar["alpha"] == [0.0, 2.0] and polar["cl"] == [0.0, 0.2]
+
+
+def test_cp(service):
+    status, cp = answer(service, "/cp?campaign=entry&run=4")
+    assert status == 200 and cp["C_p"] == [[4.0, -4.0]] and cp["positions"] == [0.0, 100.0]
+
+
+@pytest.mark.parametrize("run", ["inf", "-inf", "nan", "1.5", "x"])
+def test_cp_rejects_non_integer_runs(service, run):
+    status, body = answer(service, f"/cp?campaign=entry&run={run}")
+    assert status == 400 and "error" in body
+
+
+@pytest.mark.parametrize("target, status", [
+    ("/cp?campaign=entry&run=99", 404),
+    ("/cp?campaign=missing&run=1", 404),
+    ("/polar", 400),
+    ("/unknown?campaign=entry", 404),
+])
+def test_errors(service, target, status):
+    assert answer(service, target)[0] == status
+
+
+def test_rewritten_campaign_is_reloaded(service):
+    answer(service, "/polar?campaign=entry")
+    service.store.write("entry", {"run": np.arange(1, 3), "alpha": np.array([0.0, 1.0])})
+    assert answer(service, "/polar?campaign=entry")[1]["alpha"] == [0.0, 1.0]
+
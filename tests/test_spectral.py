@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from scipy import signal
+
+from lswt.spectral import SPECTRAL_COLUMNS, dominant_frequency, spectral_table, strouhal, welch
+
+from conftest import write_series
+
+
+@pytest.fixture
+def series(data, tmp_path):
+    return write_series(str(tmp_path / "series"), data, data.run[:2], samples=6000, frequency=40.0)
+
+
+@pytest.mark.parametrize("nperseg, overlap", [(256, 0.5), (500, 0.25)])
+def test_welch_matches_scipy(series, nperseg, overlap):
+    run = series.runs[0]
+    samples = np.asarray(series.samples(run), dtype=float)
+    noverlap = nperseg - int(round(nperseg * (1 - overlap)))
+    result = welch(series, run, nperseg=nperseg, overlap=overlap, ports=("P001", "P049"), reference="P110")
+
+    frequency, psd = signal.welch(samples[:, :49], series.rate, nperseg=nperseg, noverlap=noverlap, axis=0)
+    np.testing.assert_allclose(result["frequency"], frequency)
+    np.testing.assert_allclose(result["psd"], psd, rtol=1e-9)
+
+    ref = samples[:, series.ports.index("P110")][:, None]
+    _, csd = signal.csd(ref, samples[:, :49], series.rate, nperseg=nperseg, noverlap=noverlap, axis=0)
+    np.testing.assert_allclose(result["csd"], csd, rtol=1e-9, atol=1e-12)
+    _, coherence = signal.coherence(ref, samples[:, :49], series.rate, nperseg=nperseg, noverlap=noverlap, axis=0)
+    np.testing.assert_allclose(result["coherence"], coherence, rtol=1e-9)
+
+
+def test_blocks_do_not_change_the_spectrum(series):
+    run = series.runs[1]
+    whole = welch(series, run, nperseg=256, ports=["P003", "P010"])
+    blocked = welch(series, run, nperseg=256, ports=["P003", "P010"], chunk_bytes=1)
+    np.testing.assert_allclose(blocked["psd"], whole["psd"], rtol=1e-12)
+    assert blocked["ports"] == ["P003", "P010"]
+
+
+def test_run_shorter_than_a_segment(series):
+    with pytest.raises(ValueError, match="fewer than one segment"):
+        welch(series, series.runs[0], nperseg=10000)
+
+
+def test_dominant_frequency_of_the_table(series, weights):
+    table = spectral_table(series, weights, nperseg=1000)
+    assert set(SPECTRAL_COLUMNS) <= set(table)
+    np.testing.assert_allclose(table["f_dominant"], 40.0)
+    np.testing.assert_allclose(table["strouhal"], strouhal(40.0))
+
+
+def test_dominant_frequency_ignores_drift():
+    frequency = np.arange(10.0)
+    psd = np.array([100, 1, 1, 5, 1, 1, 1, 1, 1, 1], dtype=float)[:, None]
+    assert dominant_frequency(frequency, psd, min_frequency=1.0) == (3.0, 5.0)
@@ -0,0 +1,65 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from lswt.store import CURRENT_FILE, PolarStore
+
+
+def result(runs):
+    alpha = np.linspace(5, -5, runs)
+    return {"run": np.arange(1, runs + 1), "alpha": alpha, "cl": 0.1 * alpha}
+
+
+def test_write_and_load(tmp_path):
+    store = PolarStore(str(tmp_path))
+    store.write("entry_1", result(11), positions=[0.0, 50.0])
+    campaign = store.load("entry_1")
+
+    assert store.campaigns() == ["entry_1"]
+    assert len(campaign) == 11 and campaign.positions == [0.0, 50.0]
+    assert np.all(np.diff(campaign.columns["alpha"]) >= 0)
+    np.testing.assert_array_equal(campaign.rows(1), [10])
+    assert campaign.polar(-1, 1)["alpha"].tolist() == [-1.0, 0.0, 1.0]
+
+
+def test_missing_campaign(tmp_path):
+    with pytest.raises(KeyError):
+        PolarStore(str(tmp_path)).load("missing")
+
+
+def test_rewrite_keeps_two_versions(tmp_path):
+    store = PolarStore(str(tmp_path))
+    tokens = set()
+    for runs in range(3, 8):
+        store.write("entry", result(runs))
+        tokens.add(store.token("entry"))
+    assert len(store.load("entry")) == 7
+    assert len(tokens) == 5
+    assert sorted(os.listdir(tmp_path / "entry"))[0] == CURRENT_FILE
+    assert len(os.listdir(tmp_path / "entry")) == 3
+
+
+def test_readers_never_miss_a_rewritten_campaign(tmp_path):
+    store = PolarStore(str(tmp_path))
+    store.write("entry", result(5))
+    errors = []
+    done = threading.Event()
+
+    def read():
+        while not done.is_set():
+            try:
+                store.load("entry", mmap=False)
+            except Exception as error:
+                errors.append(error)
+
+    readers = [threading.Thread(target=read) for _ in range(3)]
+    for reader in readers:
+        reader.start()
+    for runs in range(5, 105):
+        store.write("entry", result(runs))
+    done.set()
+    for reader in readers:
+        reader.join()
+    assert errors == []
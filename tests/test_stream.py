@@ -0,0 +1,29 @@
+import pytest
+
+from lswt.campaign import reduce_file
+from lswt.stream import iter_log, reduce_log_chunked
+
+from conftest import LOG_FILE, assert_same
+
+
+@pytest.fixture(scope="module")
+def in_memory(weights):
+    result = reduce_file(LOG_FILE, weights, cache=False)
+    del result["C_p"]
+    return result
+
+
+@pytest.mark.parametrize("chunk_runs", [1, 7, 60, 10000])
+def test_chunked_equals_in_memory(weights, in_memory, chunk_runs):
+    assert_same(reduce_log_chunked(LOG_FILE, weights, chunk_runs=chunk_runs), in_memory)
+
+
+def test_iter_log_blocks(data):
+    blocks = list(iter_log(LOG_FILE, chunk_runs=7))
+    assert [len(block) for block in blocks[:-1]] == [7] * (len(blocks) - 1)
+    assert sum(len(block) for block in blocks) == len(data)
+
+
+def test_iter_log_rejects_empty_chunks():
+    with pytest.raises(ValueError):
+        next(iter_log(LOG_FILE, chunk_runs=0))
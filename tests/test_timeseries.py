@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from lswt.data import parse_log
+from lswt.polar import reduce_polar
+from lswt.timeseries import PERCENTILES, TimeSeries
+
+from conftest import write_series
+
+
+@pytest.fixture
+def series(data, tmp_path):
+    return write_series(str(tmp_path / "series"), data, data.run[:3])
+
+
+def test_runs_are_stored_as_memory_maps(series, data):
+    reopened = TimeSeries(series.directory)
+    assert reopened.runs == data.run[:3].tolist()
+    assert reopened.rate == series.rate and reopened.columns == data.columns
+    samples = reopened.samples(data.run[0])
+    assert isinstance(samples, np.memmap) and samples.shape == (5000, len(reopened.ports))
+    with pytest.raises(KeyError):
+        reopened.samples(99999)
+
+
+@pytest.mark.parametrize("chunk_samples", [333, 100000])
+def test_chunked_statistics_match_numpy(series, chunk_samples):
+    run = series.runs[1]
+    samples = np.asarray(series.samples(run), dtype=float)
+    stats = series.run_statistics(run, chunk_samples=chunk_samples)
+    np.testing.assert_allclose(stats["mean"], samples.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(stats["std"], samples.std(axis=0), rtol=1e-9)
+    np.testing.assert_allclose(stats["rms"], np.sqrt((samples**2).mean(axis=0)), rtol=1e-12)
+    np.testing.assert_array_equal(stats["min"], samples.min(axis=0))
+    np.testing.assert_array_equal(stats["max"], samples.max(axis=0))
+
+    # Within one histogram bin of the exact percentiles
+    expected = np.percentile(samples, PERCENTILES, axis=0, method="inverted_cdf")
+    width = (stats["max"] - stats["min"]) / 4096
+    assert np.all(np.abs(stats["percentiles"] - expected) <= width * 1.001)
+
+
+def test_averaged_log_reduces_like_a_raw_log(series, weights, tmp_path):
+    averaged = series.averaged_log()
+    np.testing.assert_array_equal(averaged.run, series.runs)
+    means = series.statistics()["mean"]
+    np.testing.assert_array_equal(averaged.block("P001", "P049"), means[:, :49])
+    assert np.all(np.isfinite(reduce_polar(averaged, weights)["cl"]))
+
+    path = str(tmp_path / "averaged.txt")
+    series.write_averaged_log(path)
+    written = parse_log(path)
+    assert written.columns == averaged.columns
+    np.testing.assert_allclose(written.values, averaged.values, atol=0.0051)
+
+
+def test_write_run_checks_its_input(series):
+    with pytest.raises(ValueError, match="missing the scalar columns"):
+        series.write_run(1000, np.zeros((10, len(series.ports))), {})
+    with pytest.raises(ValueError, match="ports"):
+        series.write_run(1000, np.zeros((10, 3)), series.index["runs"][str(series.runs[0])]["scalars"])
+
+
+def test_new_series_needs_columns_and_rate(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        TimeSeries(str(tmp_path))
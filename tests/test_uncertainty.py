@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from lswt.pressure import Vinf
+from lswt.uncertainty import DEFAULT_SIGMA, UNCERTAINTY_COLUMNS, polar_uncertainty
+
+NO_NOISE = {name: 0.0 for name in DEFAULT_SIGMA}
+
+
+def test_zero_sigma_collapses_to_the_nominal_values(data, positions):
+    runs = data.run[:5]
+    result = polar_uncertainty(data, positions, runs=runs, samples=50, sigma=NO_NOISE, seed=0)
+    for name in UNCERTAINTY_COLUMNS:
+        np.testing.assert_allclose(result[name + "_std"], 0, atol=1e-15, err_msg=name)
+        np.testing.assert_allclose(result[name + "_low"], result[name], rtol=1e-12, atol=1e-15, err_msg=name)
+        np.testing.assert_allclose(result[name + "_high"], result[name], rtol=1e-12, atol=1e-15, err_msg=name)
+
+
+def test_tap_noise_matches_linear_propagation(data, positions, weights):
+    runs = data.run[:4]
+    sigma = dict(NO_NOISE, taps=2.0)
+    result = polar_uncertainty(data, positions, runs=runs, samples=4000, sigma=sigma, seed=1)
+
+    # Cl is linear in the tap pressures: std = sigma / q * |w_n cos(alpha) - w_a sin(alpha)|
+    rows = data.rows(runs)
+    q = 0.5 * data.rho[rows] * Vinf**2
+    alpha = np.radians(data.alpha[rows])
+    w_cl = weights[:, 0][None, :] * np.cos(alpha)[:, None] - weights[:, 1][None, :] * np.sin(alpha)[:, None]
+    expected = sigma["taps"] / q * np.linalg.norm(w_cl, axis=1)
+    np.testing.assert_allclose(result["cl_std"], expected, rtol=0.05)
+    np.testing.assert_allclose(result["cd_wake_std"], 0, atol=1e-15)
+
+
+def test_seed_makes_the_intervals_reproducible(data, positions):
+    first = polar_uncertainty(data, positions, runs=data.run[:3], samples=200, seed=7, weight_draws=4)
+    second = polar_uncertainty(data, positions, runs=data.run[:3], samples=200, seed=7, weight_draws=4)
+    for name in first:
+        np.testing.assert_array_equal(first[name], second[name], err_msg=name)
+    for name in UNCERTAINTY_COLUMNS:
+        assert np.all(first[name + "_low"] <= first[name + "_high"])
+
+
+def test_small_chunks_cover_every_run(data, positions):
+    result = polar_uncertainty(data, positions, runs=data.run[:7], samples=100, seed=2, weight_draws=4,
+                               chunk_bytes=1)
+    for name in UNCERTAINTY_COLUMNS:
+        assert np.all(np.isfinite(result[name + "_std"])) and np.all(result[name + "_std"] > 0), name
+
+
+def test_unknown_input(data, positions):
+    with pytest.raises(ValueError, match="Unknown uncertainty inputs"):
+        polar_uncertainty(data, positions, sigma={"tap": 1.0})
@@ -0,0 +1,52 @@
+import numpy as np
+from scipy.integrate import trapezoid
+
+from lswt.polar import CHORD
+from lswt.wakedrag import STATIC_PROBES, TOTAL_PROBES, ps_positions, pt_positions, wake_drag, wake_drag_runs
+
+
+def loop_wake_drag(pt, ps, rho, u_inf=None, p_inf=None):
+    """One run at a time with np.interp and trapezoid, like the original wake drag script."""
+    rows = []
+    for pt_run, ps_run, rho_run in zip(pt, ps, rho):
+        ps_rake = np.interp(pt_positions, ps_positions, ps_run)
+        velocity = np.sqrt(np.maximum(2 * (pt_run - ps_rake) / rho_run, 0))
+        u = 0.5 * (velocity[0] + velocity[-1]) if u_inf is None else u_inf
+        p = 0.5 * (ps_run[0] + ps_run[-1]) if p_inf is None else p_inf
+        momentum = rho_run * trapezoid((u - velocity) * velocity, x=pt_positions)
+        pressure = trapezoid(p - ps_rake, x=pt_positions)
+        q_c = 0.5 * rho_run * u**2 * CHORD
+        rows.append(((momentum + pressure) / q_c, momentum / q_c, pressure / q_c))
+    return dict(zip(("cd", "cd_momentum", "cd_pressure"), np.array(rows).T))
+
+
+def test_batched_wake_drag_matches_loop(data):
+    pt, ps = data.block(*TOTAL_PROBES), data.block(*STATIC_PROBES)
+    result = wake_drag_runs(data)
+    for name, values in loop_wake_drag(pt, ps, data.rho).items():
+        np.testing.assert_allclose(result[name], values, rtol=1e-10, atol=1e-14, err_msg=name)
+
+
+def test_fixed_freestream_matches_loop(data):
+    pt, ps = data.block(*TOTAL_PROBES), data.block(*STATIC_PROBES)
+    rho = np.full(len(data), 1.21)
+    result = wake_drag(pt, ps, rho, u_inf=19.5, p_inf=250.0)
+    for name, values in loop_wake_drag(pt, ps, rho, u_inf=19.5, p_inf=250.0).items():
+        np.testing.assert_allclose(result[name], values, rtol=1e-10, atol=1e-14, err_msg=name)
+
+
+def test_subset_of_runs(data):
+    runs = data.run[[8, 2, 30]]
+    subset = wake_drag_runs(data, runs)
+    whole = wake_drag_runs(data)
+    rows = data.rows(runs)
+    for name in ("cd", "cd_momentum", "cd_pressure", "alpha"):
+        np.testing.assert_array_equal(subset[name], whole[name][rows], err_msg=name)
+
+
+def test_reversed_probes_have_no_velocity(data):
+    pt, ps = data.block(*TOTAL_PROBES)[:2].copy(), data.block(*STATIC_PROBES)[:2]
+    pt[:, 5] = -1e4
+    result = wake_drag(pt, ps, data.rho[:2])
+    assert np.all(result["velocity"][:, 5] == 0)
+    assert np.isfinite(result["cd"]).all()
@@ -1,11 +1,11 @@
-import math
-import matplotlib.pyplot as plt
 import numpy as np
-from scipy.integrate import cumulative_trapezoid
+from lswt.dataset import Dataset
 
 # Path to the data file
 FILE_PATH = "raw_raw_2D_retest2.txt"
 POSITIONS_FILE = "wake rake locations.txt"  # New text file with x positions
+# Rake total probe outside the wake, used as the freestream total pressure
+COLUMN_MAP = {"freestream_total": "P090"}
 
 Vinf = 19.515  # Freestream velocity (m/s)
 x_data = np.linspace(0, 1, 100)
@@ -17,25 +17,8 @@ ps_positions = np.array([43.5, 55.5, 67.5, 79.5, 91.5, 103.5, 115.5, 127.5, 139.
 
 
 def load_data(file_path):
-    """Load the data from the text file and parse it into lists."""
-    with open(file_path, 'r') as f:
-        lines = f.readlines()
-    
-    # Skip the header (first two lines) and read data
-    data_lines = lines[2:]
-    data = []
-
-    for line in data_lines:
-        # Split the line by whitespace and convert to appropriate types
-        parts = line.split()
-        run_nr = int(parts[0])
-        alpha = float(parts[2])
-        rho = float(parts[7])
-        Pinf = float(parts[97])
-        pressures = [float(p) for p in parts[57:104]]
-        static_pressures = [float(p) for p in parts[105:117]]
-        data.append((run_nr, alpha, rho, Pinf, pressures, static_pressures))
-    return data
+    """Load the data from the text file into a Dataset with named channels."""
+    return Dataset.load(file_path, COLUMN_MAP)
 
 def load_positions(file_path):
     """Load wake positions from the text file."""
@@ -49,30 +32,27 @@ def load_positions(file_path):
 
 def calculate_velocity(data, selected_run_nr):
     """Calculate the wake velocity profile for a specific run number."""
-    for run_nr, alpha, rho, Pinf, pressures, static_pressures in data:
-        if run_nr == selected_run_nr:
-            print(static_pressures)
-            # print(pressures)
-            # print(len(pressures))
-            # print(len(static_pressures))
-            # print(len(pt_positions))
-            # print(len(ps_positions))
-            # Calculate velocity using Bernoulli's equation with a check for non-negative values
-            velocities = []
-            for p in pressures:
-                delta_p = Pinf - p
-                if Vinf**2 + (2 * delta_p) / rho >= 0:
-                    velocities.append(math.sqrt(Vinf**2 + (2 * delta_p) / rho))
-                else:
-                    velocities.append(0)  # Set velocity to 0 if expression inside sqrt is negative
-
-            return velocities, alpha, static_pressures
-
-    print(f"No data found for Run_nr {selected_run_nr}")
-    return None, None, None
+    row = data.data.row(selected_run_nr)
+    if row is None:
+        print(f"No data found for Run_nr {selected_run_nr}")
+        return None, None, None
+
+    alpha = data["alpha"][row]
+    rho = data["rho"][row]
+    Pinf = data["freestream_total"][row]
+    pressures = data["rake_total"][row]
+    static_pressures = data["rake_static"][row].tolist()
+
+    # Calculate velocity using Bernoulli's equation, set to 0 where the expression inside sqrt is negative
+    velocity_squared = Vinf**2 + (2 * (Pinf - pressures)) / rho
+    velocities = np.sqrt(np.maximum(velocity_squared, 0)).tolist()
+
+    return velocities, alpha, static_pressures
 
 def plot_velocity_profile(positions, velocities, alpha):
     """Plot the velocity distribution as a single line over the wake profile."""
+    import matplotlib.pyplot as plt
+
     # Create the plot
     plt.figure(figsize=(10, 6))
 
@@ -90,6 +70,9 @@ def plot_velocity_profile(positions, velocities, alpha):
     plt.show()
 
 def main():
+    import matplotlib.pyplot as plt
+    from scipy.integrate import cumulative_trapezoid
+
     alpha_values = []
     cd_values = []
     aoa_values = np.arange(3, 52, 1)
@@ -111,7 +94,6 @@ def main():
         drag = (Vinf - velocities) * velocities
         D = cumulative_trapezoid(drag, x_data, initial=0)
         static_interpolate = np.interp(x_data*220, ps_positions, static)
-        print(static_interpolate)
         drag_2 = cumulative_trapezoid(-static_interpolate, x_data, initial=0)
         Drag = -(D[-1]+drag_2[-1])/(1/2*1.2047*Vinf**2)
 
@@ -121,8 +103,6 @@ def main():
         # if velocities is not None:
         #     # Plot the velocity profile
         #     plot_velocity_profile(alpha_values, cd_values, alpha)
-    print(alpha_values)
-    print(cd_values)
 
     plt.figure(figsize=(10, 6))
     plt.plot(alpha_values, cd_values, marker='o', linestyle='-', color='blue', label='Drag Coefficient vs. AoA')